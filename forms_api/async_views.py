@@ -0,0 +1,110 @@
+"""
+Async-native handlers for the form endpoints.
+
+DRF's APIView only dispatches sync handlers, so these are plain Django
+class-based views with ``async def`` methods. The request handling lives in
+helpers/endpoints.py and is shared with the sync views in views.py; these
+classes only run its queries through the async ORM and its blocking calls
+through sync_to_async, and return the same payloads. urls.py routes to them when
+ASYNC_VIEWS_ENABLED is set; run the project under ASGI (see README) to get
+the benefit.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+
+from .helpers.response_formatter import WHEEL_SPECIFICATION_COLUMNS, astream_wheel_specification_get_response
+from .helpers.pagination import aiterate_values, akeyset_values_page
+from .helpers.conditional import alist_validators
+from .helpers.renderers import dumps
+from .helpers.endpoints import submit_form, WheelSpecificationListing, BOGIE_CHECKSHEET_FORM, WHEEL_SPECIFICATION_FORM
+
+# Get logger
+logger = logging.getLogger('forms_api')
+
+
+def json_response(data, status_code):
+    """Render ``data`` like the sync views' FastJSONRenderer"""
+    return HttpResponse(dumps(data), content_type='application/json', status=status_code)
+
+
+class AsyncAPIView(View):
+    """Base class for async JSON views; CSRF-exempt like DRF's APIView"""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    def parse_json(self, request):
+        """Return the decoded JSON body, or None if it is not valid JSON"""
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+
+
+class AsyncSubmissionView(AsyncAPIView):
+    """POST handler for one form; validation and the save run in one worker thread"""
+    form = None
+
+    async def post(self, request):
+        # The save runs in autocommit mode, so on_commit callbacks fire before this returns
+        return await sync_to_async(submit_form)(self.form, request, self.parse_json(request), json_response)
+
+
+class AsyncBogieChecksheetView(AsyncSubmissionView):
+    """
+    POST /api/forms/bogie-checksheet (async)
+    """
+    form = BOGIE_CHECKSHEET_FORM
+
+
+class AsyncWheelSpecificationPostView(AsyncSubmissionView):
+    """
+    POST /api/forms/wheel-specifications (async)
+    """
+    form = WHEEL_SPECIFICATION_FORM
+
+
+class AsyncWheelSpecificationGetView(AsyncAPIView):
+    """
+    GET /api/forms/wheel-specifications/list (async)
+
+    Same parameters, pagination, caching and conditional GET behaviour as
+    WheelSpecificationGetView.
+    """
+    async def get(self, request):
+        listing = WheelSpecificationListing(request, request.GET, json_response)
+        try:
+            invalid = listing.filter()
+            if invalid is not None:
+                return invalid
+
+            # Conditional GET: one aggregate query decides whether anything changed
+            not_modified = listing.not_modified(await alist_validators(listing.queryset, listing.params))
+            if not_modified is not None:
+                return not_modified
+
+            # Unpaginated mode: stream rows in keyset-paged chunks
+            if listing.streaming:
+                rows = aiterate_values(listing.queryset, WHEEL_SPECIFICATION_COLUMNS, settings.LIST_STREAM_CHUNK_SIZE)
+                return listing.stream(astream_wheel_specification_get_response(rows))
+
+            cached = await sync_to_async(listing.cached)()
+            if cached is not None:
+                return cached
+
+            try:
+                wheel_specs, next_cursor = await akeyset_values_page(listing.queryset, listing.params.get('cursor'), listing.limit(), WHEEL_SPECIFICATION_COLUMNS)
+            except ValueError as e:
+                return listing.invalid(e, 'pagination')
+            return await sync_to_async(listing.page)(wheel_specs, next_cursor)
+
+        except Exception as e:
+            return listing.failed(e)
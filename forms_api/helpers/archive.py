@@ -0,0 +1,358 @@
+"""
+Columnar archive helper for KPA Forms API
+
+Aged rows are moved out of the form tables into compressed, columnar
+archive files under ``ARCHIVE_DIR/<table>/`` (see the ``archive_form_rows``
+command). One file holds up to ``--rows-per-file`` rows in (created_at, id)
+order:
+
+    MAGIC | column block ... | footer JSON | footer length (8 bytes) | MAGIC
+
+Rows are stored in row groups of ARCHIVE_ROWS_PER_GROUP; within a group each
+column is one zlib-compressed JSON array. The footer records the row count,
+each block's offset and length, and the min/max of every date, timestamp
+and numeric column for the file and for each row group.
+
+Reads memory-map the file and skip it, or any of its row groups, when those
+min/max values rule out a filter or the cursor. Within a group only the
+filter columns are decoded in full; the rest are decoded for the rows
+returned.
+
+The list filters are answered by running the same filter_* helpers as the
+hot tables against an ArchiveQuery, which records each lookup as a
+predicate instead of building SQL.
+"""
+import heapq
+import json
+import mmap
+import os
+import struct
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.db import models
+
+from .pagination import decode_cursor, encode_cursor
+
+ARCHIVE_MAGIC = b'KPAARC01'
+ARCHIVE_SUFFIX = '.kpac'
+# Written before the archived rows are deleted, renamed once they are
+PENDING_SUFFIX = '.kpac.pending'
+FOOTER_LENGTH = struct.Struct('<Q')
+COMPRESSION_LEVEL = 6
+# Rows per row group: the unit of skipping and decompression within a file
+ARCHIVE_ROWS_PER_GROUP = 5000
+
+RANGED_FIELDS = (models.DateField, models.DecimalField, models.IntegerField)
+
+
+def archive_dir(model):
+    return Path(settings.ARCHIVE_DIR) / model._meta.db_table
+
+
+def archive_columns(model):
+    """Every concrete column of ``model``, in model order"""
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot archive value of type {type(value).__name__}")
+
+
+def value_decoder(field):
+    """Parser for the JSON-encoded values of ``field``, or None if JSON already has the type"""
+    if isinstance(field, models.DateTimeField):
+        return datetime.fromisoformat
+    if isinstance(field, models.DateField):
+        return date.fromisoformat
+    if isinstance(field, models.DecimalField):
+        return Decimal
+    return None
+
+
+def encode_bound(value):
+    return value if isinstance(value, int) else encode_value(value)
+
+
+def encode_column(values):
+    return zlib.compress(json.dumps(values, default=encode_value, separators=(',', ':')).encode(), COMPRESSION_LEVEL)
+
+
+def value_ranges(fields, columns, rows):
+    """Encoded [min, max] of every ranged column with a non-null value"""
+    ranges = {}
+    for index, column in enumerate(columns):
+        if isinstance(fields[column], RANGED_FIELDS):
+            present = [row[index] for row in rows if row[index] is not None]
+            if present:
+                ranges[column] = [encode_bound(min(present)), encode_bound(max(present))]
+    return ranges
+
+
+def write_archive(path, model, columns, rows, rows_per_group=ARCHIVE_ROWS_PER_GROUP):
+    """
+    Write ``rows`` (tuples in ``columns`` order, sorted on (created_at, id))
+    to ``path`` as an archive file and fsync it. The file is written under a
+    temporary name and renamed, so readers never see a partial file.
+    """
+    fields = {field.column: field for field in model._meta.concrete_fields}
+    footer = {
+        'table': model._meta.db_table,
+        'rows': len(rows),
+        'ranges': value_ranges(fields, columns, rows),
+        'groups': [],
+    }
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(ARCHIVE_MAGIC)
+        offset = len(ARCHIVE_MAGIC)
+        for start in range(0, len(rows), rows_per_group):
+            group_rows = rows[start:start + rows_per_group]
+            group = {'rows': len(group_rows), 'ranges': value_ranges(fields, columns, group_rows), 'columns': {}}
+            for index, column in enumerate(columns):
+                block = encode_column([row[index] for row in group_rows])
+                f.write(block)
+                group['columns'][column] = [offset, len(block)]
+                offset += len(block)
+            footer['groups'].append(group)
+
+        footer_bytes = json.dumps(footer, separators=(',', ':')).encode()
+        f.write(footer_bytes)
+        f.write(FOOTER_LENGTH.pack(len(footer_bytes)))
+        f.write(ARCHIVE_MAGIC)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def decode_range(fields, ranges, column):
+    """Decoded (min, max) of ``column`` from footer ``ranges``, or None"""
+    bounds = ranges.get(column)
+    if bounds is None:
+        return None
+    decode = value_decoder(fields[column])
+    return (decode(bounds[0]), decode(bounds[1])) if decode else tuple(bounds)
+
+
+class RowGroup:
+    """Up to ARCHIVE_ROWS_PER_GROUP consecutive rows of a file; decoded columns are cached"""
+
+    def __init__(self, archive, meta):
+        self.archive = archive
+        self.fields = archive.fields
+        self.rows = meta['rows']
+        self.ranges = meta['ranges']
+        self.blocks = meta['columns']
+        self._raw = {}
+        self._columns = {}
+
+    def range(self, column):
+        return decode_range(self.fields, self.ranges, column)
+
+    def raw_column(self, column):
+        """All values of ``column`` as stored (JSON types)"""
+        if column not in self._raw:
+            offset, length = self.blocks[column]
+            self._raw[column] = json.loads(zlib.decompress(self.archive.buffer[offset:offset + length]))
+        return self._raw[column]
+
+    def column(self, column):
+        """All values of ``column``, decoded to their Python types"""
+        if column not in self._columns:
+            values = self.raw_column(column)
+            decode = value_decoder(self.fields[column])
+            if decode is not None:
+                values = [None if value is None else decode(value) for value in values]
+            self._columns[column] = values
+        return self._columns[column]
+
+    def value(self, column, index):
+        """One decoded value; only the filter columns are decoded in full"""
+        if column in self._columns:
+            return self._columns[column][index]
+        value = self.raw_column(column)[index]
+        decode = value_decoder(self.fields[column])
+        return decode(value) if decode is not None and value is not None else value
+
+    def instance(self, index):
+        """Build an unsaved model instance for row ``index``"""
+        values = {}
+        for column, field in self.fields.items():
+            if column in self.blocks:
+                values[field.attname] = self.value(column, index)
+        return self.archive.model(**values)
+
+
+class ArchiveFile:
+    """A memory-mapped archive file"""
+
+    def __init__(self, path, model):
+        self.path = path
+        self.model = model
+        self.fields = {field.column: field for field in model._meta.concrete_fields}
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        tail = len(self.buffer) - len(ARCHIVE_MAGIC)
+        if self.buffer[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC or self.buffer[tail:] != ARCHIVE_MAGIC:
+            self.close()
+            raise ValueError(f"Not an archive file: {path}")
+        (length,) = FOOTER_LENGTH.unpack(self.buffer[tail - FOOTER_LENGTH.size:tail])
+        footer_start = tail - FOOTER_LENGTH.size - length
+        self.footer = json.loads(self.buffer[footer_start:footer_start + length])
+        self.rows = self.footer['rows']
+        self.groups = [RowGroup(self, meta) for meta in self.footer['groups']]
+
+    def close(self):
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def range(self, column):
+        return decode_range(self.fields, self.footer['ranges'], column)
+
+    def last_key(self):
+        """(created_at, id) of the last row"""
+        group = self.groups[-1]
+        return group.value('created_at', group.rows - 1), group.value('id', group.rows - 1)
+
+
+def archive_files(model):
+    """Archive file paths for ``model``, oldest first"""
+    directory = archive_dir(model)
+    if not directory.is_dir():
+        return []
+    return sorted(path for path in directory.iterdir() if path.name.endswith(ARCHIVE_SUFFIX))
+
+
+class Condition:
+    """One recorded ``column__lookup=value`` filter"""
+
+    def __init__(self, field, lookup, value):
+        self.column = field.column
+        self.lookup = lookup
+        if lookup == 'in':
+            self.value = {field.to_python(item) for item in value}
+        elif lookup in ('icontains', 'startswith'):
+            self.value = str(value).upper() if lookup == 'icontains' else str(value)
+        else:
+            self.value = field.to_python(value)
+
+    def matches(self, value):
+        if value is None:
+            return False
+        if self.lookup == 'exact':
+            return value == self.value
+        if self.lookup == 'in':
+            return value in self.value
+        if self.lookup == 'icontains':
+            return self.value in str(value).upper()
+        if self.lookup == 'startswith':
+            return str(value).startswith(self.value)
+        if self.lookup == 'gt':
+            return value > self.value
+        if self.lookup == 'gte':
+            return value >= self.value
+        if self.lookup == 'lt':
+            return value < self.value
+        return value <= self.value
+
+    def may_match(self, bounds):
+        """False if no value within the file's (min, max) can match"""
+        if bounds is None:
+            return True
+        low, high = bounds
+        if self.lookup == 'exact':
+            return low <= self.value <= high
+        if self.lookup == 'in':
+            return any(low <= value <= high for value in self.value)
+        if self.lookup == 'gt':
+            return high > self.value
+        if self.lookup == 'gte':
+            return high >= self.value
+        if self.lookup == 'lt':
+            return low < self.value
+        if self.lookup == 'lte':
+            return low <= self.value
+        return True
+
+
+class ArchiveQuery:
+    """
+    Stand-in for a QuerySet that the filter_* helpers can be applied to:
+    ``filter(column__lookup=value)`` records a Condition.
+    """
+    LOOKUPS = ('exact', 'in', 'icontains', 'startswith', 'gt', 'gte', 'lt', 'lte')
+
+    def __init__(self, model):
+        self.model = model
+        self.conditions = []
+
+    def filter(self, **lookups):
+        for lookup, value in lookups.items():
+            name, _, operator = lookup.partition('__')
+            operator = operator or 'exact'
+            if operator not in self.LOOKUPS:
+                raise ValueError(f"Unsupported archive filter: {lookup}")
+            self.conditions.append(Condition(self.model._meta.get_field(name), operator, value))
+        return self
+
+    def skip(self, part, position):
+        """True if the min/max of a file or row group rule out every row"""
+        if any(not condition.may_match(part.range(condition.column)) for condition in self.conditions):
+            return True
+        return position is not None and part.range('created_at')[1] < position[0]
+
+    def matching_rows(self, archive, position):
+        """Yield (created_at, id, index, row group) for matching rows after ``position``, in order"""
+        if self.skip(archive, position):
+            return
+        for group in archive.groups:
+            if self.skip(group, position):
+                continue
+            created = group.column('created_at')
+            ids = group.column('id')
+            candidates = range(group.rows)
+            if position is not None:
+                candidates = [i for i in candidates if (created[i], ids[i]) > position]
+            for condition in self.conditions:
+                values = group.column(condition.column)
+                candidates = [i for i in candidates if condition.matches(values[i])]
+            for i in candidates:
+                yield created[i], ids[i], i, group
+
+    def page(self, cursor, limit):
+        """
+        One page of archived rows matching the recorded filters in
+        (created_at, id) order, and the cursor for the next page.
+        """
+        position = decode_cursor(cursor) if cursor else None
+        archives = []
+        try:
+            for path in archive_files(self.model):
+                archives.append(ArchiveFile(path, self.model))
+            streams = [self.matching_rows(archive, position) for archive in archives]
+            rows = []
+            for created_at, pk, index, group in heapq.merge(*streams, key=lambda row: row[:2]):
+                rows.append(group.instance(index))
+                if len(rows) > limit:
+                    break
+        finally:
+            for archive in archives:
+                archive.close()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
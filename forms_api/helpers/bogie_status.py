@@ -0,0 +1,146 @@
+"""
+Per-bogie latest status helper for KPA Forms API
+
+``forms_api_bogiestatus`` holds one row per bogie: its latest submitted
+checksheet (highest id), every component condition and the number of
+defective components. It is updated in the same transaction as each
+checksheet insert, so the fleet status endpoint reads it directly instead
+of picking the latest row per bogie out of the whole checksheet table.
+
+A condition counts as defective unless it is empty or one of
+``BOGIE_OK_CONDITIONS`` (case-insensitive).
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from ..models import BogieChecksheet, BogieStatus
+from .filters import BOGIE_CONDITION_FILTERS, parse_field_list
+from .idempotency import save_idempotent
+from .pagination import InvalidCursor
+
+CONDITION_COLUMNS = tuple(BOGIE_CONDITION_FILTERS.values())
+
+
+def defective_count(checksheet):
+    """Number of recorded component conditions that are not OK"""
+    ok = {condition.strip().upper() for condition in settings.BOGIE_OK_CONDITIONS}
+    count = 0
+    for column in CONDITION_COLUMNS:
+        value = (getattr(checksheet, column) or '').strip().upper()
+        if value and value not in ok:
+            count += 1
+    return count
+
+
+def status_values(checksheet):
+    """BogieStatus column values for ``checksheet``"""
+    values = {column: getattr(checksheet, column) for column in CONDITION_COLUMNS}
+    values.update(
+        checksheet_id=checksheet.id,
+        form_number=checksheet.form_number,
+        inspection_by=checksheet.inspection_by,
+        inspection_date=checksheet.inspection_date,
+        inspected_at=checksheet.created_at,
+        deficit_components=checksheet.deficit_components,
+        defective_count=defective_count(checksheet),
+    )
+    return values
+
+
+def record_bogie_status(checksheet):
+    """
+    Make ``checksheet`` its bogie's status unless a newer checksheet already
+    is. Call it inside the transaction that inserted the checksheet.
+
+    The conditional UPDATE is atomic per row, so concurrent inserts for one
+    bogie leave the highest id in place; the first inspection of a bogie is
+    an INSERT that falls back to the UPDATE if another request won the race.
+    """
+    values = status_values(checksheet)
+    newer_than_stored = BogieStatus.objects.filter(bogie_no=checksheet.bogie_no, checksheet_id__lt=checksheet.id)
+    if newer_than_stored.update(**values) or BogieStatus.objects.filter(bogie_no=checksheet.bogie_no).exists():
+        return
+    try:
+        # Savepoint so a conflict leaves the outer transaction usable
+        with transaction.atomic():
+            BogieStatus.objects.create(bogie_no=checksheet.bogie_no, **values)
+    except IntegrityError:
+        newer_than_stored.update(**values)
+
+
+def save_bogie_checksheet(instance, key, values):
+    """
+    save_idempotent for a bogie checksheet plus its status row, in one
+    transaction. Replays leave the status untouched.
+    """
+    with transaction.atomic():
+        checksheet, replayed = save_idempotent(instance, key, values)
+        if not replayed:
+            record_bogie_status(checksheet)
+    return checksheet, replayed
+
+
+def rebuild_bogie_status(batch_size=500):
+    """
+    Replace every status row from the checksheet table in one transaction and
+    return the number of bogies
+    """
+    latest_ids = list(
+        BogieChecksheet.objects.values('bogie_no').annotate(latest=Max('id')).order_by('bogie_no').values_list('latest', flat=True)
+    )
+    with transaction.atomic():
+        BogieStatus.objects.all().delete()
+        for start in range(0, len(latest_ids), batch_size):
+            checksheets = BogieChecksheet.objects.filter(id__in=latest_ids[start:start + batch_size])
+            BogieStatus.objects.bulk_create([
+                BogieStatus(bogie_no=checksheet.bogie_no, **status_values(checksheet)) for checksheet in checksheets
+            ])
+    return len(latest_ids)
+
+
+def encode_status_cursor(bogie_no):
+    """Encode the last bogie number of a page as an opaque URL-safe cursor"""
+    raw = json.dumps([bogie_no], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_status_cursor(cursor):
+    """Decode a cursor produced by encode_status_cursor back into a bogie number"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        (bogie_no,) = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(bogie_no, str):
+            raise TypeError(bogie_no)
+        return bogie_no
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def fleet_status_page(params, limit):
+    """
+    One page of bogie status rows in bogie number order and the cursor for
+    the next page. Filters: ``bogieNo`` (comma-separated, exact) and
+    ``defectiveOnly=true``.
+    """
+    queryset = BogieStatus.objects.order_by('bogie_no')
+    bogie_numbers = parse_field_list(params.get('bogieNo'))
+    if bogie_numbers:
+        queryset = queryset.filter(bogie_no__in=bogie_numbers)
+    defective_only = params.get('defectiveOnly', '').lower()
+    if defective_only in ('1', 'true'):
+        queryset = queryset.filter(defective_count__gt=0)
+    elif defective_only not in ('', '0', 'false'):
+        raise ValueError(f"Invalid defectiveOnly: {params.get('defectiveOnly')}")
+    if params.get('cursor'):
+        queryset = queryset.filter(bogie_no__gt=decode_status_cursor(params.get('cursor')))
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_status_cursor(rows[-1].bogie_no)
+    return rows, next_cursor
@@ -0,0 +1,54 @@
+"""
+Conditional GET helper for KPA Forms API
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from .filters import normalize_params
+
+VALIDATOR_AGGREGATES = {
+    'row_count': Count('id'),
+    'last_created': Max('created_at'),
+    'last_id': Max('id'),
+    'last_updated': Max('updated_at'),
+}
+
+
+def list_validators(queryset, params):
+    """
+    Compute a weak ETag for a filtered list with one aggregate query,
+    without loading any rows.
+
+    The ETag covers the row count, newest row, latest update and the
+    normalized query string, so it changes when rows are added, edited or
+    removed, or when the client asks for a different filter set or page.
+    No Last-Modified is sent: deleted and archived rows leave no timestamp
+    behind, so If-Modified-Since could not notice them.
+    """
+    return build_validators(queryset.order_by().aggregate(**VALIDATOR_AGGREGATES), params)
+
+
+async def alist_validators(queryset, params):
+    """Async version of list_validators using the async ORM"""
+    return build_validators(await queryset.order_by().aaggregate(**VALIDATOR_AGGREGATES), params)
+
+
+def build_validators(summary, params):
+    """Turn the validator aggregate into a weak ETag"""
+    stamps = [value.isoformat() if value else '' for value in (summary['last_created'], summary['last_updated'])]
+    fingerprint = f"{summary['row_count']}:{stamps[0]}:{summary['last_id']}:{stamps[1]}:{normalize_params(params)}"
+    return f'W/"{hashlib.sha1(fingerprint.encode()).hexdigest()}"'
+
+
+def conditional_list_response(request, etag):
+    """Return a 304 response if the client's ETag still matches, else None"""
+    return get_conditional_response(request, etag=etag)
+
+
+def set_list_validators(response, etag):
+    """Attach the ETag to a list response and ask clients to revalidate"""
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
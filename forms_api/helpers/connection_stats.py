@@ -0,0 +1,34 @@
+"""
+Database connection statistics for KPA Forms API
+"""
+from django.db import connections
+
+
+def get_connection_stats(alias='default'):
+    """
+    Describe how ``alias`` manages connections: persistent connection
+    settings and, when the psycopg 3 pool is enabled, this worker's pool
+    counters (see psycopg_pool's ``ConnectionPool.get_stats``).
+    """
+    connection = connections[alias]
+    settings_dict = connection.settings_dict
+    stats = {
+        'alias': alias,
+        'vendor': connection.vendor,
+        'conn_max_age': settings_dict.get('CONN_MAX_AGE', 0),
+        'conn_health_checks': settings_dict.get('CONN_HEALTH_CHECKS', False),
+        'pooled': False,
+    }
+
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        stats['pooled'] = True
+        stats['pool'] = dict(
+            pool.get_stats(),
+            name=pool.name,
+            min_size=pool.min_size,
+            max_size=pool.max_size,
+            timeout=pool.timeout,
+            max_lifetime=pool.max_lifetime,
+        )
+    return stats
@@ -0,0 +1,217 @@
+"""
+Request handling shared by the sync and async form views for KPA Forms API
+
+views.py (DRF) and async_views.py (plain Django, async ORM) answer the same
+requests with the same payloads. Everything between their I/O lives here:
+validation, idempotent saves, the error envelope, logging, statsd and the
+list's conditional GET, stream, cache and page steps. The views pass a
+``respond(data, status_code)`` callable that wraps a payload in their own
+response class and only decide how the database and cache calls are run.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from rest_framework import status
+
+from ..models import WheelSpecification
+from .bogie_status import save_bogie_checksheet
+from .conditional import conditional_list_response, set_list_validators
+from .filters import filter_wheel_specifications
+from .form_schema import BOGIE_CHECKSHEET_SCHEMA, WHEEL_SPECIFICATION_SCHEMA
+from .idempotency import get_idempotency_key, save_idempotent, IdempotencyKeyReused, REPLAYED_HEADER
+from .ingest import QueueFull, get_ingest_queue
+from .list_cache import get_list_cache, bump_list_cache_version
+from .pagination import parse_limit
+from .renderers import dumps
+from .response_formatter import format_bogie_checksheet_response, format_wheel_specification_post_response, format_wheel_specification_rows_response, format_validation_error_response, format_submission_queued_response
+from .sync import supersede_older_submissions
+from kpa_project import statsd
+
+# Get logger
+logger = logging.getLogger('forms_api')
+
+WHEEL_SPECIFICATION_CACHE_LABEL = WheelSpecification._meta.label_lower
+
+
+def error_response(respond, message, status_code):
+    return respond({'message': message, 'success': False}, status_code)
+
+
+class SubmissionForm:
+    """One form endpoint: its schema, how it is saved and what happens after a new row is created"""
+
+    def __init__(self, form, schema, save, format_response, on_created=None):
+        self.form = form
+        self.name = form.replace('-', ' ')
+        self.title = self.name.capitalize()
+        self.tag = form.replace('-', '_')
+        self.schema = schema
+        self.save = save
+        self.format_response = format_response
+        self.on_created = on_created
+
+
+def wheel_specification_created(wheel_spec):
+    supersede_older_submissions([wheel_spec.form_number])
+    transaction.on_commit(lambda: bump_list_cache_version(WHEEL_SPECIFICATION_CACHE_LABEL))
+
+
+BOGIE_CHECKSHEET_FORM = SubmissionForm('bogie-checksheet', BOGIE_CHECKSHEET_SCHEMA, save_bogie_checksheet, format_bogie_checksheet_response)
+WHEEL_SPECIFICATION_FORM = SubmissionForm('wheel-specification', WHEEL_SPECIFICATION_SCHEMA, save_idempotent, format_wheel_specification_post_response, wheel_specification_created)
+
+
+def submit_form(form, request, data, respond):
+    """
+    Validate and save one submission, or queue it in write-behind mode.
+
+    Answers 201 with the stored row (flagged with REPLAYED_HEADER for
+    idempotent retries), 202 with a receipt when queued, 400 for schema or
+    idempotency key errors, 422 for a reused key, 503 when the ingestion
+    queue is full and 500 for anything else.
+    """
+    try:
+        # Map and validate the payload against the declarative schema
+        values, errors = form.schema.normalize(data)
+        logger.info(f"{form.title} submission - Form: {values.get('form_number') or 'N/A'}")
+
+        if errors:
+            logger.warning(f"{form.title} validation failed: {errors} - Form: {values.get('form_number') or 'N/A'}")
+            statsd.increment('forms.rejected', tags={'form': form.tag, 'reason': 'validation'})
+            return respond(format_validation_error_response(errors, form.name), status.HTTP_400_BAD_REQUEST)
+
+        # Retries with the same key return the stored row
+        try:
+            idempotency_key = get_idempotency_key(request, values)
+            if settings.INGEST_QUEUE_ENABLED:
+                return queue_submission(form, values, idempotency_key, respond)
+            instance, replayed = form.save(form.schema.build(values), idempotency_key, values)
+        except ValueError as e:
+            logger.warning(f"Invalid idempotency key: {str(e)}")
+            statsd.increment('forms.rejected', tags={'form': form.tag, 'reason': 'idempotency_key'})
+            return error_response(respond, str(e), status.HTTP_400_BAD_REQUEST)
+        except IdempotencyKeyReused as e:
+            logger.warning(f"{form.title} idempotency conflict: {str(e)}")
+            statsd.increment('forms.rejected', tags={'form': form.tag, 'reason': 'idempotency_conflict'})
+            return error_response(respond, str(e), status.HTTP_422_UNPROCESSABLE_ENTITY)
+        except QueueFull as e:
+            logger.warning(f"{form.title} rejected, ingestion queue is full: {str(e)}")
+            statsd.increment('forms.rejected', tags={'form': form.tag, 'reason': 'queue_full'})
+            response = error_response(respond, str(e), status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = str(settings.INGEST_RETRY_AFTER)
+            return response
+
+        if replayed:
+            logger.info(f"{form.title} replayed for idempotency key - ID: {instance.id}, Form: {instance.form_number}")
+        else:
+            if form.on_created is not None:
+                form.on_created(instance)
+            logger.info(f"{form.title} created successfully - ID: {instance.id}, Form: {instance.form_number}")
+
+        statsd.increment('forms.submitted', tags={'form': form.tag, 'result': 'replayed' if replayed else 'created'})
+
+        response = respond(form.format_response(instance), status.HTTP_201_CREATED)
+        if replayed:
+            response[REPLAYED_HEADER] = 'true'
+        return response
+
+    except Exception as e:
+        logger.error(f"Error submitting {form.name}: {str(e)}")
+        return error_response(respond, f'Error submitting {form.name}: {str(e)}', status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def queue_submission(form, values, idempotency_key, respond):
+    """Write-behind mode: append to the ingestion queue and answer 202 with a receipt"""
+    receipt = get_ingest_queue().enqueue(form.form, values, idempotency_key)
+    logger.info(f"{form.title} queued - Receipt: {receipt}, Form: {values.get('form_number')}")
+    statsd.increment('forms.submitted', tags={'form': form.tag, 'result': 'queued'})
+    response = respond(format_submission_queued_response(receipt, values.get('form_number'), form.name), status.HTTP_202_ACCEPTED)
+    response['Location'] = reverse('submission-status', args=[receipt])
+    return response
+
+
+class WheelSpecificationListing:
+    """
+    The steps of one wheel specification list request.
+
+    The view filters, then asks for a 304 with the list validators, then
+    either streams every row or tries the response cache before fetching a
+    keyset page. ``cached()`` and ``page()`` call the list cache, so async
+    views run them through sync_to_async.
+    """
+
+    def __init__(self, request, params, respond):
+        self.request = request
+        self.params = params
+        self.respond = respond
+        self.queryset = None
+        self.etag = None
+        self.list_cache = None
+        self.cache_key = None
+
+    def filter(self):
+        """Build the filtered queryset; returns a 400 response for invalid filters"""
+        logger.info(f"Fetching wheel specifications - Filters: formNumber={self.params.get('formNumber', 'None')}, submittedBy={self.params.get('submittedBy', 'None')}, submittedDate={self.params.get('submittedDate', 'None')}")
+        try:
+            self.queryset = filter_wheel_specifications(WheelSpecification.objects.all(), self.params)
+        except ValueError as e:
+            return self.invalid(e, 'filter')
+
+    def not_modified(self, etag):
+        """Conditional GET: a 304 response if the client's copy matches ``etag``"""
+        self.etag = etag
+        response = conditional_list_response(self.request, etag)
+        if response is not None:
+            logger.info("Wheel specifications not modified since the client's copy")
+            return set_list_validators(response, etag)
+
+    @property
+    def streaming(self):
+        """Unpaginated mode: the whole filtered list as one streamed JSON array"""
+        return self.params.get('stream', '').lower() in ('1', 'true')
+
+    def stream(self, chunks):
+        logger.info("Streaming wheel specification records matching the filters")
+        return set_list_validators(StreamingHttpResponse(chunks, content_type='application/json'), self.etag)
+
+    def cached(self):
+        """Serve identical filter sets from the versioned response cache"""
+        self.list_cache = get_list_cache()
+        if self.list_cache is None:
+            return None
+        self.cache_key = self.list_cache.make_key(WHEEL_SPECIFICATION_CACHE_LABEL, self.params)
+        content = self.list_cache.get(self.cache_key)
+        statsd.increment('forms.list.cache', tags={'form': 'wheel_specification', 'result': 'hit' if content is not None else 'miss'})
+        if content is not None:
+            logger.info("Serving wheel specifications from cache")
+            return self.cached_response(content, 'HIT')
+
+    def limit(self):
+        return parse_limit(self.params.get('limit'), settings.LIST_PAGE_SIZE, settings.LIST_MAX_PAGE_SIZE)
+
+    def page(self, rows, next_cursor):
+        """Format one keyset page, storing it in the response cache when enabled"""
+        logger.info(f"Returning {len(rows)} wheel specification records matching the filters")
+        statsd.histogram('forms.list.rows', len(rows), tags={'form': 'wheel_specification'})
+
+        response_data = format_wheel_specification_rows_response(rows, next_cursor)
+        if self.list_cache is None:
+            return set_list_validators(self.respond(response_data, status.HTTP_200_OK), self.etag)
+        content = dumps(response_data)
+        self.list_cache.set(self.cache_key, content)
+        return self.cached_response(content, 'MISS')
+
+    def cached_response(self, content, cache_status):
+        response = HttpResponse(content, content_type='application/json', status=status.HTTP_200_OK)
+        response['X-Cache'] = cache_status
+        return set_list_validators(response, self.etag)
+
+    def invalid(self, error, parameters):
+        logger.warning(f"Invalid {parameters} parameters: {str(error)}")
+        return error_response(self.respond, str(error), status.HTTP_400_BAD_REQUEST)
+
+    def failed(self, error):
+        logger.error(f"Error fetching wheel specifications: {str(error)}")
+        return error_response(self.respond, f'Error fetching wheel specifications: {str(error)}', status.HTTP_500_INTERNAL_SERVER_ERROR)
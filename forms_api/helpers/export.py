@@ -0,0 +1,125 @@
+"""
+Streaming CSV / NDJSON export helper for KPA Forms API
+
+Rows are read with ``values_list(...).iterator()`` (a server-side cursor on
+PostgreSQL) and encoded a chunk at a time, so an export of any size runs in
+constant memory. The CSV header is yielded before the query runs, and the
+first rows follow after one cursor fetch rather than the whole result set.
+"""
+import csv
+from datetime import date
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .form_schema import BOGIE_CHECKSHEET_SCHEMA, WHEEL_SPECIFICATION_SCHEMA
+from .measurements import MEASUREMENT_FIELDS
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows encoded per yielded chunk
+EXPORT_ROWS_PER_CHUNK = 500
+
+
+def export_columns(schema, extra=()):
+    """Export column name -> model column, in payload key naming"""
+    columns = {'id': 'id'}
+    for field in schema.fields:
+        columns[field.key] = field.column
+    columns.update(extra)
+    columns['createdAt'] = 'created_at'
+    return columns
+
+
+WHEEL_SPECIFICATION_EXPORT_COLUMNS = export_columns(
+    WHEEL_SPECIFICATION_SCHEMA,
+    extra={
+        f'{field.key}Mm': MEASUREMENT_FIELDS[field.column]
+        for field in WHEEL_SPECIFICATION_SCHEMA.fields if field.column in MEASUREMENT_FIELDS
+    },
+)
+
+BOGIE_CHECKSHEET_EXPORT_COLUMNS = export_columns(BOGIE_CHECKSHEET_SCHEMA)
+
+
+def parse_export_format(value):
+    """Validate the ``output`` query parameter (default csv)"""
+    export_format = value or 'csv'
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid output '{export_format}'. Expected one of: {', '.join(EXPORT_FORMATS)}")
+    return export_format
+
+
+def parse_export_columns(value, available):
+    """
+    Resolve the comma-separated ``columns`` query parameter against
+    ``available``; all columns when absent. Returns (names, model columns).
+    """
+    if not value:
+        names = list(available)
+    else:
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown export columns: {', '.join(unknown)}. Available: {', '.join(available)}")
+    return names, [available[name] for name in names]
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def chunked(rows, size=EXPORT_ROWS_PER_CHUNK):
+    """Group an iterator of rows into lists of at most ``size`` rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_csv(names, rows):
+    """Yield a header line, then CSV text for ``rows`` (tuples in ``names`` order)"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(names)
+    for chunk in chunked(rows):
+        yield ''.join([writer.writerow(row) for row in chunk])
+
+
+def stream_ndjson(names, rows):
+    """Yield one JSON object per row, newline-delimited"""
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for chunk in chunked(rows):
+        yield ''.join([encoder.encode(dict(zip(names, row))) + '\n' for row in chunk])
+
+
+def stream_export(export_format, names, rows):
+    """Return the chunk generator for ``export_format``"""
+    if export_format == 'ndjson':
+        return stream_ndjson(names, rows)
+    return stream_csv(names, rows)
+
+
+def export_response(queryset, params, available, basename, chunk_size):
+    """
+    Build a StreamingHttpResponse exporting ``queryset`` in (created_at, id)
+    order with the format and columns requested in ``params``.
+
+    Raises ValueError for an unsupported format or unknown columns.
+    """
+    export_format = parse_export_format(params.get('output'))
+    names, columns = parse_export_columns(params.get('columns'), available)
+    rows = queryset.order_by('created_at', 'id').values_list(*columns).iterator(chunk_size=chunk_size)
+
+    response = StreamingHttpResponse(stream_export(export_format, names, rows), content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{basename}-{date.today().isoformat()}.{export_format}"'
+    return response
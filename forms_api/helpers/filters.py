@@ -0,0 +1,186 @@
+"""
+Query filter helpers for KPA Forms API
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urlencode
+
+from django.utils import timezone
+
+from .form_schema import BOGIE_CHECKSHEET_SCHEMA, BOGIE_CONDITION_SECTIONS
+from .measurements import MEASUREMENT_RANGE_FILTERS
+
+FORM_NUMBER_MATCH_MODES = ('contains', 'exact', 'prefix')
+
+# Component condition query parameter -> column, e.g. axleGuide=Worn
+BOGIE_CONDITION_FILTERS = {
+    field.key: field.column for field in BOGIE_CHECKSHEET_SCHEMA.fields if field.section in BOGIE_CONDITION_SECTIONS
+}
+
+
+def filter_wheel_specifications(queryset, params):
+    """
+    Apply the list endpoint query parameters to a WheelSpecification queryset.
+
+    ``formNumberMatch`` selects how ``formNumber`` is matched:
+      - ``contains`` (default): case-insensitive substring, served by the
+        pg_trgm GIN index
+      - ``exact``: equality, served by the plain B-tree index
+      - ``prefix``: case-sensitive prefix, served by the varchar_pattern_ops
+        B-tree index
+
+    Numeric range filters ``<name>Min`` / ``<name>Max`` (e.g.
+    ``treadDiameterMin``) compare the parsed mm columns in SQL; see
+    MEASUREMENT_RANGE_FILTERS for the supported names.
+
+    Date ranges: ``submittedDateFrom`` / ``submittedDateTo`` and
+    ``createdFrom`` / ``createdTo`` (inclusive, YYYY-MM-DD).
+
+    Raises ValueError for unsupported parameter values.
+    """
+    submitted_by = params.get('submittedBy', None)
+    submitted_date = params.get('submittedDate', None)
+
+    # Apply filters if provided
+    queryset = filter_form_number(queryset, params)
+    if submitted_by:
+        queryset = queryset.filter(submitted_by__icontains=submitted_by)
+    if submitted_date:
+        queryset = queryset.filter(submitted_date=submitted_date)
+    queryset = filter_date_range(queryset, params, 'submittedDate', 'submitted_date')
+    queryset = filter_created_range(queryset, params)
+
+    for param_prefix, column in MEASUREMENT_RANGE_FILTERS.items():
+        minimum = parse_decimal_param(params, f'{param_prefix}Min')
+        maximum = parse_decimal_param(params, f'{param_prefix}Max')
+        if minimum is not None:
+            queryset = queryset.filter(**{f'{column}__gte': minimum})
+        if maximum is not None:
+            queryset = queryset.filter(**{f'{column}__lte': maximum})
+
+    return queryset
+
+
+def filter_bogie_checksheets(queryset, params):
+    """
+    Apply query parameters to a BogieChecksheet queryset: ``formNumber``
+    (with ``formNumberMatch``), ``bogieNo`` (exact), ``inspectionBy``,
+    ``inspectionDate`` and the ``inspectionDateFrom`` / ``inspectionDateTo``
+    and ``createdFrom`` / ``createdTo`` ranges.
+
+    Component conditions are matched exactly by payload key, with commas
+    separating alternatives, e.g. ``axleGuide=Worn,Cracked``; see
+    BOGIE_CONDITION_FILTERS.
+
+    Raises ValueError for unsupported parameter values.
+    """
+    bogie_no = params.get('bogieNo', None)
+    inspection_by = params.get('inspectionBy', None)
+    inspection_date = params.get('inspectionDate', None)
+
+    queryset = filter_form_number(queryset, params)
+    if bogie_no:
+        queryset = queryset.filter(bogie_no=bogie_no)
+    if inspection_by:
+        queryset = queryset.filter(inspection_by__icontains=inspection_by)
+    if inspection_date:
+        queryset = queryset.filter(inspection_date=parse_date_param(params, 'inspectionDate'))
+    queryset = filter_date_range(queryset, params, 'inspectionDate', 'inspection_date')
+    for param, column in BOGIE_CONDITION_FILTERS.items():
+        values = parse_field_list(params.get(param))
+        if len(values) == 1:
+            queryset = queryset.filter(**{column: values[0]})
+        elif values:
+            queryset = queryset.filter(**{f'{column}__in': values})
+    return filter_created_range(queryset, params)
+
+
+def filter_form_number(queryset, params):
+    """
+    Filter on ``formNumber``; ``formNumberMatch`` selects how it is matched:
+      - ``contains`` (default): case-insensitive substring
+      - ``exact``: equality
+      - ``prefix``: case-sensitive prefix
+    """
+    form_number = params.get('formNumber', None)
+    form_number_match = params.get('formNumberMatch', None) or 'contains'
+
+    if form_number_match not in FORM_NUMBER_MATCH_MODES:
+        raise ValueError(
+            f"Invalid formNumberMatch '{form_number_match}'. Expected one of: {', '.join(FORM_NUMBER_MATCH_MODES)}"
+        )
+
+    if form_number:
+        if form_number_match == 'exact':
+            queryset = queryset.filter(form_number=form_number)
+        elif form_number_match == 'prefix':
+            queryset = queryset.filter(form_number__startswith=form_number)
+        else:
+            queryset = queryset.filter(form_number__icontains=form_number)
+    return queryset
+
+
+def filter_date_range(queryset, params, param_prefix, column):
+    """Apply inclusive ``<param_prefix>From`` / ``<param_prefix>To`` bounds to a date column"""
+    start = parse_date_param(params, f'{param_prefix}From')
+    end = parse_date_param(params, f'{param_prefix}To')
+    if start is not None:
+        queryset = queryset.filter(**{f'{column}__gte': start})
+    if end is not None:
+        queryset = queryset.filter(**{f'{column}__lte': end})
+    return queryset
+
+
+def filter_created_range(queryset, params):
+    """
+    Apply inclusive ``createdFrom`` / ``createdTo`` dates to ``created_at`` as
+    timestamp bounds, so the (created_at, id) index can serve the range.
+    """
+    start = parse_date_param(params, 'createdFrom')
+    end = parse_date_param(params, 'createdTo')
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=start_of_day(start))
+    if end is not None:
+        queryset = queryset.filter(created_at__lt=start_of_day(end + timedelta(days=1)))
+    return queryset
+
+
+def start_of_day(day):
+    """Midnight at the start of ``day`` in the current time zone"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def parse_field_list(value):
+    """Split a comma-separated query parameter into its non-empty names"""
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def parse_date_param(params, name):
+    """Return query parameter ``name`` as a date, or None if absent"""
+    value = params.get(name, None)
+    if value in (None, ''):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} '{value}'. Expected YYYY-MM-DD")
+
+
+def parse_decimal_param(params, name):
+    """Return query parameter ``name`` as a Decimal, or None if absent"""
+    value = params.get(name, None)
+    if value in (None, ''):
+        return None
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid {name} '{value}'. Expected a number in mm")
+    if not number.is_finite():
+        raise ValueError(f"Invalid {name} '{value}'. Expected a number in mm")
+    return number
+
+
+def normalize_params(params):
+    """Return query parameters as a canonical string, ignoring order and empty values"""
+    # Encoded, so a value containing '&' or '=' cannot pass for another filter set
+    return urlencode(sorted((name, value) for name, value in params.items() if value not in (None, '')))
@@ -0,0 +1,382 @@
+"""
+Declarative form schemas for KPA Forms API
+
+Each form type is declared once as a list of SchemaField entries. At import
+time a FormSchema compiles the declaration into:
+  - a flat alias -> field lookup table covering the nested camelCase payload
+    keys, the legacy display labels ("Tread Diameter (New)") and the legacy
+    snake_case keys, and
+  - a tuple of per-field checks (required, date format, max length).
+
+normalize() then maps and validates a payload in a single pass, and
+to_payload() renders a model instance back into the nested camelCase shape.
+
+Clients send the same payload shape (key set and order) on every request,
+so normalize() also compiles each shape it sees into a plan: itemgetters
+pulling the winning alias of every field, the target columns and the
+length limits. A payload whose values are all non-blank strings within
+their limits is then mapped with a few C-level passes; anything else (blank
+or non-string values, invalid data, new shapes past SHAPE_PLAN_LIMIT) takes
+the general pass, so both produce the same result.
+The same schema drives the POST views, the bulk path and the response
+formatter.
+"""
+import sys
+from datetime import date
+from operator import gt, itemgetter
+
+from ..models import BogieChecksheet, WheelSpecification
+from .validation import validate_date, validate_form_number
+
+TEXT = 'text'
+DATE = 'date'
+
+UNSET_PRIORITY = 1 << 30
+
+# Payload shapes compiled per schema; further shapes use the general pass
+SHAPE_PLAN_LIMIT = 64
+
+
+def validate_iso_date(value):
+    """Fast path for YYYY-MM-DD dates; anything else goes through validate_date"""
+    if len(value) == 10 and value[4] == '-' and value[7] == '-':
+        try:
+            date.fromisoformat(value)
+            return True, None
+        except ValueError:
+            pass
+    return validate_date(value)
+
+
+def values_getter(names):
+    """Callable returning the values of ``names`` as a tuple, like itemgetter with one or more names"""
+    if len(names) == 1:
+        name = names[0]
+        return lambda source: (source[name],)
+    return itemgetter(*names)
+
+
+# Extra validators keyed by field kind or column name
+FIELD_VALIDATORS = {
+    DATE: validate_iso_date,
+    'form_number': validate_form_number,
+}
+
+
+class SchemaField:
+    """One model column and the payload keys that map to it"""
+
+    def __init__(self, column, key, section=None, required=False, kind=TEXT, aliases=()):
+        self.column = column
+        self.key = key
+        self.section = section
+        self.required = required
+        self.kind = kind
+        self.aliases = aliases
+
+
+class FormSchema:
+    """Compiled mapping and validation for one form type"""
+
+    def __init__(self, model, fields, sections):
+        self.model = model
+        self.fields = tuple(fields)
+        self.sections = dict(sections)
+
+        # alias -> (field index, priority); lower priority wins when a payload
+        # carries the same field under several aliases
+        self.lookup = {}
+        for index, field in enumerate(self.fields):
+            model_field = model._meta.get_field(field.column)
+            names = [str(model_field.verbose_name), *field.aliases, field.column, field.key]
+            for priority, name in enumerate(names):
+                if name not in self.lookup:
+                    self.lookup[name] = (index, priority)
+
+        self.checks = tuple(
+            (index, field.column, field.key, field.section, field.required,
+             field.kind == DATE, FIELD_VALIDATORS.get(field.kind if field.kind == DATE else field.column),
+             model._meta.get_field(field.column).max_length)
+            for index, field in enumerate(self.fields)
+        )
+
+        # section -> ((key, column), ...) for rendering, top-level fields under None
+        self.output_plan = {}
+        for field in self.fields:
+            self.output_plan.setdefault(field.section, []).append((field.key, field.column))
+        self.output_plan = {section: tuple(pairs) for section, pairs in self.output_plan.items()}
+
+        # Values of the fields a payload leaves out, and compiled shapes
+        self.defaults = {field.column: None if field.kind == DATE else '' for field in self.fields}
+        self.shape_plans = {}
+
+    def normalize(self, data):
+        """
+        Map a payload (nested camelCase, display labels or snake_case) onto
+        model columns and validate it.
+
+        Returns ``(values, errors)`` where ``values`` is a column -> value dict
+        ready for the model constructor and ``errors`` a list of messages.
+        """
+        if data.__class__ is dict:
+            shape = tuple(data)
+            plan = self.shape_plans.get(shape)
+            if plan is None and len(self.shape_plans) < SHAPE_PLAN_LIMIT:
+                plan = self.shape_plans[shape] = self.compile_shape(data)
+            if plan:
+                values = self.normalize_planned(data, plan)
+                if values is not None:
+                    return values, []
+        return self.normalize_general(data)
+
+    def compile_shape(self, data):
+        """
+        Plan for payloads with the keys of ``data``: the alias that wins for
+        each field when every value is present. False when such payloads
+        cannot be valid or carry a section that is not an object.
+        """
+        sections = []
+        winners = {}
+        for key, value in data.items():
+            if key in self.sections:
+                if not isinstance(value, dict):
+                    return False
+                sections.append((key, frozenset(value)))
+                names = [(key, name) for name in value]
+            else:
+                names = [(None, key)]
+            for section, name in names:
+                entry = self.lookup.get(name)
+                if entry is not None and entry[1] < winners.get(entry[0], (UNSET_PRIORITY,))[0]:
+                    winners[entry[0]] = (entry[1], section, name)
+        if any(field.required and index not in winners for index, field in enumerate(self.fields)):
+            return False
+
+        by_source = {}
+        for index in sorted(winners):
+            _, section, name = winners[index]
+            by_source.setdefault(section, []).append((index, name))
+        getters, columns, max_lengths, validators = [], [], [], []
+        for section, entries in by_source.items():
+            getters.append((section, values_getter([name for _, name in entries])))
+            for index, _ in entries:
+                _, column, _, _, _, _, validator, max_length = self.checks[index]
+                if validator is not None:
+                    validators.append((len(columns), validator))
+                columns.append(column)
+                max_lengths.append(max_length if max_length is not None else sys.maxsize)
+        absent = [(column, value) for column, value in self.defaults.items() if column not in columns]
+        return (
+            tuple(sections), tuple(getters), tuple(columns) + tuple(column for column, _ in absent),
+            tuple(value for _, value in absent), tuple(max_lengths), min(max_lengths), tuple(validators),
+        )
+
+    def normalize_planned(self, data, plan):
+        """Values for a valid payload of a compiled shape, or None to take the general pass"""
+        sections, getters, columns, absent, max_lengths, shortest, validators = plan
+        for section, keys in sections:
+            value = data[section]
+            if value.__class__ is not dict or value.keys() != keys:
+                return None
+        found = ()
+        for section, getter in getters:
+            found += getter(data if section is None else data[section])
+        try:
+            # Non-blank strings only: str.strip raises for anything else
+            if not all(map(str.strip, found)):
+                return None
+        except TypeError:
+            return None
+        if max(map(len, found)) > shortest and any(map(gt, map(len, found), max_lengths)):
+            return None
+        for position, validator in validators:
+            if not validator(found[position])[0]:
+                return None
+        return dict(zip(columns, found + absent))
+
+    def normalize_general(self, data):
+        """normalize() for any payload: one pass over its keys, then per-field checks"""
+        if not isinstance(data, dict):
+            return {}, ["Payload must be a JSON object"]
+
+        raw = [None] * len(self.fields)
+        priorities = [UNSET_PRIORITY] * len(self.fields)
+        lookup = self.lookup
+        for key, value in data.items():
+            if key in self.sections and isinstance(value, dict):
+                items = value.items()
+            else:
+                items = ((key, value),)
+            for name, item_value in items:
+                entry = lookup.get(name)
+                if entry is None or item_value in (None, ''):
+                    continue
+                index, priority = entry
+                if priority < priorities[index]:
+                    raw[index] = item_value
+                    priorities[index] = priority
+
+        values = {}
+        missing = {}
+        errors = []
+        for index, column, key, section, required, is_date, validator, max_length in self.checks:
+            value = raw[index]
+            if value is not None:
+                if value.__class__ is not str:
+                    value = str(value)
+                if not value.strip():
+                    value = None
+
+            if value is None:
+                if required:
+                    missing.setdefault(section, []).append(key)
+                values[column] = None if is_date else ''
+                continue
+
+            if validator is not None:
+                is_valid, error_message = validator(value)
+                if not is_valid:
+                    errors.append(f"{key}: {error_message}" if is_date else error_message)
+            if max_length is not None and len(value) > max_length:
+                errors.append(f"{key}: must be at most {max_length} characters")
+            values[column] = value
+
+        missing_errors = [
+            f"Missing required {self.sections.get(section, 'form')} fields: {', '.join(keys)}"
+            for section, keys in missing.items()
+        ]
+        return values, missing_errors + errors
+
+    def build(self, values):
+        """Build an unsaved model instance from normalized values"""
+        return self.model(**values)
+
+    def projection(self, keys):
+        """
+        Resolve payload keys (e.g. ``['formNumber', 'bogieNo']``) to the model
+        columns to select and an output plan for to_payload(); every field
+        when ``keys`` is empty.
+
+        Raises ValueError for unknown keys.
+        """
+        if not keys:
+            return [field.column for field in self.fields], self.output_plan
+        by_key = {field.key: field for field in self.fields}
+        unknown = [key for key in keys if key not in by_key]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(by_key)}")
+
+        plan = {}
+        for key in keys:
+            plan.setdefault(by_key[key].section, []).append((key, by_key[key].column))
+        return [by_key[key].column for key in keys], {section: tuple(pairs) for section, pairs in plan.items()}
+
+    def to_payload(self, instance, plan=None):
+        """Render a model instance in the nested camelCase payload shape, limited to ``plan`` if given"""
+        payload = {}
+        for section, pairs in (plan or self.output_plan).items():
+            if section is None:
+                for key, column in pairs:
+                    payload[key] = getattr(instance, column)
+            else:
+                payload[section] = {key: getattr(instance, column) for key, column in pairs}
+        return payload
+
+    def row_formatter(self, plan=None):
+        """
+        Compile ``plan`` into ``(columns, format_row)`` for ``values_list``
+        rows: ``format_row`` renders a tuple selected in ``columns`` order
+        (extra trailing values are ignored) in the same shape as to_payload(),
+        zipping precomputed key tuples over slices of the row.
+        """
+        columns = []
+        segments = []
+        for section, pairs in (plan or self.output_plan).items():
+            start = len(columns)
+            columns.extend(column for _, column in pairs)
+            segments.append((section, tuple(key for key, _ in pairs), start, len(columns)))
+        segments = tuple(segments)
+
+        def format_row(row):
+            payload = {}
+            for section, keys, start, end in segments:
+                if section is None:
+                    payload.update(zip(keys, row[start:end]))
+                else:
+                    payload[section] = dict(zip(keys, row[start:end]))
+            return payload
+
+        return tuple(columns), format_row
+
+
+WHEEL_SPECIFICATION_SCHEMA = FormSchema(
+    WheelSpecification,
+    fields=[
+        SchemaField('axle_box_housing_bore_dia', 'axleBoxHousingBoreDia', 'fields', required=True),
+        SchemaField('bearing_seat_diameter', 'bearingSeatDiameter', 'fields', required=True),
+        SchemaField('condemning_dia', 'condemningDia', 'fields', required=True),
+        SchemaField('intermediate_wwp', 'intermediateWWP', 'fields', required=True),
+        SchemaField('last_shop_issue_size', 'lastShopIssueSize', 'fields', required=True, aliases=('last_shop_issue',)),
+        SchemaField('roller_bearing_bore_dia', 'rollerBearingBoreDia', 'fields', required=True),
+        SchemaField('roller_bearing_outer_dia', 'rollerBearingOuterDia', 'fields', required=True),
+        SchemaField('roller_bearing_width', 'rollerBearingWidth', 'fields', required=True),
+        SchemaField('tread_diameter_new', 'treadDiameterNew', 'fields', required=True, aliases=('tread_diameter',)),
+        SchemaField('variation_same_axle', 'variationSameAxle', 'fields', required=True),
+        SchemaField('variation_same_bogie', 'variationSameBogie', 'fields', required=True),
+        SchemaField('variation_same_coach', 'variationSameCoach', 'fields', required=True),
+        SchemaField('wheel_disc_width', 'wheelDiscWidth', 'fields', required=True),
+        SchemaField('wheel_gauge', 'wheelGauge', 'fields', required=True),
+        SchemaField('wheel_profile', 'wheelProfile', 'fields', required=True),
+
+        # Metadata
+        SchemaField('form_number', 'formNumber', required=True),
+        SchemaField('submitted_by', 'submittedBy'),
+        SchemaField('submitted_date', 'submittedDate', kind=DATE),
+    ],
+    sections={'fields': 'wheel specification'},
+)
+
+BOGIE_CHECKSHEET_SCHEMA = FormSchema(
+    BogieChecksheet,
+    fields=[
+        # Bogie Details
+        SchemaField('bogie_no', 'bogieNo', 'bogieDetails', required=True),
+        SchemaField('date_of_ioh', 'dateOfIOH', 'bogieDetails', required=True, kind=DATE),
+        SchemaField('incoming_div_and_date', 'incomingDivAndDate', 'bogieDetails', required=True, aliases=('incoming_div_date',)),
+        SchemaField('maker_year_built', 'makerYearBuilt', 'bogieDetails', required=True),
+        SchemaField('deficit_components', 'deficitComponents', 'bogieDetails'),
+
+        # Bogie Checksheet
+        SchemaField('axle_guide', 'axleGuide', 'bogieChecksheet', required=True),
+        SchemaField('bogie_frame_condition', 'bogieFrameCondition', 'bogieChecksheet', required=True),
+        SchemaField('bolster', 'bolster', 'bogieChecksheet', required=True),
+        SchemaField('bolster_suspension_bracket', 'bolsterSuspensionBracket', 'bogieChecksheet', required=True),
+        SchemaField('lower_spring_seat', 'lowerSpringSeat', 'bogieChecksheet', required=True),
+        SchemaField('axle_guide_assembly', 'axleGuideAssembly', 'bogieChecksheet'),
+        SchemaField('protective_tubes', 'protectiveTubes', 'bogieChecksheet'),
+        SchemaField('anchor_links', 'anchorLinks', 'bogieChecksheet'),
+        SchemaField('side_bearer', 'sideBearer', 'bogieChecksheet'),
+
+        # BMBC Checksheet
+        SchemaField('adjusting_tube', 'adjustingTube', 'bmbcChecksheet', required=True),
+        SchemaField('cylinder_body', 'cylinderBody', 'bmbcChecksheet', required=True),
+        SchemaField('piston_trunnion', 'pistonTrunnion', 'bmbcChecksheet', required=True),
+        SchemaField('plunger_spring', 'plungerSpring', 'bmbcChecksheet', required=True),
+        SchemaField('tee_bolt_hex_nut', 'teeBoltHexNut', 'bmbcChecksheet'),
+        SchemaField('pawl_and_pawl_spring', 'pawlAndPawlSpring', 'bmbcChecksheet'),
+        SchemaField('dust_excluder', 'dustExcluder', 'bmbcChecksheet'),
+
+        # Metadata
+        SchemaField('form_number', 'formNumber', required=True),
+        SchemaField('inspection_by', 'inspectionBy'),
+        SchemaField('inspection_date', 'inspectionDate', kind=DATE),
+    ],
+    sections={
+        'bogieDetails': 'bogie details',
+        'bogieChecksheet': 'bogie checksheet',
+        'bmbcChecksheet': 'BMBC checksheet',
+    },
+)
+
+# Component condition fields of the bogie checksheet, filterable by value
+BOGIE_CONDITION_SECTIONS = ('bogieChecksheet', 'bmbcChecksheet')
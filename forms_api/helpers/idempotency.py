@@ -0,0 +1,114 @@
+"""
+Idempotent form submission helper for KPA Forms API
+
+A client sends the same ``Idempotency-Key`` header on every retry of one
+submission. The key is stored on the row under a unique constraint, so the
+insert itself decides which request wins: a retry (or a concurrent
+duplicate) fails the constraint and gets the originally stored row back
+instead of creating a second one. Reusing a key with a different payload is
+rejected.
+
+Partitioned form tables (``FORM_PARTITIONING_ENABLED``) cannot carry those
+unique constraints, so there each key is claimed with a transaction-scoped
+advisory lock and looked up before the insert instead.
+
+With ``IDEMPOTENCY_DERIVE_FROM_FORM_NUMBER`` set, submissions without a
+header use ``form:<form_number>`` as their key, which makes form numbers
+unique per form type.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connections, transaction
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyReused(Exception):
+    """Raised when a key is sent again with a different payload"""
+
+
+def get_idempotency_key(request, values):
+    """
+    Return the idempotency key for a submission: the header if present,
+    else one derived from ``form_number`` when that is enabled, else None.
+
+    Raises ValueError for an empty or oversized header.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is not None:
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValueError(f"{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters")
+        return key
+    if settings.IDEMPOTENCY_DERIVE_FROM_FORM_NUMBER and values.get('form_number'):
+        return f"form:{values['form_number']}"
+    return None
+
+
+def payload_fingerprint(values):
+    """Stable hash of normalized form values, to detect key reuse"""
+    raw = json.dumps(values, sort_keys=True, separators=(',', ':'), cls=DjangoJSONEncoder)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def save_idempotent(instance, key, values):
+    """
+    Save ``instance`` (built from normalized ``values``) under ``key`` and
+    return ``(row, replayed)``.
+
+    If the key already exists the insert fails on the unique constraint and
+    the stored row is returned with ``replayed=True``; nothing is read before
+    the insert, so concurrent duplicates cannot both succeed. Without a key
+    this is a plain save().
+
+    Raises IdempotencyKeyReused if the stored row was created from a
+    different payload.
+    """
+    if key is None:
+        instance.save()
+        return instance, False
+
+    instance.idempotency_key = key
+    instance.idempotency_fingerprint = payload_fingerprint(values)
+    if settings.FORM_PARTITIONING_ENABLED:
+        return save_locked(instance, key)
+    try:
+        # Savepoint so a conflict leaves any outer transaction usable
+        with transaction.atomic():
+            instance.save()
+        return instance, False
+    except IntegrityError:
+        stored = type(instance).objects.filter(idempotency_key=key).first()
+        if stored is None:
+            raise
+    if stored.idempotency_fingerprint != instance.idempotency_fingerprint:
+        raise IdempotencyKeyReused(f"{IDEMPOTENCY_HEADER} '{key}' was already used for a different submission")
+    return stored, True
+
+
+def save_locked(instance, key):
+    """
+    save_idempotent without a unique constraint: concurrent requests with
+    the same key queue on an advisory lock held until commit, so the lookup
+    sees any row a previous holder inserted.
+    """
+    model = type(instance)
+    with transaction.atomic():
+        connection = connections[model.objects.db]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))', [f'{model._meta.db_table}:{key}']
+                )
+        stored = model.objects.filter(idempotency_key=key).first()
+        if stored is None:
+            instance.save()
+            return instance, False
+    if stored.idempotency_fingerprint != instance.idempotency_fingerprint:
+        raise IdempotencyKeyReused(f"{IDEMPOTENCY_HEADER} '{key}' was already used for a different submission")
+    return stored, True
@@ -0,0 +1,347 @@
+"""
+Write-behind ingestion queue helper for KPA Forms API
+
+With ``INGEST_QUEUE_ENABLED`` the bogie checksheet and wheel specification
+POST views validate the payload, append it to a local SQLite queue
+(``INGEST_QUEUE_PATH``, WAL mode, fsynced on every commit) and answer 202
+with a receipt id instead of inserting the row themselves. The
+``drain_ingest_queue`` command claims queued entries in batches and
+bulk-inserts them; ``GET /api/forms/submissions/<receipt>`` reports each
+entry's status (queued, processing, saved, replayed or failed).
+
+Every entry is inserted under an idempotency key: the client's, or
+``receipt:<receipt>`` for submissions without one. A drainer that dies
+after committing a batch but before recording it therefore only replays
+the batch when the entries are requeued, never inserts it twice.
+
+When ``INGEST_QUEUE_MAX_DEPTH`` entries are waiting, enqueue raises
+QueueFull and the views answer 503 with Retry-After.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from itertools import groupby
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.db import DataError, IntegrityError, transaction
+from django.dispatch import receiver
+
+from ..models import WheelSpecification
+from .bogie_status import record_bogie_status, save_bogie_checksheet
+from .form_schema import BOGIE_CHECKSHEET_SCHEMA, WHEEL_SPECIFICATION_SCHEMA
+from .idempotency import IDEMPOTENCY_HEADER, IdempotencyKeyReused, payload_fingerprint, save_idempotent
+from .list_cache import bump_list_cache_version
+from .sync import supersede_older_submissions
+
+QUEUED, PROCESSING, SAVED, REPLAYED, FAILED = 'queued', 'processing', 'saved', 'replayed', 'failed'
+FINISHED = (SAVED, REPLAYED, FAILED)
+
+INGEST_FORMS = {
+    'bogie-checksheet': BOGIE_CHECKSHEET_SCHEMA,
+    'wheel-specification': WHEEL_SPECIFICATION_SCHEMA,
+}
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    receipt TEXT NOT NULL UNIQUE,
+    form TEXT NOT NULL,
+    form_number TEXT,
+    idempotency_key TEXT,
+    fingerprint TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    row_id INTEGER,
+    error TEXT,
+    queued_at REAL NOT NULL,
+    claimed_at REAL,
+    processed_at REAL
+);
+CREATE INDEX IF NOT EXISTS entries_status_idx ON entries (status, id);
+CREATE INDEX IF NOT EXISTS entries_key_idx ON entries (form, idempotency_key);
+"""
+
+
+class QueueFull(Exception):
+    """Raised when INGEST_QUEUE_MAX_DEPTH entries are already waiting"""
+
+
+class IngestQueue:
+    """The SQLite queue file; one connection per thread"""
+
+    def __init__(self, path, max_depth):
+        self.path = Path(path)
+        self.max_depth = max_depth
+        self._local = threading.local()
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit; transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            # FULL: a 202 is only sent once the entry is on disk
+            conn.execute('PRAGMA synchronous=FULL')
+            conn.executescript(SCHEMA_SQL)
+            self._local.conn = conn
+        return conn
+
+    def transaction(self):
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        return conn
+
+    def depth(self):
+        return self.connection().execute(
+            'SELECT count(*) FROM entries WHERE status IN (?, ?)', (QUEUED, PROCESSING)
+        ).fetchone()[0]
+
+    def enqueue(self, form, values, key):
+        """
+        Append a validated submission and return its receipt. A key already
+        in the queue returns that entry's receipt (IdempotencyKeyReused if
+        the payload differs).
+        """
+        fingerprint = payload_fingerprint(values)
+        conn = self.transaction()
+        try:
+            if key is not None:
+                existing = conn.execute(
+                    'SELECT receipt, fingerprint FROM entries WHERE form = ? AND idempotency_key = ? ORDER BY id DESC LIMIT 1',
+                    (form, key),
+                ).fetchone()
+                if existing is not None:
+                    conn.execute('COMMIT')
+                    if existing['fingerprint'] != fingerprint:
+                        raise IdempotencyKeyReused(f"{IDEMPOTENCY_HEADER} '{key}' was already used for a different submission")
+                    return existing['receipt']
+            depth = conn.execute(
+                'SELECT count(*) FROM entries WHERE status IN (?, ?)', (QUEUED, PROCESSING)
+            ).fetchone()[0]
+            if depth >= self.max_depth:
+                raise QueueFull(f"Submission queue is full ({depth} entries waiting)")
+            receipt = uuid.uuid4().hex
+            conn.execute(
+                'INSERT INTO entries (receipt, form, form_number, idempotency_key, fingerprint, payload, status, queued_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (receipt, form, values.get('form_number'), key, fingerprint,
+                 json.dumps(values, cls=DjangoJSONEncoder), QUEUED, time.time()),
+            )
+            conn.execute('COMMIT')
+            return receipt
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+
+    def claim(self, limit):
+        """Mark up to ``limit`` of the oldest queued entries as processing and return them"""
+        conn = self.transaction()
+        try:
+            entries = conn.execute(
+                'SELECT id, receipt, form, idempotency_key, payload FROM entries WHERE status = ? ORDER BY id LIMIT ?',
+                (QUEUED, limit),
+            ).fetchall()
+            conn.executemany(
+                'UPDATE entries SET status = ?, claimed_at = ? WHERE id = ?',
+                [(PROCESSING, time.time(), entry['id']) for entry in entries],
+            )
+            conn.execute('COMMIT')
+            return entries
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def complete(self, results):
+        """Record ``(entry id, status, row id, error)`` results"""
+        now = time.time()
+        conn = self.transaction()
+        conn.executemany(
+            'UPDATE entries SET status = ?, row_id = ?, error = ?, processed_at = ? WHERE id = ?',
+            [(entry_status, row_id, error, now, entry_id) for entry_id, entry_status, row_id, error in results],
+        )
+        conn.execute('COMMIT')
+
+    def requeue(self, entry_ids=None, claimed_before=None):
+        """Return processing entries (the given ones, or those claimed before a time) to the queue"""
+        conn = self.transaction()
+        if entry_ids is not None:
+            cursor = conn.executemany(
+                'UPDATE entries SET status = ?, claimed_at = NULL WHERE id = ? AND status = ?',
+                [(QUEUED, entry_id, PROCESSING) for entry_id in entry_ids],
+            )
+        else:
+            cursor = conn.execute(
+                'UPDATE entries SET status = ?, claimed_at = NULL WHERE status = ? AND claimed_at < ?',
+                (QUEUED, PROCESSING, claimed_before),
+            )
+        conn.execute('COMMIT')
+        return cursor.rowcount
+
+    def purge(self, processed_before):
+        """Delete finished entries processed before ``processed_before``; returns the count"""
+        conn = self.transaction()
+        deleted = conn.execute(
+            f"DELETE FROM entries WHERE status IN ({', '.join('?' * len(FINISHED))}) AND processed_at < ?",
+            (*FINISHED, processed_before),
+        ).rowcount
+        conn.execute('COMMIT')
+        return deleted
+
+    def status(self, receipt):
+        """The entry for ``receipt`` as a dict, or None"""
+        row = self.connection().execute(
+            'SELECT receipt, form, form_number, status, row_id, error, queued_at, processed_at FROM entries WHERE receipt = ?',
+            (receipt,),
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+
+_ingest_queue = None
+_ingest_queue_lock = threading.Lock()
+
+
+def get_ingest_queue():
+    """Return the queue at INGEST_QUEUE_PATH"""
+    global _ingest_queue
+    if _ingest_queue is None:
+        with _ingest_queue_lock:
+            if _ingest_queue is None:
+                _ingest_queue = IngestQueue(settings.INGEST_QUEUE_PATH, settings.INGEST_QUEUE_MAX_DEPTH)
+    return _ingest_queue
+
+
+@receiver(setting_changed)
+def reset_ingest_queue(setting, **kwargs):
+    global _ingest_queue
+    if setting.startswith('INGEST_QUEUE_'):
+        _ingest_queue = None
+
+
+def timestamp(value):
+    return datetime.fromtimestamp(value, tz=dt_timezone.utc) if value is not None else None
+
+
+def decode_values(schema, payload):
+    """Column values of a queued payload, converted back to their Python types"""
+    values = json.loads(payload)
+    return {column: schema.model._meta.get_field(column).to_python(value) for column, value in values.items()}
+
+
+def entry_key(entry):
+    return entry['idempotency_key'] or f"receipt:{entry['receipt']}"
+
+
+def drain_batch(queue, batch_size):
+    """
+    Claim up to ``batch_size`` entries, insert them and record the results.
+    Returns the number of entries processed. On an unexpected error the
+    claimed entries are returned to the queue and the error re-raised.
+    """
+    entries = queue.claim(batch_size)
+    if not entries:
+        return 0
+    results = []
+    try:
+        for form, group in groupby(sorted(entries, key=lambda entry: (entry['form'], entry['id'])), key=lambda entry: entry['form']):
+            results.extend(insert_entries(form, list(group)))
+    except Exception:
+        queue.requeue([entry['id'] for entry in entries])
+        raise
+    queue.complete(results)
+    return len(entries)
+
+
+def insert_entries(form, entries):
+    """
+    Insert one form's entries with bulk_create in a single transaction.
+    If the batch is rejected (a key inserted meanwhile by a direct POST, or
+    a value the database refuses) or the tables are partitioned (no unique
+    keys), fall back to one save_idempotent per entry so only the offending
+    entries fail.
+    """
+    schema = INGEST_FORMS[form]
+    if not settings.FORM_PARTITIONING_ENABLED:
+        try:
+            return bulk_insert(schema, entries)
+        except (IntegrityError, DataError):
+            pass
+    return [insert_one(schema, entry) for entry in entries]
+
+
+def bulk_insert(schema, entries):
+    model = schema.model
+    keys = [entry_key(entry) for entry in entries]
+    with transaction.atomic():
+        stored = {
+            row.idempotency_key: row
+            for row in model.objects.filter(idempotency_key__in=keys).only('id', 'idempotency_key', 'idempotency_fingerprint')
+        }
+        pending = {}
+        instances = []
+        outcomes = []
+        for entry, key in zip(entries, keys):
+            values = decode_values(schema, entry['payload'])
+            fingerprint = payload_fingerprint(values)
+            existing = stored.get(key) or pending.get(key)
+            if existing is not None:
+                outcomes.append((entry, existing, fingerprint))
+                continue
+            instance = schema.build(values)
+            instance.idempotency_key = key
+            instance.idempotency_fingerprint = fingerprint
+            if model is WheelSpecification:
+                # bulk_create bypasses save(), so fill the numeric columns here
+                instance.populate_measurements()
+            pending[key] = instance
+            instances.append(instance)
+            outcomes.append((entry, instance, None))
+
+        model.objects.bulk_create(instances, batch_size=settings.BULK_CREATE_BATCH_SIZE)
+        after_insert(model, instances)
+
+    results = []
+    for entry, row, fingerprint in outcomes:
+        if fingerprint is None:
+            results.append((entry['id'], SAVED, row.id, None))
+        elif fingerprint != row.idempotency_fingerprint:
+            results.append((entry['id'], FAILED, None, f"{IDEMPOTENCY_HEADER} '{entry_key(entry)}' was already used for a different submission"))
+        else:
+            results.append((entry['id'], REPLAYED, row.id, None))
+    return results
+
+
+def after_insert(model, instances):
+    """The side effects the POST views run for newly inserted rows"""
+    if not instances:
+        return
+    if model is WheelSpecification:
+        supersede_older_submissions(instance.form_number for instance in instances)
+        transaction.on_commit(lambda: bump_list_cache_version(model._meta.label_lower))
+    else:
+        for instance in instances:
+            record_bogie_status(instance)
+
+
+def insert_one(schema, entry):
+    values = decode_values(schema, entry['payload'])
+    instance = schema.build(values)
+    try:
+        with transaction.atomic():
+            if schema.model is WheelSpecification:
+                row, replayed = save_idempotent(instance, entry_key(entry), values)
+                if not replayed:
+                    after_insert(schema.model, [row])
+            else:
+                row, replayed = save_bogie_checksheet(instance, entry_key(entry), values)
+    except (IdempotencyKeyReused, IntegrityError, DataError) as e:
+        return entry['id'], FAILED, None, str(e)
+    return entry['id'], REPLAYED if replayed else SAVED, row.id, None
@@ -0,0 +1,228 @@
+"""
+Versioned response cache for the KPA Forms API list endpoints.
+
+Rendered list responses are cached under a key built from the model's
+current version and the normalized filter set. Writers bump the version
+after commit, which orphans every cached response for that model at once,
+so a new submission is never followed by a stale read.
+
+Backends:
+  - ``local``: in-process LRU with TTL and entry/byte-size eviction
+  - ``django``: Django's cache framework (``LIST_CACHE_DJANGO_ALIAS``)
+
+The version counter always lives in Django's cache framework, in
+``CACHES[LIST_CACHE_DJANGO_ALIAS]``. It must be shared by every worker
+(Redis, Memcached, database, file-based) so a write in one worker
+invalidates reads in all of them: a process-local alias (LocMemCache,
+DummyCache) raises ImproperlyConfigured. ``local`` entries may stay per
+process because their keys carry the shared version.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .filters import normalize_params
+
+# Cache backends that cannot share the version counter between workers
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class CacheStats:
+    """Thread-safe hit/miss/eviction counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def record(self, hits=0, misses=0, evictions=0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+
+    def as_dict(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+class LocalLRUBackend:
+    """In-process LRU cache of bytes with TTL and entry/size-based eviction"""
+
+    def __init__(self, stats, ttl, max_entries, max_bytes):
+        self.stats = stats
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.stats.record(evictions=1)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._size += len(value)
+            evicted = 0
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                evicted += 1
+        if evicted:
+            self.stats.record(evictions=evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+
+class DjangoCacheBackend:
+    """Adapter over a Django cache alias; eviction is left to that backend"""
+
+    def __init__(self, stats, ttl, alias):
+        self.stats = stats
+        self.ttl = ttl
+        self.alias = alias
+
+    def get(self, key):
+        return caches[self.alias].get(key)
+
+    def set(self, key, value):
+        caches[self.alias].set(key, value, timeout=self.ttl)
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+class VersionedListCache:
+    """Response cache keyed on (model version, normalized filters)"""
+
+    def __init__(self, backend, stats, version_alias, namespace='forms_api:list'):
+        self.backend = backend
+        self.stats = stats
+        self.version_alias = version_alias
+        self.namespace = namespace
+
+    def _version_key(self, model_label):
+        return f"{self.namespace}:version:{model_label}"
+
+    def current_version(self, model_label):
+        version_cache = caches[self.version_alias]
+        key = self._version_key(model_label)
+        version = version_cache.get(key)
+        if version is None:
+            version_cache.add(key, 1, timeout=None)
+            version = version_cache.get(key, 1)
+        return version
+
+    def bump(self, model_label):
+        version_cache = caches[self.version_alias]
+        key = self._version_key(model_label)
+        try:
+            return version_cache.incr(key)
+        except ValueError:
+            # Counter missing or evicted: any fresh value invalidates old keys
+            version = time.time_ns()
+            version_cache.set(key, version, timeout=None)
+            return version
+
+    def make_key(self, model_label, params):
+        digest = hashlib.sha1(normalize_params(params).encode()).hexdigest()
+        return f"{self.namespace}:{model_label}:v{self.current_version(model_label)}:{digest}"
+
+    def get(self, key):
+        value = self.backend.get(key)
+        if value is None:
+            self.stats.record(misses=1)
+        else:
+            self.stats.record(hits=1)
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+
+_list_cache = None
+_list_cache_lock = threading.Lock()
+
+
+def get_list_cache():
+    """Return the configured list cache, or None when LIST_CACHE_BACKEND is 'none'"""
+    global _list_cache
+    if settings.LIST_CACHE_BACKEND == 'none':
+        return None
+    if _list_cache is None:
+        with _list_cache_lock:
+            if _list_cache is None:
+                _list_cache = build_list_cache()
+    return _list_cache
+
+
+def build_list_cache():
+    """Build a VersionedListCache from settings"""
+    alias = settings.LIST_CACHE_DJANGO_ALIAS
+    if isinstance(caches[alias], PROCESS_LOCAL_CACHES):
+        raise ImproperlyConfigured(
+            f"LIST_CACHE_BACKEND='{settings.LIST_CACHE_BACKEND}' needs a cache shared by all workers for its "
+            f"version counter, but CACHES['{alias}'] is {type(caches[alias]).__name__}; a write would only "
+            "invalidate the worker that handled it. Set CACHE_BACKEND/CACHE_LOCATION to Redis, Memcached, "
+            "a database or a file-based cache."
+        )
+    stats = CacheStats()
+    if settings.LIST_CACHE_BACKEND == 'local':
+        backend = LocalLRUBackend(
+            stats,
+            ttl=settings.LIST_CACHE_TTL,
+            max_entries=settings.LIST_CACHE_MAX_ENTRIES,
+            max_bytes=settings.LIST_CACHE_MAX_BYTES,
+        )
+    elif settings.LIST_CACHE_BACKEND == 'django':
+        backend = DjangoCacheBackend(stats, ttl=settings.LIST_CACHE_TTL, alias=settings.LIST_CACHE_DJANGO_ALIAS)
+    else:
+        raise ValueError(f"Unknown LIST_CACHE_BACKEND '{settings.LIST_CACHE_BACKEND}'")
+    return VersionedListCache(backend, stats, version_alias=settings.LIST_CACHE_DJANGO_ALIAS)
+
+
+def bump_list_cache_version(model_label):
+    """Invalidate cached list responses for ``model_label``"""
+    list_cache = get_list_cache()
+    if list_cache is not None:
+        list_cache.bump(model_label)
+
+
+@receiver(setting_changed)
+def reset_list_cache(setting, **kwargs):
+    global _list_cache
+    if setting.startswith('LIST_CACHE_') or setting == 'CACHES':
+        _list_cache = None
@@ -0,0 +1,58 @@
+"""
+Measurement parsing helper for KPA Forms API
+"""
+import re
+from decimal import Decimal, ROUND_HALF_UP
+
+# Leading nominal value of a measurement string, e.g. "915 (900-1000)" -> 915,
+# "130.043 TO 130.068" -> 130.043. The same pattern is used by the backfill
+# migration in SQL, so both paths parse identically.
+MEASUREMENT_PATTERN = r'^\s*([+-]?[0-9]{1,9}(?:\.[0-9]+)?)(?![0-9])'
+MEASUREMENT_RE = re.compile(MEASUREMENT_PATTERN)
+
+MEASUREMENT_QUANTUM = Decimal('0.001')
+
+# Text column -> numeric (mm) shadow column
+MEASUREMENT_FIELDS = {
+    'tread_diameter_new': 'tread_diameter_new_mm',
+    'last_shop_issue_size': 'last_shop_issue_size_mm',
+    'condemning_dia': 'condemning_dia_mm',
+    'wheel_gauge': 'wheel_gauge_mm',
+    'variation_same_axle': 'variation_same_axle_mm',
+    'variation_same_bogie': 'variation_same_bogie_mm',
+    'variation_same_coach': 'variation_same_coach_mm',
+    'bearing_seat_diameter': 'bearing_seat_diameter_mm',
+    'roller_bearing_outer_dia': 'roller_bearing_outer_dia_mm',
+    'roller_bearing_bore_dia': 'roller_bearing_bore_dia_mm',
+    'roller_bearing_width': 'roller_bearing_width_mm',
+    'axle_box_housing_bore_dia': 'axle_box_housing_bore_dia_mm',
+    'wheel_disc_width': 'wheel_disc_width_mm',
+}
+
+# Range filter query parameter prefix -> numeric column,
+# e.g. treadDiameterMin / treadDiameterMax
+MEASUREMENT_RANGE_FILTERS = {
+    'treadDiameter': 'tread_diameter_new_mm',
+    'lastShopIssueSize': 'last_shop_issue_size_mm',
+    'condemningDia': 'condemning_dia_mm',
+    'wheelGauge': 'wheel_gauge_mm',
+    'variationSameAxle': 'variation_same_axle_mm',
+    'variationSameBogie': 'variation_same_bogie_mm',
+    'variationSameCoach': 'variation_same_coach_mm',
+    'bearingSeatDiameter': 'bearing_seat_diameter_mm',
+    'rollerBearingOuterDia': 'roller_bearing_outer_dia_mm',
+    'rollerBearingBoreDia': 'roller_bearing_bore_dia_mm',
+    'rollerBearingWidth': 'roller_bearing_width_mm',
+    'axleBoxHousingBoreDia': 'axle_box_housing_bore_dia_mm',
+    'wheelDiscWidth': 'wheel_disc_width_mm',
+}
+
+
+def parse_measurement(value):
+    """Return the leading numeric value of a measurement string in mm, or None"""
+    if not value:
+        return None
+    match = MEASUREMENT_RE.match(str(value))
+    if not match:
+        return None
+    return Decimal(match.group(1)).quantize(MEASUREMENT_QUANTUM, rounding=ROUND_HALF_UP)
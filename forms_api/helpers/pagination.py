@@ -0,0 +1,122 @@
+"""
+Keyset pagination helper for KPA Forms API
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client supplies a cursor that cannot be decoded"""
+
+
+def encode_cursor(created_at, pk):
+    """Encode a (created_at, id) position as an opaque URL-safe cursor"""
+    raw = json.dumps([created_at.isoformat(), pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor back into (created_at, id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def parse_limit(value, default, maximum):
+    """Parse the ``limit`` query parameter, clamped to [1, maximum]"""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid limit: {value}")
+    return max(1, min(limit, maximum))
+
+
+def keyset_queryset(queryset, cursor, limit):
+    """
+    Order ``queryset`` on (created_at, id), seek past ``cursor`` and slice
+    ``limit + 1`` rows, so the caller can tell whether another page exists.
+    """
+    queryset = queryset.order_by('created_at', 'id')
+    if cursor:
+        queryset = seek(queryset, *decode_cursor(cursor))
+    return queryset[:limit + 1]
+
+
+def seek(queryset, created_at, pk):
+    """Rows after (created_at, id)"""
+    # The plain lower bound lets PostgreSQL prune partitioned tables
+    return queryset.filter(created_at__gte=created_at).filter(Q(created_at__gt=created_at) | Q(id__gt=pk))
+
+
+def split_page(rows, limit):
+    """Trim the look-ahead row from a fetched page and return (rows, next cursor)"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
+
+
+def keyset_page(queryset, cursor, limit):
+    """
+    Return one page of ``queryset`` ordered on (created_at, id) and the cursor
+    for the next page (None on the last page). Only ``limit + 1`` rows are
+    fetched regardless of how many rows match.
+    """
+    return split_page(list(keyset_queryset(queryset, cursor, limit)), limit)
+
+
+async def akeyset_page(queryset, cursor, limit):
+    """Async version of keyset_page using the async ORM"""
+    return split_page([row async for row in keyset_queryset(queryset, cursor, limit)], limit)
+
+
+def split_values_page(rows, limit):
+    """split_page for values_list rows ending in (created_at, id)"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][-2], rows[-1][-1])
+    return rows, next_cursor
+
+
+def keyset_values_page(queryset, cursor, limit, columns):
+    """
+    keyset_page returning ``values_list`` tuples of ``columns`` followed by
+    created_at and id, without building model instances.
+    """
+    rows = list(keyset_queryset(queryset, cursor, limit).values_list(*columns, 'created_at', 'id'))
+    return split_values_page(rows, limit)
+
+
+async def akeyset_values_page(queryset, cursor, limit, columns):
+    """Async version of keyset_values_page using the async ORM"""
+    page = keyset_queryset(queryset, cursor, limit).values_list(*columns, 'created_at', 'id')
+    return split_values_page([row async for row in page], limit)
+
+
+async def aiterate_values(queryset, columns, chunk_size):
+    """
+    Async iterator over ``values_list`` tuples of ``columns`` followed by
+    created_at and id, in (created_at, id) order, fetching one keyset page
+    of ``chunk_size`` rows per query. Used instead of aiterator(), which
+    runs values_list queries synchronously.
+    """
+    queryset = queryset.order_by('created_at', 'id').values_list(*columns, 'created_at', 'id')
+    page = queryset
+    while True:
+        rows = [row async for row in page[:chunk_size]]
+        for row in rows:
+            yield row
+        if len(rows) < chunk_size:
+            return
+        page = seek(queryset, rows[-1][-2], rows[-1][-1])
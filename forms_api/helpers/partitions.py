@@ -0,0 +1,183 @@
+"""
+Monthly partitioning helper for KPA Forms API (PostgreSQL)
+
+With ``FORM_PARTITIONING_ENABLED``, ``forms_api_bogiechecksheet`` and
+``forms_api_wheelspecification`` can be converted to tables partitioned by
+RANGE on ``created_at``, one partition per calendar month (UTC), named
+``<table>_pYYYYMM``, plus a ``<table>_default`` partition that catches rows
+outside every range. The ``partition_form_tables`` command converts the
+tables, pre-creates future partitions and detaches old ones. If the default
+partition already holds rows for a month being created, those rows are moved
+into the new partition while the default is detached.
+
+PostgreSQL only enforces uniqueness on a partitioned table if the partition
+key is part of the constraint, so after conversion:
+  - the primary key is (id, created_at); ids still come from one sequence
+  - the idempotency key unique constraints are replaced by plain indexes and
+    save_idempotent serializes each key with an advisory lock instead
+"""
+from datetime import date, datetime, timezone as dt_timezone
+
+PARTITIONED_TABLES = ('forms_api_bogiechecksheet', 'forms_api_wheelspecification')
+PARTITION_KEY = 'created_at'
+
+
+def month_start(value):
+    """First day of the month containing ``value`` (a date or datetime)"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    """The first day of the month ``count`` months after ``month``"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first, last):
+    """Months from ``first`` to ``last`` inclusive"""
+    month = month_start(first)
+    while month <= last:
+        yield month
+        month = add_months(month, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def partition_month(table, name):
+    """The month of a partition created by partition_name, else None"""
+    prefix = f'{table}_p'
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix):], '%Y%m').date()
+    except ValueError:
+        return None
+
+
+def month_bound(month):
+    """Partition bound literal for the start of ``month`` in UTC"""
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()
+
+
+def default_partition_name(table):
+    return f'{table}_default'
+
+
+def month_condition(month):
+    """WHERE condition selecting the rows of ``month``"""
+    return (
+        f"{PARTITION_KEY} >= '{month_bound(month)}' AND {PARTITION_KEY} < '{month_bound(add_months(month, 1))}'"
+    )
+
+
+def create_partition_sql(table, month):
+    return (
+        f'CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} '
+        f"FOR VALUES FROM ('{month_bound(month)}') TO ('{month_bound(add_months(month, 1))}')"
+    )
+
+
+def add_partition_statements(table, months, overlapping, columns):
+    """
+    SQL creating the partitions for ``months``. PostgreSQL refuses to create
+    a partition while the default partition holds rows in its range, so when
+    ``overlapping`` (the months with such rows) is not empty the default is
+    detached, those rows are moved into their new partitions and the default
+    is attached again. ``columns`` is the insert column list (insert_columns).
+    """
+    statements = [create_partition_sql(table, month) for month in months]
+    if not overlapping:
+        return statements
+    default = default_partition_name(table)
+    statements.insert(0, f'ALTER TABLE {table} DETACH PARTITION {default}')
+    for month in overlapping:
+        statements += [
+            f'INSERT INTO {partition_name(table, month)} ({columns}) '
+            f'SELECT {columns} FROM {default} WHERE {month_condition(month)}',
+            f'DELETE FROM {default} WHERE {month_condition(month)}',
+        ]
+    statements.append(f'ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT')
+    return statements
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT c.relkind = 'p' FROM pg_class c WHERE c.oid = to_regclass(%s)", [table]
+    )
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def list_partitions(cursor, table):
+    """Names of the partitions currently attached to ``table``"""
+    cursor.execute(
+        'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+        'WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname',
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def default_rows(cursor, table, month):
+    """Rows of ``month`` held by the default partition"""
+    cursor.execute(f'SELECT count(*) FROM {default_partition_name(table)} WHERE {month_condition(month)}')
+    return cursor.fetchone()[0]
+
+
+def insert_columns(cursor, table):
+    """Quoted, comma-separated columns to copy rows with; generated columns are recomputed on insert"""
+    cursor.execute(
+        'SELECT attname FROM pg_attribute WHERE attrelid = to_regclass(%s) '
+        "AND attnum > 0 AND NOT attisdropped AND attgenerated = '' ORDER BY attnum",
+        [table],
+    )
+    return ', '.join(f'"{row[0]}"' for row in cursor.fetchall())
+
+
+def convert_statements(cursor, table, months_ahead, today):
+    """
+    SQL converting ``table`` into a monthly partitioned table, covering every
+    existing row and ``months_ahead`` months after ``today``. Run it in one
+    transaction: the original table is locked, copied and dropped.
+    """
+    cursor.execute(f'SELECT min({PARTITION_KEY}), max(id) FROM {table}')
+    oldest, max_id = cursor.fetchone()
+    cursor.execute(
+        'SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s ORDER BY indexname', [table]
+    )
+    indexes = cursor.fetchall()
+
+    old = f'{table}_unpartitioned'
+    sequence = f'{table}_part_id_seq'
+    statements = [
+        f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE',
+        f'ALTER TABLE {table} RENAME TO {old}',
+        # Identity columns are not supported on partitioned tables before
+        # PostgreSQL 17, so ids come from a plain sequence default
+        f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE) '
+        f'PARTITION BY RANGE ({PARTITION_KEY})',
+        f'CREATE SEQUENCE {sequence} OWNED BY {table}.id',
+        f"SELECT setval('{sequence}', {(max_id or 0) + 1}, false)",
+        f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{sequence}')",
+    ]
+    for month in month_range(oldest or today, add_months(month_start(today), months_ahead)):
+        statements.append(create_partition_sql(table, month))
+    statements.append(f'CREATE TABLE {default_partition_name(table)} PARTITION OF {table} DEFAULT')
+
+    columns = insert_columns(cursor, table)
+    statements += [
+        f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {old}',
+        f'DROP TABLE {old}',
+        f'ALTER TABLE {table} ADD PRIMARY KEY (id, {PARTITION_KEY})',
+    ]
+    for name, definition in indexes:
+        if definition.startswith('CREATE UNIQUE INDEX'):
+            if name == f'{table}_pkey':
+                continue
+            # Unique constraints must include the partition key; keep the
+            # lookup index and enforce uniqueness in save_idempotent
+            definition = definition.replace('CREATE UNIQUE INDEX', 'CREATE INDEX', 1)
+        statements.append(definition)
+    return statements
@@ -0,0 +1,54 @@
+"""
+JSON rendering helper for KPA Forms API
+
+FastJSONRenderer is DRF's JSONRenderer with the encoding done by orjson,
+which serializes dicts, lists, strings, dates and datetimes in C instead of
+walking them with the stdlib encoder. The output matches JSONRenderer:
+compact separators, UTF-8 rather than \\u escapes (except U+2028 and
+U+2029, which are escaped), ``Z`` for UTC datetimes and Decimals as
+numbers. Without orjson installed, and for indented (browsable or
+``; indent=``) responses, it falls back to JSONRenderer.
+"""
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: rendering falls back to the stdlib encoder
+    orjson = None
+
+_drf_encoder = JSONEncoder()
+
+LINE_SEPARATOR = '\u2028'.encode('utf-8')
+PARAGRAPH_SEPARATOR = '\u2029'.encode('utf-8')
+
+
+def encode_default(value):
+    """Types orjson does not handle natively, encoded the way DRF's JSONEncoder does"""
+    if isinstance(value, Decimal):
+        return float(value)
+    return _drf_encoder.default(value)
+
+
+def dumps(data):
+    """Encode ``data`` to JSON bytes with orjson when available"""
+    if orjson is None:
+        return JSONRenderer().render(data)
+    content = orjson.dumps(data, default=encode_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    # Escape the line and paragraph separators like JSONRenderer, so the output stays valid JavaScript
+    if LINE_SEPARATOR in content or PARAGRAPH_SEPARATOR in content:
+        content = content.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
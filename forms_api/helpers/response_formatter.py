@@ -1,13 +1,14 @@
 """
 Response formatter helper for KPA Forms API
 """
-from datetime import datetime
+from .form_schema import BOGIE_CHECKSHEET_SCHEMA, BOGIE_CONDITION_SECTIONS, WHEEL_SPECIFICATION_SCHEMA
+from .renderers import dumps
 
 def format_bogie_checksheet_response(bogie_checksheet):
     """Format the response for a bogie checksheet"""
     return {
         'data': {
-             "formNumber": "WHEEL-2025-002",
+            'formNumber': bogie_checksheet.form_number,
             'inspectionBy': bogie_checksheet.inspection_by,
             'inspectionDate': bogie_checksheet.inspection_date,
             'status': 'Saved'
@@ -16,49 +17,227 @@ def format_bogie_checksheet_response(bogie_checksheet):
         'success': True
     }
 
+def format_bogie_checksheet(checksheet, plan=None):
+    """Format a single bogie checksheet, limited to the projected fields in ``plan``"""
+    return dict(BOGIE_CHECKSHEET_SCHEMA.to_payload(checksheet, plan), id=checksheet.id)
+
+def format_bogie_checksheet_get_response(checksheets, plan=None, next_cursor=None):
+    """Format the response for listing bogie checksheets"""
+    return {
+        'data': [format_bogie_checksheet(checksheet, plan) for checksheet in checksheets],
+        'next': next_cursor,
+        'message': 'Filtered bogie checksheets fetched successfully.',
+        'success': True
+    }
+
+def format_bogie_checksheet_search_response(checksheets, plan=None, next_cursor=None):
+    """Format the response for a ranked bogie checksheet search"""
+    return {
+        'data': [
+            dict(format_bogie_checksheet(checksheet, plan), rank=checksheet.search_rank)
+            for checksheet in checksheets
+        ],
+        'next': next_cursor,
+        'message': 'Matching bogie checksheets fetched successfully.',
+        'success': True
+    }
+
+def format_bogie_checksheet_detail_response(checksheet, plan=None):
+    """Format the response for retrieving one bogie checksheet"""
+    return {
+        'data': format_bogie_checksheet(checksheet, plan),
+        'message': 'Bogie checksheet fetched successfully.',
+        'success': True
+    }
+
+def format_bogie_status(bogie_status):
+    """Format one bogie's latest status, with conditions grouped like the checksheet payload"""
+    formatted = {
+        'bogieNo': bogie_status.bogie_no,
+        'formNumber': bogie_status.form_number,
+        'checksheetId': bogie_status.checksheet_id,
+        'inspectionBy': bogie_status.inspection_by,
+        'inspectionDate': bogie_status.inspection_date,
+        'inspectedAt': bogie_status.inspected_at,
+        'defectiveCount': bogie_status.defective_count,
+        'deficitComponents': bogie_status.deficit_components,
+    }
+    for section in BOGIE_CONDITION_SECTIONS:
+        formatted[section] = {}
+    for field in BOGIE_CHECKSHEET_SCHEMA.fields:
+        if field.section in BOGIE_CONDITION_SECTIONS:
+            formatted[field.section][field.key] = getattr(bogie_status, field.column)
+    formatted['updatedAt'] = bogie_status.updated_at
+    return formatted
+
+def format_fleet_status_response(statuses, next_cursor=None):
+    """Format the response for the fleet status list"""
+    return {
+        'data': [format_bogie_status(bogie_status) for bogie_status in statuses],
+        'next': next_cursor,
+        'message': 'Fleet status fetched successfully.',
+        'success': True
+    }
+
 def format_wheel_specification_post_response(wheel_spec):
     """Format the response for a wheel specification post"""
     return {
         'data': {
-             "formNumber": "WHEEL-2025-002",
+            'formNumber': wheel_spec.form_number,
             'status': 'Saved',
-            "submittedBy": "user_id_122",
-            "submittedDate": "2025-08-04"
+            'submittedBy': wheel_spec.submitted_by,
+            'submittedDate': wheel_spec.submitted_date
         },
         'message': 'Wheel specification submitted successfully.',
         'success': True
     }
 
-def format_wheel_specification_get_response(wheel_specs):
+def format_submission_queued_response(receipt, form_number, form_name):
+    """Format the 202 response for a submission accepted into the ingestion queue"""
+    return {
+        'data': {
+            'receipt': receipt,
+            'formNumber': form_number,
+            'status': 'Queued'
+        },
+        'message': f'{form_name[:1].upper()}{form_name[1:]} queued for processing.',
+        'success': True
+    }
+
+def format_submission_status_response(entry, queued_at, processed_at):
+    """Format the status of one ingestion queue receipt"""
+    return {
+        'data': {
+            'receipt': entry['receipt'],
+            'form': entry['form'],
+            'formNumber': entry['form_number'],
+            'status': entry['status'],
+            'id': entry['row_id'],
+            'error': entry['error'],
+            'queuedAt': queued_at,
+            'processedAt': processed_at
+        },
+        'message': 'Submission status fetched successfully.',
+        'success': True
+    }
+
+def format_validation_error_response(errors, form_name):
+    """Format the response for a payload that failed schema validation"""
+    return {
+        'errors': errors,
+        'message': f'Invalid {form_name}: {"; ".join(errors)}',
+        'success': False
+    }
+
+def format_wheel_specification(spec):
+    """Format a single wheel specification for list responses"""
+    return WHEEL_SPECIFICATION_SCHEMA.to_payload(spec)
+
+def format_wheel_specification_get_response(wheel_specs, next_cursor=None):
     """Format the response for getting wheel specifications"""
-    formatted_specs = []
-    for spec in wheel_specs:
-        formatted_spec = {
-            'fields': {
-                'axleBoxHousingBoreDia': spec.axle_box_housing_bore_dia,
-                'bearingSeatDiameter': spec.bearing_seat_diameter,
-                'condemningDia': spec.condemning_dia,
-                'intermediateWWP': spec.intermediate_wwp,
-                'lastShopIssueSize': spec.last_shop_issue_size,
-                'rollerBearingBoreDia': spec.roller_bearing_bore_dia,
-                'rollerBearingOuterDia': spec.roller_bearing_outer_dia,
-                'rollerBearingWidth': spec.roller_bearing_width,
-                'treadDiameterNew': spec.tread_diameter_new,
-                'variationSameAxle': spec.variation_same_axle,
-                'variationSameBogie': spec.variation_same_bogie,
-                'variationSameCoach': spec.variation_same_coach,
-                'wheelDiscWidth': spec.wheel_disc_width,
-                'wheelGauge': spec.wheel_gauge,
-                'wheelProfile': spec.wheel_profile
-            },
-            'formNumber': spec.form_number,
-            'submittedBy': spec.submitted_by,
-            'submittedDate': spec.submitted_date
-        }
-        formatted_specs.append(formatted_spec)
+    formatted_specs = [format_wheel_specification(spec) for spec in wheel_specs]
     
     return {
         'data': formatted_specs,
+        'next': next_cursor,
+        'message': 'Filtered wheel specification forms fetched successfully.',
+        'success': True
+    }
+
+# values_list() columns for list rows, and the formatter for those tuples
+WHEEL_SPECIFICATION_COLUMNS, format_wheel_specification_row = WHEEL_SPECIFICATION_SCHEMA.row_formatter()
+
+def format_wheel_specification_rows_response(rows, next_cursor=None):
+    """format_wheel_specification_get_response for WHEEL_SPECIFICATION_COLUMNS tuples"""
+    return {
+        'data': [format_wheel_specification_row(row) for row in rows],
+        'next': next_cursor,
         'message': 'Filtered wheel specification forms fetched successfully.',
         'success': True
     }
+
+STREAM_HEAD = b'{"data":['
+STREAM_TAIL = b'],"next":null,"message":"Filtered wheel specification forms fetched successfully.","success":true}'
+
+def stream_wheel_specification_get_response(rows):
+    """
+    Yield the wheel specification list response as JSON chunks, one
+    WHEEL_SPECIFICATION_COLUMNS row at a time, so the full result set is
+    never held in memory.
+    """
+    yield STREAM_HEAD
+    separator = b''
+    for row in rows:
+        yield separator + dumps(format_wheel_specification_row(row))
+        separator = b','
+    yield STREAM_TAIL
+
+async def astream_wheel_specification_get_response(rows):
+    """Async version of stream_wheel_specification_get_response over an async iterator"""
+    yield STREAM_HEAD
+    separator = b''
+    async for row in rows:
+        yield separator + dumps(format_wheel_specification_row(row))
+        separator = b','
+    yield STREAM_TAIL
+
+def format_wheel_specification_sync_response(changes, tombstones, watermark, has_more):
+    """Format a delta sync page: changed rows, tombstones and the new watermark"""
+    return {
+        'data': {
+            'changes': [
+                dict(format_wheel_specification(spec), id=spec.id, updatedAt=spec.updated_at)
+                for spec in changes
+            ],
+            'tombstones': [
+                {'id': spec_id, 'formNumber': form_number, 'reason': reason, 'removedAt': removed_at}
+                for spec_id, form_number, reason, removed_at in tombstones
+            ],
+        },
+        'watermark': watermark,
+        'hasMore': has_more,
+        'message': 'Wheel specification changes fetched successfully.',
+        'success': True
+    }
+
+def format_wheel_specification_bulk_response(results, saved):
+    """Format the per-item response for a bulk wheel specification post"""
+    formatted_results = []
+    saved_count = 0
+    rejected_count = 0
+    for result in results:
+        if 'error' in result:
+            rejected_count += 1
+            formatted_results.append({
+                'index': result['index'],
+                'status': 'Rejected',
+                'error': result['error']
+            })
+            continue
+        
+        wheel_spec = result['instance']
+        if saved:
+            saved_count += 1
+        formatted_results.append({
+            'index': result['index'],
+            'status': 'Saved' if saved else 'Valid',
+            'id': wheel_spec.id,
+            'formNumber': wheel_spec.form_number,
+            'submittedBy': wheel_spec.submitted_by,
+            'submittedDate': wheel_spec.submitted_date
+        })
+    
+    if saved:
+        message = f'{saved_count} wheel specification(s) submitted successfully, {rejected_count} rejected.'
+    else:
+        message = f'Bulk submission rejected: {rejected_count} invalid wheel specification(s). Nothing was saved.'
+    
+    return {
+        'data': {
+            'results': formatted_results,
+            'saved': saved_count,
+            'rejected': rejected_count
+        },
+        'message': message,
+        'success': saved and rejected_count == 0
+    }
@@ -0,0 +1,107 @@
+"""
+Full-text search helper for KPA Forms API
+
+On PostgreSQL, ``forms_api_bogiechecksheet.search_vector`` is a stored
+generated ``tsvector`` (migration 0008) over ``deficit_components``
+(weight A) and the component condition fields, each prefixed with its
+component name (weight B), so "missing dust excluder" matches both a note
+reading "Dust excluder missing" and ``dust_excluder = 'MISSING'``. It is
+served by a GIN index and queried with ``websearch_to_tsquery`` (quoted
+phrases, ``or``, ``-word``), ranked with ``ts_rank_cd``.
+
+The column is not declared on the model, so other databases keep working:
+there every word of the query must appear (case-insensitively) in the
+notes or one of the condition fields, and results are unranked.
+"""
+import base64
+import json
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .filters import BOGIE_CONDITION_FILTERS
+from .pagination import InvalidCursor
+
+SEARCH_CONFIG = 'english'
+SEARCH_MAX_QUERY_LENGTH = 200
+
+SEARCH_VECTOR = '"forms_api_bogiechecksheet"."search_vector"'
+TSQUERY = 'websearch_to_tsquery(%s::regconfig, %s)'
+
+
+def parse_search_query(value):
+    """Validate the ``q`` query parameter"""
+    query = (value or '').strip()
+    if not query:
+        raise ValueError("Query parameter 'q' is required")
+    if len(query) > SEARCH_MAX_QUERY_LENGTH:
+        raise ValueError(f"Query parameter 'q' must be at most {SEARCH_MAX_QUERY_LENGTH} characters")
+    return query
+
+
+def search_bogie_checksheets(queryset, query):
+    """Filter ``queryset`` to rows matching ``query``, annotated with ``search_rank``"""
+    if connections[queryset.db].vendor == 'postgresql':
+        return full_text_search(queryset, query)
+    return substring_search(queryset, query)
+
+
+def full_text_search(queryset, query):
+    """Match against the generated ``search_vector`` column (PostgreSQL only)"""
+    params = (SEARCH_CONFIG, query)
+    return queryset.annotate(
+        search_rank=RawSQL(f'ts_rank_cd({SEARCH_VECTOR}, {TSQUERY})', params, output_field=FloatField())
+    ).filter(RawSQL(f'{SEARCH_VECTOR} @@ {TSQUERY}', params, output_field=BooleanField()))
+
+
+def substring_search(queryset, query):
+    """
+    Every word of ``query`` in the notes or a condition field, unranked. As
+    in the search vector, a word naming a component (e.g. "excluder")
+    matches any row where that component's condition is recorded.
+    """
+    model = queryset.model
+    for word in re.findall(r'\w+', query):
+        match = Q(deficit_components__icontains=word)
+        for column in BOGIE_CONDITION_FILTERS.values():
+            if word.lower() in model._meta.get_field(column).verbose_name.lower():
+                match |= Q(**{f'{column}__gt': ''})
+            else:
+                match |= Q(**{f'{column}__icontains': word})
+        queryset = queryset.filter(match)
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def encode_search_cursor(rank, pk):
+    """Encode a (rank, id) position as an opaque URL-safe cursor"""
+    raw = json.dumps([rank, pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_search_cursor(cursor):
+    """Decode a cursor produced by encode_search_cursor back into (rank, id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        rank, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(rank), int(pk)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def search_page(queryset, cursor, limit):
+    """
+    Return one page of a searched queryset, best match first (ties by id),
+    and the cursor for the next page (None on the last page).
+    """
+    queryset = queryset.order_by('-search_rank', 'id')
+    if cursor:
+        rank, pk = decode_search_cursor(cursor)
+        queryset = queryset.filter(Q(search_rank__lt=rank) | Q(search_rank=rank, id__gt=pk))
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(rows[-1].search_rank, rows[-1].id)
+    return rows, next_cursor
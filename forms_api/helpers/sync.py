@@ -0,0 +1,107 @@
+"""
+Delta sync helper for KPA Forms API
+
+Offline clients hold a watermark: an opaque token encoding their position in
+two ordered streams,
+  - wheel specification changes in (updated_at, id) order, and
+  - deletion tombstones in (deleted_at, id) order.
+
+Each sync call returns the next page of both streams after that position
+and a new watermark. Superseded rows (an older submission of a form number
+that has since been resubmitted) travel in the change stream but are
+returned as tombstones, so the client drops them.
+
+Rows written in the last ``SYNC_SETTLE_SECONDS`` are held back until the
+next call: a transaction that started earlier but commits later could
+otherwise land behind a watermark the client has already passed.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from ..models import WheelSpecification, WheelSpecificationTombstone
+from .pagination import InvalidCursor
+
+# Watermark before any data: both streams from the beginning
+INITIAL_POSITION = None
+
+
+def encode_watermark(changes, tombstones):
+    """Encode the (timestamp, id) positions of both streams as a URL-safe token"""
+    raw = json.dumps([encode_position(changes), encode_position(tombstones)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def encode_position(position):
+    return [position[0].isoformat(), position[1]] if position else None
+
+
+def decode_watermark(watermark):
+    """Decode a watermark back into (changes position, tombstones position)"""
+    if not watermark:
+        return INITIAL_POSITION, INITIAL_POSITION
+    try:
+        padded = watermark + '=' * (-len(watermark) % 4)
+        positions = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        changes, tombstones = (
+            (datetime.fromisoformat(position[0]), int(position[1])) if position else INITIAL_POSITION
+            for position in positions
+        )
+        return changes, tombstones
+    except (ValueError, TypeError, IndexError) as e:
+        raise InvalidCursor(f"Invalid watermark: {watermark}") from e
+
+
+def after(queryset, column, position):
+    """Rows strictly after ``position`` in (column, id) order"""
+    if position is None:
+        return queryset
+    value, pk = position
+    return queryset.filter(Q(**{f'{column}__gt': value}) | Q(**{column: value, 'id__gt': pk}))
+
+
+def supersede_older_submissions(form_numbers):
+    """
+    Mark every submission of ``form_numbers`` that has a newer submission
+    with the same form number as superseded, moving it into the sync feed.
+    """
+    newer = WheelSpecification.objects.filter(form_number=OuterRef('form_number'), id__gt=OuterRef('id'))
+    return WheelSpecification.objects.filter(
+        Exists(newer), form_number__in=set(form_numbers), superseded=False
+    ).update(superseded=True, updated_at=timezone.now())
+
+
+def sync_page(watermark, limit, settle_seconds):
+    """
+    Return (changes, tombstones, new watermark, has_more) for one sync call.
+
+    ``changes`` are current WheelSpecification rows; ``tombstones`` are
+    (id, form number, reason, timestamp) tuples for deleted or superseded
+    rows. Each stream contributes at most ``limit`` entries.
+    """
+    change_position, tombstone_position = decode_watermark(watermark)
+    horizon = timezone.now() - timedelta(seconds=settle_seconds)
+
+    rows = list(
+        after(WheelSpecification.objects.filter(updated_at__lt=horizon), 'updated_at', change_position)
+        .order_by('updated_at', 'id')[:limit + 1]
+    )
+    deleted = list(
+        after(WheelSpecificationTombstone.objects.filter(deleted_at__lt=horizon), 'deleted_at', tombstone_position)
+        .order_by('deleted_at', 'id')[:limit + 1]
+    )
+    has_more = len(rows) > limit or len(deleted) > limit
+    rows, deleted = rows[:limit], deleted[:limit]
+
+    if rows:
+        change_position = (rows[-1].updated_at, rows[-1].id)
+    if deleted:
+        tombstone_position = (deleted[-1].deleted_at, deleted[-1].id)
+
+    changes = [row for row in rows if not row.superseded]
+    tombstones = [(row.id, row.form_number, 'superseded', row.updated_at) for row in rows if row.superseded]
+    tombstones += [(tomb.spec_id, tomb.form_number, 'deleted', tomb.deleted_at) for tomb in deleted]
+    return changes, tombstones, encode_watermark(change_position, tombstone_position), has_more
@@ -0,0 +1,149 @@
+"""
+Move aged form rows into compressed, columnar archive files.
+
+Rows created before the start of the month ``--older-than-months`` ago are
+written, oldest first, to ``ARCHIVE_DIR/<table>/*.kpac`` files of at most
+``--rows-per-file`` rows, then deleted from the table. Whole months move at
+once, so on partitioned tables (partition_form_tables) the emptied
+partitions can then be detached and dropped.
+
+Each file is written and fsynced as ``*.kpac.pending`` before its rows are
+deleted and renamed afterwards; a run interrupted in between is completed
+by the next one, which deletes exactly the ids recorded in the file. Each
+committed batch bumps the model's list cache version, so cached list
+responses and ETags stop showing archived rows. Archived rows are read
+through the ``.../archive`` list endpoints. Deleting them does not record
+delta-sync tombstones.
+
+Usage:
+    python manage.py archive_form_rows --older-than-months 18 --vacuum
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from forms_api.helpers.archive import ARCHIVE_SUFFIX, PENDING_SUFFIX, ArchiveFile, archive_columns, archive_dir, write_archive
+from forms_api.helpers.filters import start_of_day
+from forms_api.helpers.list_cache import bump_list_cache_version
+from forms_api.helpers.partitions import add_months, month_start
+from forms_api.models import BogieChecksheet, WheelSpecification
+
+ARCHIVE_FORMS = {
+    'wheel': WheelSpecification,
+    'bogie': BogieChecksheet,
+}
+
+# Ids per DELETE when recovering a pending file (within SQLite's variable limit)
+RECOVER_DELETE_BATCH = 500
+
+
+def up_to(created_at, pk):
+    """Rows at or before (created_at, id)"""
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lte=pk)
+
+
+class Command(BaseCommand):
+    help = 'Move form rows older than ARCHIVE_AFTER_MONTHS into compressed columnar archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-months', type=int, default=settings.ARCHIVE_AFTER_MONTHS,
+                            help='Archive rows created before the start of the month this many months ago')
+        parser.add_argument('--forms', default=','.join(ARCHIVE_FORMS),
+                            help=f"Comma-separated forms to archive ({', '.join(ARCHIVE_FORMS)})")
+        parser.add_argument('--rows-per-file', type=int, default=settings.ARCHIVE_ROWS_PER_FILE,
+                            help='Maximum rows per archive file')
+        parser.add_argument('--vacuum', action='store_true', help='VACUUM (ANALYZE) each table afterwards (PostgreSQL)')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be archived')
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['forms'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in ARCHIVE_FORMS]
+        if unknown:
+            raise CommandError(f"Unknown forms: {', '.join(unknown)}. Available: {', '.join(ARCHIVE_FORMS)}")
+        if options['older_than_months'] < 1 or options['rows_per_file'] < 1:
+            raise CommandError('--older-than-months and --rows-per-file must be positive')
+
+        cutoff = start_of_day(add_months(month_start(timezone.localdate()), -options['older_than_months']))
+        self.stdout.write(f"Archiving rows created before {cutoff.isoformat()}")
+
+        for name in names:
+            model = ARCHIVE_FORMS[name]
+            table = model._meta.db_table
+            aged = model.objects.filter(created_at__lt=cutoff)
+            if options['dry_run']:
+                self.stdout.write(f"{table}: {aged.count():,} rows to archive")
+                continue
+
+            directory = archive_dir(model)
+            directory.mkdir(parents=True, exist_ok=True)
+            self.recover_pending(model, directory)
+
+            archived = files = 0
+            while True:
+                rows, path = self.archive_batch(model, aged, options['rows_per_file'], directory)
+                if not rows:
+                    break
+                archived += rows
+                files += 1
+                self.stdout.write(f"  {path.name}: {rows:,} rows")
+            self.stdout.write(self.style.SUCCESS(f"{table}: archived {archived:,} rows into {files} file(s)"))
+
+            if options['vacuum'] and archived and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(f'VACUUM (ANALYZE) {table}')
+
+    def archive_batch(self, model, aged, limit, directory):
+        """Write the oldest ``limit`` aged rows to one file and delete them; returns (rows, path)"""
+        columns = archive_columns(model)
+        rows = list(aged.order_by('created_at', 'id').values_list(*columns)[:limit])
+        if not rows:
+            return 0, None
+        created_index, id_index = columns.index('created_at'), columns.index('id')
+        first, last = rows[0], rows[-1]
+        stem = f"{first[created_index]:%Y%m%dT%H%M%S}-{first[id_index]}-{last[id_index]}"
+
+        pending = directory / f'{stem}{PENDING_SUFFIX}'
+        write_archive(pending, model, columns, rows)
+        try:
+            with transaction.atomic():
+                deleted = self.delete_archived(aged, last[created_index], last[id_index])
+                if deleted != len(rows):
+                    raise CommandError(
+                        f"{model._meta.db_table}: expected to delete {len(rows)} archived rows, found {deleted}; "
+                        "the table changed while archiving, nothing was deleted"
+                    )
+                transaction.on_commit(lambda: bump_list_cache_version(model._meta.label_lower))
+        except Exception:
+            # Rolled back: nothing was deleted, so the file must not be kept
+            pending.unlink()
+            raise
+        return len(rows), self.publish(pending)
+
+    def recover_pending(self, model, directory):
+        """Finish files whose rows may not have been deleted by an interrupted run"""
+        for pending in sorted(directory.glob(f'*{PENDING_SUFFIX}')):
+            # Only the recorded ids: rows inserted since with keys in the file's range stay
+            with ArchiveFile(pending, model) as archive:
+                ids = [pk for group in archive.groups for pk in group.column('id')]
+            deleted = 0
+            with transaction.atomic():
+                for start in range(0, len(ids), RECOVER_DELETE_BATCH):
+                    archived = model.objects.filter(id__in=ids[start:start + RECOVER_DELETE_BATCH])
+                    deleted += archived._raw_delete(archived.db)
+                transaction.on_commit(lambda: bump_list_cache_version(model._meta.label_lower))
+            self.stdout.write(f"  recovered {pending.name} ({deleted:,} of {len(ids):,} rows still in the table)")
+            self.publish(pending)
+
+    def delete_archived(self, queryset, created_at, pk):
+        # Raw delete: no per-row signals (and no tombstones) for archived rows
+        archived = queryset.filter(up_to(created_at, pk))
+        return archived._raw_delete(archived.db)
+
+    def publish(self, pending):
+        path = pending.with_name(pending.name[:-len(PENDING_SUFFIX)] + ARCHIVE_SUFFIX)
+        os.replace(pending, path)
+        return path
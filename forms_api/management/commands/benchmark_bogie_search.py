@@ -0,0 +1,122 @@
+"""
+Benchmark bogie checksheet search: substring scan vs full-text search.
+
+Seeds ``forms_api_bogiechecksheet`` (optional) with synthetic deficit notes
+and component conditions, then runs each query twice: once as the
+case-insensitive ``ILIKE`` match of every word across the notes and
+condition columns (the only option before the ``search_vector`` column),
+and once against the generated ``tsvector`` column and its GIN index.
+Prints the plan, matching rows and median latency of the first page.
+
+Usage:
+    python manage.py benchmark_bogie_search --seed --rows 1000000
+"""
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from forms_api.helpers.search import full_text_search, substring_search
+from forms_api.models import BogieChecksheet
+
+SEED_SQL = """
+INSERT INTO forms_api_bogiechecksheet (
+    bogie_no, incoming_div_and_date, maker_year_built, deficit_components,
+    bogie_frame_condition, bolster, axle_guide, side_bearer,
+    adjusting_tube, plunger_spring, dust_excluder,
+    form_number, inspection_by, inspection_date, created_at, idempotency_fingerprint
+)
+SELECT
+    'BG' || lpad((g %% 5000)::text, 4, '0'), 'NR / 2025-06-25', 'RDSO/2018',
+    (ARRAY[
+        'No deficiency', 'Dust excluder missing', 'Side bearer pad damaged',
+        'Anchor link bush worn out', 'Protective tube cracked near weld',
+        'Two tee bolts missing on BMBC', 'Lower spring seat corroded',
+        'Axle guide rubber ring perished', 'Bolster spring broken', ''
+    ])[1 + g %% 10] || ' ' ||
+    (ARRAY['', '', '', 'replaced from stock', 'to be attended at next IOH', 'reported to SSE'])[1 + (g / 10) %% 6],
+    (ARRAY['GOOD', 'GOOD', 'GOOD', 'CRACKED'])[1 + g %% 4],
+    (ARRAY['GOOD', 'GOOD', 'WORN'])[1 + g %% 3],
+    (ARRAY['GOOD', 'WORN', 'GOOD', 'GOOD', 'DAMAGED'])[1 + g %% 5],
+    (ARRAY['GOOD', 'GOOD', 'DAMAGED'])[1 + (g / 7) %% 3],
+    (ARRAY['GOOD', 'DAMAGED', 'GOOD'])[1 + (g / 3) %% 3],
+    (ARRAY['GOOD', 'GOOD', 'GOOD', 'BROKEN'])[1 + (g / 5) %% 4],
+    (ARRAY['GOOD', 'GOOD', 'GOOD', 'GOOD', 'GOOD', 'MISSING'])[1 + (g / 11) %% 6],
+    'BOGIE-SEARCH-' || lpad(g::text, 7, '0'),
+    'user_id_' || (g %% 500),
+    DATE '2024-01-01' + (g %% 540),
+    now() - ((%(rows)s - g) * INTERVAL '1 second'),
+    ''
+FROM generate_series(1, %(rows)s) AS g
+"""
+
+QUERIES = [
+    'missing dust excluder',
+    'side bearer damaged',
+    'cracked',
+    '"spring seat" corroded',
+    'anchor link worn',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare bogie checksheet substring search with the full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help='Insert --rows synthetic rows before benchmarking')
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Number of rows to seed (default 1,000,000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query (default 5)')
+        parser.add_argument('--page-size', type=int, default=100, help='Rows fetched per query, as on the search endpoint')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('This benchmark requires PostgreSQL (the search_vector column is PostgreSQL only).')
+
+        if options['seed']:
+            self.stdout.write(f"Seeding {options['rows']:,} bogie checksheet rows...")
+            with connection.cursor() as cursor:
+                cursor.execute(SEED_SQL, {'rows': options['rows']})
+                cursor.execute('ANALYZE forms_api_bogiechecksheet')
+
+        total = BogieChecksheet.objects.count()
+        self.stdout.write(f"Table has {total:,} rows\n")
+
+        results = []
+        for query in QUERIES:
+            substring = substring_search(BogieChecksheet.objects.all(), query)
+            full_text = full_text_search(BogieChecksheet.objects.all(), query)
+
+            before = self._measure(substring, substring.order_by('id'), options)
+            after = self._measure(full_text, full_text.order_by('-search_rank', 'id'), options)
+            results.append({'query': query, 'before': before, 'after': after})
+
+            self.stdout.write(self.style.MIGRATE_HEADING(query))
+            self.stdout.write(f"  substring: {before['matches']:,} rows, {before['median_ms']:.2f} ms\n    " + before['plan'].replace('\n', '\n    '))
+            self.stdout.write(f"  full-text: {after['matches']:,} rows, {after['median_ms']:.2f} ms\n    " + after['plan'].replace('\n', '\n    '))
+
+        self.stdout.write('')
+        self.stdout.write(f"{'query':<32}{'substring (ms)':>16}{'full-text (ms)':>16}{'speedup':>10}")
+        for result in results:
+            before_ms = result['before']['median_ms']
+            after_ms = result['after']['median_ms']
+            speedup = before_ms / after_ms if after_ms else float('inf')
+            self.stdout.write(f"{result['query']:<32}{before_ms:>16.2f}{after_ms:>16.2f}{speedup:>9.1f}x")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'rows': total, 'results': results}, f, indent=2)
+            self.stdout.write(f"\nResults written to {options['output']}")
+
+    def _measure(self, matches, ordered, options):
+        """Return the plan, match count and median latency of the first page of ``ordered``"""
+        page = ordered[:options['page_size']]
+        plan = page.explain()
+        timings = []
+        for _ in range(options['repeat']):
+            start = time.perf_counter()
+            list(page)
+            timings.append((time.perf_counter() - start) * 1000)
+        return {'plan': plan, 'matches': matches.count(), 'median_ms': statistics.median(timings), 'runs_ms': timings}
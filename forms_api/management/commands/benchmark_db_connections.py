@@ -0,0 +1,91 @@
+"""
+Benchmark per-request database connection overhead (PostgreSQL only).
+
+Each simulated request follows Django's request cycle: stale connections are
+closed when the request starts and finishes (``close_if_unusable_or_obsolete``,
+as the request_started/request_finished handlers do), and the request runs
+one small query. Three strategies are compared against the configured
+database:
+
+  - ``reconnect``: CONN_MAX_AGE=0, a new connection for every request
+  - ``persistent``: CONN_MAX_AGE > 0 with health checks
+  - ``pool``: psycopg 3 connection pool (skipped if psycopg_pool is missing)
+
+Usage:
+    python manage.py benchmark_db_connections --requests 500
+"""
+import copy
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.utils import ConnectionHandler
+
+BENCHMARK_ALIAS = 'benchmark_connections'
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request latency of reconnecting, persistent connections and the connection pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Simulated requests per strategy')
+        parser.add_argument('--query', default='SELECT 1', help='Query each simulated request runs')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('benchmark_db_connections requires PostgreSQL')
+
+        base = copy.deepcopy(settings.DATABASES['default'])
+        base['OPTIONS'] = {key: value for key, value in base.get('OPTIONS', {}).items() if key != 'pool'}
+        strategies = {
+            'reconnect': dict(base, CONN_MAX_AGE=0),
+            'persistent': dict(base, CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True),
+            'pool': dict(base, CONN_MAX_AGE=0, OPTIONS=dict(base['OPTIONS'], pool={'min_size': 1, 'max_size': 4})),
+        }
+
+        self.stdout.write(f"{'strategy':<12}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'mean (ms)':>11}")
+        results = {}
+        for name, settings_dict in strategies.items():
+            try:
+                timings = self._run(settings_dict, options)
+            except ImportError as e:
+                self.stdout.write(f"{name:<12}skipped: {e}")
+                continue
+            timings.sort()
+            pick = lambda q: timings[min(len(timings) - 1, int(len(timings) * q))]
+            results[name] = statistics.mean(timings)
+            self.stdout.write(
+                f"{name:<12}{statistics.median(timings):>10.3f}{pick(0.95):>10.3f}{pick(0.99):>10.3f}{results[name]:>11.3f}"
+            )
+
+        if 'reconnect' in results:
+            for name in ('persistent', 'pool'):
+                if name in results:
+                    self.stdout.write(f"{name} saves {results['reconnect'] - results[name]:.3f} ms per request on average")
+
+    def _run(self, settings_dict, options):
+        handler = ConnectionHandler({BENCHMARK_ALIAS: settings_dict})
+        wrapper = handler[BENCHMARK_ALIAS]
+        if settings_dict['OPTIONS'].get('pool'):
+            try:
+                import psycopg_pool  # noqa: F401
+            except ImportError as e:
+                raise ImportError('psycopg[pool] is not installed') from e
+
+        timings = []
+        try:
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                wrapper.close_if_unusable_or_obsolete()
+                with wrapper.cursor() as cursor:
+                    cursor.execute(options['query'])
+                    cursor.fetchall()
+                wrapper.close_if_unusable_or_obsolete()
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            wrapper.close()
+            if settings_dict['OPTIONS'].get('pool'):
+                wrapper.close_pool()
+        return timings
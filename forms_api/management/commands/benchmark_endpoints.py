@@ -0,0 +1,289 @@
+"""
+Reproducible load benchmark for the KPA form endpoints.
+
+Seeds BogieChecksheet / WheelSpecification rows, then drives the login,
+POST and list endpoints concurrently through Django's full request handler
+(URL routing, every MIDDLEWARE entry, DRF) with one test client per worker
+thread, and reports throughput and p50/p95/p99 latency per scenario. Needs
+no running server or network, so it runs the same against a local
+PostgreSQL or the SQLite profile (kpa_project.settings_sqlite).
+
+Usage:
+    python manage.py benchmark_endpoints --seed-wheel 50000 --seed-bogie 20000 --output before.json
+    python manage.py benchmark_endpoints --skip-seed --output after.json --compare before.json
+"""
+import itertools
+import json
+import platform
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+
+from forms_api.models import BogieChecksheet, WheelSpecification
+
+SEED_PREFIX = 'BENCH'
+
+WHEEL_FIELDS = {
+    'axleBoxHousingBoreDia': '280 (+0.030/+0.052)',
+    'bearingSeatDiameter': '130.043 TO 130.068',
+    'condemningDia': '825 (800-900)',
+    'intermediateWWP': '20 TO 28',
+    'lastShopIssueSize': '837 (800-900)',
+    'rollerBearingBoreDia': '130 (+0.0/-0.025)',
+    'rollerBearingOuterDia': '280 (+0.0/-0.035)',
+    'rollerBearingWidth': '93 (+0/-0.250)',
+    'treadDiameterNew': '915 (900-1000)',
+    'variationSameAxle': '0.5',
+    'variationSameBogie': '5',
+    'variationSameCoach': '13',
+    'wheelDiscWidth': '127 (+4/-0)',
+    'wheelGauge': '1600 (+2,-1)',
+    'wheelProfile': '29.4 Flange Thickness',
+}
+
+BOGIE_SECTIONS = {
+    'bogieDetails': {
+        'bogieNo': 'BG1234',
+        'dateOfIOH': '2025-07-01',
+        'incomingDivAndDate': 'NR / 2025-06-25',
+        'makerYearBuilt': 'RDSO/2018',
+    },
+    'bogieChecksheet': {
+        'axleGuide': 'Worn',
+        'bogieFrameCondition': 'Good',
+        'bolster': 'Good',
+        'bolsterSuspensionBracket': 'Cracked',
+        'lowerSpringSeat': 'Good',
+    },
+    'bmbcChecksheet': {
+        'adjustingTube': 'DAMAGED',
+        'cylinderBody': 'WORN OUT',
+        'pistonTrunnion': 'GOOD',
+        'plungerSpring': 'GOOD',
+    },
+}
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class Command(BaseCommand):
+    help = 'Seed form data and benchmark the login, POST and list endpoints through the middleware stack'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed-wheel', type=int, default=20000, help='Wheel specification rows to seed')
+        parser.add_argument('--seed-bogie', type=int, default=5000, help='Bogie checksheet rows to seed')
+        parser.add_argument('--skip-seed', action='store_true', help='Reuse the rows seeded by a previous run')
+        parser.add_argument('--requests', type=int, default=300, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per scenario')
+        parser.add_argument('--concurrency', type=int, default=8, help='Worker threads per scenario')
+        parser.add_argument('--scenarios', default='', help='Comma-separated subset of scenarios (default: all)')
+        parser.add_argument('--output', help='Write the results as JSON to this path')
+        parser.add_argument('--compare', help='JSON results of an earlier run to diff against')
+
+    def handle(self, *args, **options):
+        scenarios = self.scenarios()
+        if options['scenarios']:
+            selected = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+            unknown = [name for name in selected if name not in scenarios]
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(unknown)}. Available: {', '.join(scenarios)}")
+            scenarios = {name: scenarios[name] for name in selected}
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as fh:
+                baseline = json.load(fh)
+
+        if not options['skip_seed']:
+            self.seed(options['seed_wheel'], options['seed_bogie'])
+
+        results = {
+            'meta': self.metadata(options),
+            'rows': {
+                'wheel_specifications': WheelSpecification.objects.count(),
+                'bogie_checksheets': BogieChecksheet.objects.count(),
+            },
+            'scenarios': {},
+        }
+
+        self.stdout.write(
+            f"{'scenario':<26}{'requests':>9}{'errors':>8}{'req/s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}"
+        )
+        for name, make_request in scenarios.items():
+            row = self.run_scenario(make_request, options)
+            results['scenarios'][name] = row
+            self.stdout.write(
+                f"{name:<26}{row['requests']:>9}{row['errors']:>8}{row['throughput']:>10.1f}"
+                f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+            )
+
+        if baseline is not None:
+            self.compare(baseline, results)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def scenarios(self):
+        """Scenario name -> callable(client, n) returning a response"""
+        # Keeps the form numbers of repeated runs against the same database apart
+        run_id = int(time.time())
+
+        def wheel_payload(n):
+            return {
+                'formNumber': f'{SEED_PREFIX}-WHEEL-POST-{run_id}-{n}',
+                'submittedBy': 'benchmark',
+                'submittedDate': '2025-07-03',
+                'fields': WHEEL_FIELDS,
+            }
+
+        def bogie_payload(n):
+            return dict(BOGIE_SECTIONS, formNumber=f'{SEED_PREFIX}-BOGIE-POST-{run_id}-{n}', inspectionBy='benchmark', inspectionDate='2025-07-03')
+
+        return {
+            'login': lambda client, n: client.post(
+                '/api/users/login/', {'phone': '7760873976', 'password': 'to_share@123'}, content_type='application/json'
+            ),
+            'bogie_checksheet_post': lambda client, n: client.post(
+                '/api/forms/bogie-checksheet', bogie_payload(n), content_type='application/json'
+            ),
+            'wheel_spec_post': lambda client, n: client.post(
+                '/api/forms/wheel-specifications', wheel_payload(n), content_type='application/json'
+            ),
+            'wheel_spec_list': lambda client, n: client.get(
+                '/api/forms/wheel-specifications/list', {'limit': 100}
+            ),
+            'wheel_spec_list_filtered': lambda client, n: client.get(
+                '/api/forms/wheel-specifications/list',
+                {'formNumber': f'{SEED_PREFIX}-WHEEL-{n % 1000}', 'submittedBy': 'seed', 'limit': 100},
+            ),
+        }
+
+    def seed(self, wheel_count, bogie_count):
+        """Insert seed rows in batches, skipping rows already present from an earlier run"""
+        batch_size = settings.BULK_CREATE_BATCH_SIZE
+        start_day = date(2024, 1, 1)
+
+        existing = WheelSpecification.objects.filter(form_number__startswith=f'{SEED_PREFIX}-WHEEL-', submitted_by='seed').count()
+        for offset in range(existing, wheel_count, batch_size):
+            batch = []
+            for n in range(offset, min(offset + batch_size, wheel_count)):
+                spec = WheelSpecification(
+                    form_number=f'{SEED_PREFIX}-WHEEL-{n}',
+                    submitted_by='seed',
+                    submitted_date=start_day + timedelta(days=n % 365),
+                    tread_diameter_new=f'{880 + n % 40} (800-1000)',
+                    wheel_gauge=f'{1599 + n % 3} (+2,-1)',
+                    condemning_dia='825 (800-900)',
+                )
+                spec.populate_measurements()
+                batch.append(spec)
+            WheelSpecification.objects.bulk_create(batch)
+
+        existing = BogieChecksheet.objects.filter(form_number__startswith=f'{SEED_PREFIX}-BOGIE-', inspection_by='seed').count()
+        for offset in range(existing, bogie_count, batch_size):
+            BogieChecksheet.objects.bulk_create([
+                BogieChecksheet(
+                    form_number=f'{SEED_PREFIX}-BOGIE-{n}',
+                    bogie_no=f'BG{n % 2000:04d}',
+                    inspection_by='seed',
+                    inspection_date=start_day + timedelta(days=n % 365),
+                    incoming_div_and_date='NR / 2025-06-25',
+                    maker_year_built='RDSO/2018',
+                )
+                for n in range(offset, min(offset + batch_size, bogie_count))
+            ])
+        self.stdout.write(f"Seeded up to {wheel_count} wheel specifications and {bogie_count} bogie checksheets")
+
+    def run_scenario(self, make_request, options):
+        total = options['warmup'] + options['requests']
+        counter = itertools.count()
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+
+        def worker():
+            nonlocal errors
+            client = Client()
+            local_latencies = []
+            local_errors = 0
+            try:
+                while True:
+                    n = next(counter)
+                    if n >= total:
+                        break
+                    started = time.perf_counter()
+                    response = make_request(client, n)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    if n < options['warmup']:
+                        continue
+                    local_latencies.append(elapsed)
+                    if response.status_code >= 400:
+                        local_errors += 1
+            finally:
+                connections.close_all()
+            with lock:
+                latencies.extend(local_latencies)
+                errors += local_errors
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            for future in [pool.submit(worker) for _ in range(options['concurrency'])]:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'throughput': len(latencies) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(latencies, 0.50),
+            'p95_ms': percentile(latencies, 0.95),
+            'p99_ms': percentile(latencies, 0.99),
+            'max_ms': latencies[-1] if latencies else 0.0,
+        }
+
+    def metadata(self, options):
+        try:
+            revision = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR, timeout=5
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            revision = None
+        return {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'git_revision': revision,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+        }
+
+    def compare(self, baseline, results):
+        """Print per-scenario changes relative to an earlier run (positive = slower / less throughput)"""
+        self.stdout.write('')
+        self.stdout.write(f"Compared with {baseline.get('meta', {}).get('git_revision') or 'baseline'}:")
+        self.stdout.write(f"{'scenario':<26}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+        for name, row in results['scenarios'].items():
+            before = baseline.get('scenarios', {}).get(name)
+            if not before:
+                self.stdout.write(f"{name:<26}{'(new)':>10}")
+                continue
+            change = lambda key: (row[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            self.stdout.write(
+                f"{name:<26}{change('throughput'):>+9.1f}%{change('p50_ms'):>+9.1f}%{change('p95_ms'):>+9.1f}%{change('p99_ms'):>+9.1f}%"
+            )
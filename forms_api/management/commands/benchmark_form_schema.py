@@ -0,0 +1,140 @@
+"""
+Micro-benchmark payload mapping: the compiled form schema against the
+hand-written ``data.get('Label', '') or data.get('snake', '')`` chain the
+POST views used before it, alone and followed by the checks the schema
+applies (required fields, form number, date, max lengths). The schema also
+understands the nested camelCase payload, which the chain did not.
+"general pass" times the schema without its per-shape plans.
+
+Usage:
+    python manage.py benchmark_form_schema --iterations 100000
+"""
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from forms_api.helpers.form_schema import WHEEL_SPECIFICATION_SCHEMA
+from forms_api.helpers.validation import validate_date, validate_fields_presence, validate_form_number
+
+LEGACY_PAYLOAD = {
+    'Tread Diameter (New)': '915 (900-1000)',
+    'Last Shop Issue Size (Dia.)': '837 (800-900)',
+    'Condemning Dia.': '825 (800-900)',
+    'Wheel Gauge (IFD)': '1600 (+2,-1)',
+    'Variation Same Axle': '0.5',
+    'Variation Same Bogie': '5',
+    'Variation Same Coach': '13',
+    'Wheel Profile': '29.4 Flange Thickness',
+    'Intermediate WWP': '20 TO 28',
+    'Bearing Seat Diameter': '130.043 TO 130.068',
+    'Roller Bearing Outer Dia.': '280 (+0.0/-0.035)',
+    'Roller Bearing Bore Dia.': '130 (+0.0/-0.025)',
+    'Roller Bearing Width': '93 (+0/-0.250)',
+    'Axle Box Housing Bore Dia.': '280 (+0.030/+0.052)',
+    'Wheel Disc Width': '127 (+4/-0)',
+    'form_number': 'WHEEL-2025-001',
+    'submitted_by': 'user_id_123',
+    'submitted_date': '2025-07-03',
+}
+
+NESTED_PAYLOAD = {
+    'fields': {
+        'axleBoxHousingBoreDia': '280 (+0.030/+0.052)',
+        'bearingSeatDiameter': '130.043 TO 130.068',
+        'condemningDia': '825 (800-900)',
+        'intermediateWWP': '20 TO 28',
+        'lastShopIssueSize': '837 (800-900)',
+        'rollerBearingBoreDia': '130 (+0.0/-0.025)',
+        'rollerBearingOuterDia': '280 (+0.0/-0.035)',
+        'rollerBearingWidth': '93 (+0/-0.250)',
+        'treadDiameterNew': '915 (900-1000)',
+        'variationSameAxle': '0.5',
+        'variationSameBogie': '5',
+        'variationSameCoach': '13',
+        'wheelDiscWidth': '127 (+4/-0)',
+        'wheelGauge': '1600 (+2,-1)',
+        'wheelProfile': '29.4 Flange Thickness',
+    },
+    'formNumber': 'WHEEL-2025-001',
+    'submittedBy': 'user_id_123',
+    'submittedDate': '2025-07-03',
+}
+
+
+def legacy_chain(data):
+    """The pre-schema mapping from WheelSpecificationPostView (no validation, flat keys only)"""
+    def get_date_value(value):
+        if not value or value == '':
+            return None
+        return value
+
+    return dict(
+        tread_diameter_new=data.get('Tread Diameter (New)', '') or data.get('tread_diameter', ''),
+        last_shop_issue_size=data.get('Last Shop Issue Size (Dia.)', '') or data.get('last_shop_issue', ''),
+        condemning_dia=data.get('Condemning Dia.', '') or data.get('condemning_dia', ''),
+        wheel_gauge=data.get('Wheel Gauge (IFD)', '') or data.get('wheel_gauge', ''),
+        variation_same_axle=data.get('Variation Same Axle', '') or data.get('variation_same_axle', ''),
+        variation_same_bogie=data.get('Variation Same Bogie', '') or data.get('variation_same_bogie', ''),
+        variation_same_coach=data.get('Variation Same Coach', '') or data.get('variation_same_coach', ''),
+        wheel_profile=data.get('Wheel Profile', '') or data.get('wheel_profile', ''),
+        intermediate_wwp=data.get('Intermediate WWP', '') or data.get('intermediate_wwp', ''),
+        bearing_seat_diameter=data.get('Bearing Seat Diameter', '') or data.get('bearing_seat_diameter', ''),
+        roller_bearing_outer_dia=data.get('Roller Bearing Outer Dia.', '') or data.get('roller_bearing_outer_dia', ''),
+        roller_bearing_bore_dia=data.get('Roller Bearing Bore Dia.', '') or data.get('roller_bearing_bore_dia', ''),
+        roller_bearing_width=data.get('Roller Bearing Width', '') or data.get('roller_bearing_width', ''),
+        axle_box_housing_bore_dia=data.get('Axle Box Housing Bore Dia.', '') or data.get('axle_box_housing_bore_dia', ''),
+        wheel_disc_width=data.get('Wheel Disc Width', '') or data.get('wheel_disc_width', ''),
+        form_number=data.get('form_number', ''),
+        submitted_by=data.get('submitted_by', ''),
+        submitted_date=get_date_value(data.get('submitted_date', '')),
+    )
+
+
+MAX_LENGTHS = {
+    field.column: field.max_length
+    for field in WHEEL_SPECIFICATION_SCHEMA.model._meta.concrete_fields if field.max_length is not None
+}
+
+
+def legacy_chain_validated(data):
+    """The legacy chain followed by the checks normalize() applies"""
+    values = legacy_chain(data)
+    errors = []
+    required = [column for column in values if column not in ('submitted_by', 'submitted_date')]
+    is_valid, message = validate_fields_presence(values, required, 'wheel specification')
+    if not is_valid:
+        errors.append(message)
+    is_valid, message = validate_form_number(values['form_number'])
+    if not is_valid:
+        errors.append(message)
+    if values['submitted_date'] is not None:
+        is_valid, message = validate_date(values['submitted_date'])
+        if not is_valid:
+            errors.append(f"submittedDate: {message}")
+    for column, value in values.items():
+        if column in MAX_LENGTHS and len(value) > MAX_LENGTHS[column]:
+            errors.append(f"{column}: too long")
+    return values, errors
+
+
+class Command(BaseCommand):
+    help = 'Compare per-payload cost of the compiled form schema and the legacy mapping chain'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100_000, help='Payloads mapped per measurement')
+        parser.add_argument('--repeat', type=int, default=5, help='Measurements per variant; the best is reported')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        variants = [
+            ('legacy chain (flat labels)', lambda: legacy_chain(LEGACY_PAYLOAD)),
+            ('legacy chain + checks', lambda: legacy_chain_validated(LEGACY_PAYLOAD)),
+            ('schema (flat labels)', lambda: WHEEL_SPECIFICATION_SCHEMA.normalize(LEGACY_PAYLOAD)),
+            ('schema (nested camelCase)', lambda: WHEEL_SPECIFICATION_SCHEMA.normalize(NESTED_PAYLOAD)),
+            ('general pass (nested)', lambda: WHEEL_SPECIFICATION_SCHEMA.normalize_general(NESTED_PAYLOAD)),
+        ]
+
+        self.stdout.write(f"{'variant':<32}{'us/payload':>12}")
+        for label, func in variants:
+            best = min(timeit.repeat(func, number=iterations, repeat=options['repeat']))
+            self.stdout.write(f"{label:<32}{best / iterations * 1e6:>12.2f}")
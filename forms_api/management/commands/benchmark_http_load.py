@@ -0,0 +1,205 @@
+"""
+Concurrent HTTP load test for comparing the WSGI and ASGI deployments.
+
+Opens ``--concurrency`` keep-alive connections to a running server and
+drives a mix of wheel specification POSTs and list GETs over them for
+``--duration`` seconds, then reports throughput and p50/p95/p99 latency per
+endpoint. Run it once against the sync stack (gunicorn + wsgi) and once
+against the async stack (gunicorn + UvicornWorker with ASYNC_VIEWS_ENABLED)
+with the same database and settings.
+
+Usage:
+    python manage.py benchmark_http_load --url http://localhost:8000 --concurrency 200
+    python manage.py benchmark_http_load --url http://localhost:8001 --concurrency 200 --output async.json
+"""
+import asyncio
+import itertools
+import json
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+POST_PATH = '/api/forms/wheel-specifications'
+LIST_PATH = '/api/forms/wheel-specifications/list?limit=50'
+
+WHEEL_FIELDS = {
+    'axleBoxHousingBoreDia': '280 (+0.030/+0.052)',
+    'bearingSeatDiameter': '130.043 TO 130.068',
+    'condemningDia': '825 (800-900)',
+    'intermediateWWP': '20 TO 28',
+    'lastShopIssueSize': '837 (800-900)',
+    'rollerBearingBoreDia': '130 (+0.0/-0.025)',
+    'rollerBearingOuterDia': '280 (+0.0/-0.035)',
+    'rollerBearingWidth': '93 (+0/-0.250)',
+    'treadDiameterNew': '915 (900-1000)',
+    'variationSameAxle': '0.5',
+    'variationSameBogie': '5',
+    'variationSameCoach': '13',
+    'wheelDiscWidth': '127 (+4/-0)',
+    'wheelGauge': '1600 (+2,-1)',
+    'wheelProfile': '29.4 Flange Thickness',
+}
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client; enough for JSON request/response pairs"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b''
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n"
+        )
+        self.writer.write(head.encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Server closed the connection')
+        status = int(status_line.split()[1])
+        length = None
+        chunked = False
+        close = False
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            value = value.strip()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'transfer-encoding' and 'chunked' in value.lower():
+                chunked = True
+            elif name == 'connection' and value.lower() == 'close':
+                close = True
+
+        if chunked:
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif length is not None:
+            await self.reader.readexactly(length)
+        else:
+            await self.reader.read()
+            close = True
+
+        if close:
+            await self.close()
+        return status
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+
+class Command(BaseCommand):
+    help = 'Drive concurrent POST/list traffic at a running server and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000', help='Base URL of the server under test')
+        parser.add_argument('--concurrency', type=int, default=100, help='Concurrent keep-alive connections')
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run')
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='Fraction of requests that are POSTs')
+        parser.add_argument('--output', help='Write the results as JSON to this path')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('--url must be an http:// URL')
+        if not 0 <= options['write_ratio'] <= 1:
+            raise CommandError('--write-ratio must be between 0 and 1')
+
+        results = asyncio.run(self._run(url.hostname, url.port or 80, options))
+
+        self.stdout.write(f"{'endpoint':<8}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}")
+        for name, row in results['endpoints'].items():
+            self.stdout.write(
+                f"{name:<8}{row['requests']:>10}{row['errors']:>8}{row['throughput']:>10.1f}"
+                f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+            )
+        self.stdout.write(f"Total throughput: {results['throughput']:.1f} req/s over {results['duration']:.1f}s")
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    async def _run(self, host, port, options):
+        latencies = {'post': [], 'list': []}
+        errors = {'post': 0, 'list': 0}
+        counter = itertools.count()
+        write_every = round(1 / options['write_ratio']) if options['write_ratio'] else 0
+        deadline = time.perf_counter() + options['duration']
+
+        async def client(client_id):
+            connection = Connection(host, port)
+            try:
+                while time.perf_counter() < deadline:
+                    n = next(counter)
+                    kind = 'post' if write_every and n % write_every == 0 else 'list'
+                    started = time.perf_counter()
+                    try:
+                        if kind == 'post':
+                            status = await connection.request('POST', POST_PATH, {
+                                'formNumber': f'WHEEL-LOAD-{client_id}-{n}',
+                                'submittedBy': 'load_test',
+                                'submittedDate': '2025-07-03',
+                                'fields': WHEEL_FIELDS,
+                            })
+                        else:
+                            status = await connection.request('GET', LIST_PATH)
+                    except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+                        errors[kind] += 1
+                        await connection.close()
+                        continue
+                    latencies[kind].append((time.perf_counter() - started) * 1000)
+                    if status >= 400:
+                        errors[kind] += 1
+            finally:
+                await connection.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(options['concurrency'])))
+        elapsed = time.perf_counter() - started
+
+        endpoints = {}
+        for kind, values in latencies.items():
+            values.sort()
+            endpoints[kind] = {
+                'requests': len(values),
+                'errors': errors[kind],
+                'throughput': len(values) / elapsed,
+                'p50_ms': percentile(values, 0.50),
+                'p95_ms': percentile(values, 0.95),
+                'p99_ms': percentile(values, 0.99),
+            }
+        return {
+            'url': options['url'],
+            'concurrency': options['concurrency'],
+            'duration': elapsed,
+            'throughput': sum(len(values) for values in latencies.values()) / elapsed,
+            'endpoints': endpoints,
+        }
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark the per-row cost of rendering the wheel specification list.
+
+Compares the previous path (model instances formatted by attribute access,
+encoded by DRF's JSONRenderer) with orjson rendering and with
+``values_list`` rows mapped through the schema's precomputed key tuples.
+``--from-db`` also times fetching the rows, so the saving from skipping
+model instance construction is included.
+
+Usage:
+    python manage.py benchmark_json_rendering --rows 1000
+    python manage.py benchmark_json_rendering --rows 1000 --from-db
+"""
+import timeit
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from forms_api.helpers.renderers import FastJSONRenderer, orjson
+from forms_api.helpers.response_formatter import (
+    WHEEL_SPECIFICATION_COLUMNS, format_wheel_specification_get_response, format_wheel_specification_rows_response,
+)
+from forms_api.models import WheelSpecification
+
+SAMPLE_VALUES = {
+    'axle_box_housing_bore_dia': '280 (+0.030/+0.052)',
+    'bearing_seat_diameter': '130.043 TO 130.068',
+    'condemning_dia': '825 (800-900)',
+    'intermediate_wwp': '20 TO 28',
+    'last_shop_issue_size': '837 (800-900)',
+    'roller_bearing_bore_dia': '130 (+0.0/-0.025)',
+    'roller_bearing_outer_dia': '280 (+0.0/-0.035)',
+    'roller_bearing_width': '93 (+0/-0.250)',
+    'tread_diameter_new': '915 (900-1000)',
+    'variation_same_axle': '0.5',
+    'variation_same_bogie': '5',
+    'variation_same_coach': '13',
+    'wheel_disc_width': '127 (+4/-0)',
+    'wheel_gauge': '1600 (+2,-1)',
+    'wheel_profile': '29.4 Flange Thickness',
+    'submitted_by': 'user_id_123',
+}
+
+
+def sample_specs(count):
+    """Unsaved wheel specifications shaped like real list rows"""
+    now = timezone.now()
+    return [
+        WheelSpecification(
+            id=i + 1, form_number=f'WHEEL-2025-{i:06d}', submitted_date=date(2025, 1, 1) + timedelta(days=i % 365),
+            created_at=now, **SAMPLE_VALUES,
+        )
+        for i in range(count)
+    ]
+
+
+def as_row(spec):
+    return tuple(getattr(spec, column) for column in WHEEL_SPECIFICATION_COLUMNS) + (spec.created_at, spec.id)
+
+
+class Command(BaseCommand):
+    help = 'Compare per-row cost of the wheel specification list rendering paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per rendered page')
+        parser.add_argument('--iterations', type=int, default=50, help='Pages rendered per measurement')
+        parser.add_argument('--repeat', type=int, default=5, help='Measurements per variant; the best is reported')
+        parser.add_argument('--from-db', action='store_true',
+                            help='Fetch the first --rows rows of forms_api_wheelspecification on every iteration')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        if rows < 1:
+            raise CommandError('--rows must be positive')
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed: FastJSONRenderer falls back to JSONRenderer'))
+
+        if options['from_db']:
+            queryset = WheelSpecification.objects.order_by('created_at', 'id')[:rows]
+            if queryset.count() < rows:
+                raise CommandError(f'--from-db needs at least {rows} wheel specifications (see benchmark_endpoints --seed-wheel)')
+            fetch_specs = lambda: list(queryset.all())
+            fetch_rows = lambda: list(queryset.values_list(*WHEEL_SPECIFICATION_COLUMNS, 'created_at', 'id'))
+        else:
+            specs = sample_specs(rows)
+            tuples = [as_row(spec) for spec in specs]
+            fetch_specs = lambda: specs
+            fetch_rows = lambda: tuples
+
+        drf, fast = JSONRenderer(), FastJSONRenderer()
+        variants = [
+            ('instances + JSONRenderer', lambda: drf.render(format_wheel_specification_get_response(fetch_specs()))),
+            ('instances + FastJSONRenderer', lambda: fast.render(format_wheel_specification_get_response(fetch_specs()))),
+            ('values_list rows + FastJSONRenderer', lambda: fast.render(format_wheel_specification_rows_response(fetch_rows()))),
+        ]
+
+        self.stdout.write(f"{'variant':<40}{'us/row':>10}{'speedup':>10}")
+        baseline = None
+        for label, func in variants:
+            best = min(timeit.repeat(func, number=options['iterations'], repeat=options['repeat']))
+            per_row = best / options['iterations'] / rows * 1e6
+            baseline = baseline or per_row
+            self.stdout.write(f"{label:<40}{per_row:>10.2f}{baseline / per_row:>9.1f}x")
@@ -0,0 +1,115 @@
+"""
+Benchmark the wheel specification list filters with and without indexes.
+
+Seeds ``forms_api_wheelspecification`` (optional), then runs every list
+filter the API supports twice: once with index scans disabled for the
+transaction (the plan the table had before the filter indexes existed) and
+once with the planner free to use them. Prints the plan and median latency
+for each.
+
+Usage:
+    python manage.py benchmark_list_indexes --seed --rows 1000000
+"""
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from forms_api.helpers.filters import filter_wheel_specifications
+from forms_api.models import WheelSpecification
+
+SEED_SQL = """
+INSERT INTO forms_api_wheelspecification (
+    tread_diameter_new, condemning_dia, wheel_gauge, bearing_seat_diameter,
+    form_number, submitted_by, submitted_date, created_at
+)
+SELECT
+    '915 (900-1000)', '825 (800-900)', '1600 (+2,-1)', '130.043 TO 130.068',
+    'WHEEL-' || lpad(g::text, 7, '0'),
+    'user_id_' || (g %% 500),
+    DATE '2024-01-01' + (g %% 540),
+    now() - ((%(rows)s - g) * INTERVAL '1 second')
+FROM generate_series(1, %(rows)s) AS g
+"""
+
+DISABLE_INDEX_SCANS = [
+    'SET LOCAL enable_indexscan = off',
+    'SET LOCAL enable_bitmapscan = off',
+    'SET LOCAL enable_indexonlyscan = off',
+]
+
+QUERIES = [
+    ('formNumber contains', {'formNumber': '0123456'}),
+    ('formNumber exact', {'formNumber': 'WHEEL-0123456', 'formNumberMatch': 'exact'}),
+    ('formNumber prefix', {'formNumber': 'WHEEL-01234', 'formNumberMatch': 'prefix'}),
+    ('submittedBy contains', {'submittedBy': 'user_id_42'}),
+    ('submittedDate', {'submittedDate': '2024-06-01'}),
+    ('submittedDate + submittedBy', {'submittedDate': '2024-06-01', 'submittedBy': 'user_id_42'}),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare list filter query plans and latency with and without indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help='Insert --rows synthetic rows before benchmarking')
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Number of rows to seed (default 1,000,000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query (default 5)')
+        parser.add_argument('--page-size', type=int, default=100, help='Rows fetched per query, as on the list endpoint')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('This benchmark requires PostgreSQL (pg_trgm and planner settings).')
+
+        if options['seed']:
+            self.stdout.write(f"Seeding {options['rows']:,} wheel specification rows...")
+            with connection.cursor() as cursor:
+                cursor.execute(SEED_SQL, {'rows': options['rows']})
+                cursor.execute('ANALYZE forms_api_wheelspecification')
+
+        total = WheelSpecification.objects.count()
+        self.stdout.write(f"Table has {total:,} rows\n")
+
+        results = []
+        for label, params in QUERIES:
+            queryset = filter_wheel_specifications(WheelSpecification.objects.all(), params)
+            queryset = queryset.order_by('created_at', 'id')[:options['page_size']]
+
+            before = self._measure(queryset, options['repeat'], disable_indexes=True)
+            after = self._measure(queryset, options['repeat'], disable_indexes=False)
+            results.append({'query': label, 'params': params, 'before': before, 'after': after})
+
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f"  before: {before['median_ms']:.2f} ms\n    " + before['plan'].replace('\n', '\n    '))
+            self.stdout.write(f"  after:  {after['median_ms']:.2f} ms\n    " + after['plan'].replace('\n', '\n    '))
+
+        self.stdout.write('')
+        self.stdout.write(f"{'query':<32}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+        for result in results:
+            before_ms = result['before']['median_ms']
+            after_ms = result['after']['median_ms']
+            speedup = before_ms / after_ms if after_ms else float('inf')
+            self.stdout.write(f"{result['query']:<32}{before_ms:>14.2f}{after_ms:>14.2f}{speedup:>9.1f}x")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'rows': total, 'results': results}, f, indent=2)
+            self.stdout.write(f"\nResults written to {options['output']}")
+
+    def _measure(self, queryset, repeat, disable_indexes):
+        """Return the plan and median latency of ``queryset``"""
+        timings = []
+        with transaction.atomic():
+            if disable_indexes:
+                with connection.cursor() as cursor:
+                    for statement in DISABLE_INDEX_SCANS:
+                        cursor.execute(statement)
+            plan = queryset.explain()
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset)
+                timings.append((time.perf_counter() - start) * 1000)
+        return {'plan': plan, 'median_ms': statistics.median(timings), 'runs_ms': timings}
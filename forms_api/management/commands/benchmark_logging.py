@@ -0,0 +1,102 @@
+"""
+Benchmark request-thread logging latency with synchronous handlers against
+the bounded queue + background listener mode (LOG_QUEUE_ENABLED).
+
+Each simulated request emits the three log lines a form request produces
+(middleware request/response and the view) through the project's JSON
+formatter into a console stand-in and two RotatingFileHandlers in a
+temporary directory, then does ``--think-us`` of other work. Only the time
+spent in the logging calls is measured.
+
+Usage:
+    python manage.py benchmark_logging --requests 3000
+"""
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from django.core.management.base import BaseCommand
+from pythonjsonlogger.jsonlogger import JsonFormatter
+
+from kpa_project.log_queue import enable_queue_logging, stop_log_listeners
+from kpa_project.logging_config import LOGGING
+
+
+def build_handlers(log_dir, max_bytes):
+    """Console stand-in plus two rotating JSON files, as attached to forms_api/django.request"""
+    formatter = JsonFormatter(LOGGING['formatters']['json']['format'])
+    console = logging.StreamHandler(open(os.devnull, 'w'))
+    handlers = [
+        console,
+        RotatingFileHandler(os.path.join(log_dir, 'requests.log'), maxBytes=max_bytes, backupCount=5),
+        RotatingFileHandler(os.path.join(log_dir, 'forms_api.log'), maxBytes=max_bytes, backupCount=5),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request logging latency of synchronous and queued handlers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=1, help='Request threads (1 matches a gunicorn sync worker)')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per thread')
+        parser.add_argument('--queue-size', type=int, default=10000, help='Bounded queue size for the queued mode')
+        parser.add_argument('--policy', default='block', choices=['drop', 'block'], help='Queue-full policy')
+        parser.add_argument('--think-us', type=int, default=1000, help='Non-logging work per request (simulated with sleep)')
+        parser.add_argument('--max-bytes', type=int, default=1024 * 1024, help='Rotation size (small to exercise rotation)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'mode':<10}{'p50 (us)':>12}{'p95 (us)':>12}{'p99 (us)':>12}{'max (us)':>12}")
+        for mode in ('sync', 'queue'):
+            with tempfile.TemporaryDirectory() as log_dir:
+                timings = self._run(mode, log_dir, options)
+            timings.sort()
+            pick = lambda q: timings[min(len(timings) - 1, int(len(timings) * q))]
+            self.stdout.write(
+                f"{mode:<10}{statistics.median(timings):>12.1f}{pick(0.95):>12.1f}{pick(0.99):>12.1f}{timings[-1]:>12.1f}"
+            )
+
+    def _run(self, mode, log_dir, options):
+        logger = logging.getLogger(f'benchmark_logging.{mode}')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        for handler in build_handlers(log_dir, options['max_bytes']):
+            logger.addHandler(handler)
+        if mode == 'queue':
+            enable_queue_logging(logger, maxsize=options['queue_size'], policy=options['policy'])
+
+        timings = []
+        timings_lock = threading.Lock()
+
+        think = options['think_us'] / 1e6
+
+        def worker():
+            local = []
+            for i in range(options['requests']):
+                start = time.perf_counter()
+                logger.info(f"REQUEST || METHOD: POST || PATH: /api/forms/wheel-specifications || CLIENT_IP: 10.0.0.{i % 255}")
+                logger.info(f"Wheel specification created successfully - ID: {i}, Form: WHEEL-2025-{i:06d}")
+                logger.info(f"RESPONSE || METHOD: POST || PATH: /api/forms/wheel-specifications || STATUS: 201 || TIME: 0.0042s")
+                local.append((time.perf_counter() - start) * 1e6)
+                time.sleep(think)
+            with timings_lock:
+                timings.extend(local)
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if mode == 'queue':
+            stop_log_listeners()
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
+        return timings
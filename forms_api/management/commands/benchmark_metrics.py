@@ -0,0 +1,86 @@
+"""
+Measure the per-request cost of recording into the shared request metrics.
+
+Times ``SharedMetrics.record`` and the middleware's ``observe`` call (route
+label lookup included) over a spread of routes and statuses, then forks
+``--workers`` processes that record concurrently into the same file and
+checks that the /metrics totals add up to every request recorded.
+
+Usage:
+    python manage.py benchmark_metrics --calls 200000 --workers 3
+"""
+import multiprocessing
+import os
+import tempfile
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+
+from kpa_project.metrics import SUM_OFFSET, SharedMetrics, get_metrics, observe
+
+ROUTES = (
+    ('api/forms/wheel-specifications/list', 'GET', '200'),
+    ('api/forms/wheel-specifications', 'POST', '201'),
+    ('api/forms/wheel-specifications', 'POST', '400'),
+    ('api/forms/bogie-checksheet/<int:pk>', 'GET', '404'),
+)
+LATENCIES = (0.0007, 0.004, 0.03, 0.2, 1.5)
+
+
+def record_many(path, calls):
+    metrics = SharedMetrics(path)
+    for i in range(calls):
+        route, method, status = ROUTES[i % len(ROUTES)]
+        metrics.record(route, method, status, LATENCIES[i % len(LATENCIES)])
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request overhead of the shared-memory latency histograms'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200000, help='Recordings per measurement')
+        parser.add_argument('--repeat', type=int, default=5, help='Measurements per variant; the best is reported')
+        parser.add_argument('--workers', type=int, default=3, help='Processes recording concurrently in the shared check')
+
+    def handle(self, *args, **options):
+        calls = options['calls']
+        if calls < 1 or options['workers'] < 1:
+            raise CommandError('--calls and --workers must be positive')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'metrics.mmap')
+            with override_settings(METRICS_PATH=path, METRICS_ENABLED=True):
+                metrics = get_metrics()
+                request = RequestFactory().get('/api/forms/wheel-specifications/list')
+                request.resolver_match = resolve('/api/forms/wheel-specifications/list')
+                counter = iter(range(1 << 62))
+
+                def record():
+                    i = next(counter)
+                    route, method, status = ROUTES[i % len(ROUTES)]
+                    metrics.record(route, method, status, LATENCIES[i % len(LATENCIES)])
+
+                def observe_request():
+                    observe(request, 200, LATENCIES[next(counter) % len(LATENCIES)])
+
+                self.stdout.write(f"{'variant':<30}{'us/request':>12}")
+                for label, func in (('SharedMetrics.record', record), ('middleware observe()', observe_request)):
+                    best = min(timeit.repeat(func, number=calls, repeat=options['repeat']))
+                    self.stdout.write(f"{label:<30}{best / calls * 1e6:>12.3f}")
+
+            shared = os.path.join(directory, 'shared.mmap')
+            context = multiprocessing.get_context('fork')
+            processes = [context.Process(target=record_many, args=(shared, calls)) for _ in range(options['workers'])]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+            reader = SharedMetrics(shared)
+            recorded = sum(sum(counts[:SUM_OFFSET]) for counts in reader.snapshot().values())
+            reader.close()
+            expected = calls * options['workers']
+            style = self.style.SUCCESS if recorded == expected else self.style.ERROR
+            self.stdout.write(style(f"{options['workers']} processes recorded {recorded:,} of {expected:,} requests"))
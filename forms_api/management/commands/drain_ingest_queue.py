@@ -0,0 +1,86 @@
+"""
+Drain the write-behind ingestion queue into the database.
+
+Claims up to ``--batch-size`` queued submissions at a time and inserts each
+form's share with one bulk_create in one transaction, recording a saved,
+replayed or failed status per receipt. Runs until stopped, polling every
+``--interval`` seconds while the queue is empty; ``--once`` drains what is
+queued and exits.
+
+A database outage returns the batch to the queue and the drainer retries
+after ``--interval``. On start, entries left ``processing`` by a drainer
+that died are requeued (they were inserted under idempotency keys, so at
+worst they replay).
+Finished receipts older than ``--retention-hours`` are purged hourly.
+Batch sizes and the remaining depth are reported to DogStatsD when
+``STATSD_ENABLED`` is set.
+
+Usage:
+    python manage.py drain_ingest_queue --batch-size 500
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections
+
+from forms_api.helpers.ingest import drain_batch, get_ingest_queue
+from kpa_project import statsd
+
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = 'Bulk-insert queued submissions from the write-behind ingestion queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.INGEST_DRAIN_BATCH_SIZE,
+                            help='Submissions claimed and inserted per transaction')
+        parser.add_argument('--interval', type=float, default=settings.INGEST_DRAIN_INTERVAL,
+                            help='Seconds to wait while the queue is empty')
+        parser.add_argument('--retention-hours', type=int, default=settings.INGEST_RECEIPT_RETENTION_HOURS,
+                            help='Purge finished receipts older than this')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        queue = get_ingest_queue()
+
+        requeued = queue.requeue(claimed_before=time.time())
+        if requeued:
+            self.stdout.write(f"Requeued {requeued:,} submissions left processing by a previous drainer")
+
+        total = 0
+        last_purge = 0
+        try:
+            while True:
+                if time.time() - last_purge >= PURGE_INTERVAL:
+                    purged = queue.purge(time.time() - options['retention_hours'] * 3600)
+                    if purged:
+                        self.stdout.write(f"Purged {purged:,} finished receipts")
+                    last_purge = time.time()
+
+                close_old_connections()
+                started = time.monotonic()
+                try:
+                    drained = drain_batch(queue, options['batch_size'])
+                except DatabaseError as e:
+                    # The batch was requeued; wait for the database to come back
+                    self.stderr.write(f"Database error, retrying: {e}")
+                    time.sleep(options['interval'])
+                    continue
+                if drained:
+                    total += drained
+                    elapsed = time.monotonic() - started
+                    depth = queue.depth()
+                    statsd.increment('ingest.drained', drained)
+                    statsd.gauge('ingest.queue_depth', depth)
+                    self.stdout.write(f"Inserted {drained:,} submissions in {elapsed * 1000:.0f} ms ({depth:,} waiting)")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Drained {total:,} submissions"))
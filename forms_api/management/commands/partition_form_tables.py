@@ -0,0 +1,130 @@
+"""
+Manage monthly partitions of the form tables (PostgreSQL).
+
+  --convert   turn forms_api_bogiechecksheet / forms_api_wheelspecification
+              into tables partitioned by month on created_at (one
+              transaction per table; the table is locked while it is copied)
+  (default)   create partitions for the current month and --months-ahead
+              months, and detach partitions older than --retention-months;
+              rows of those months already in the default partition are
+              moved into the new partitions
+  --explain   show how many partitions the list endpoint queries touch
+
+Detached partitions are left as ordinary tables with the same name, ready
+to archive (or dropped with --drop-detached). Run it from cron, e.g. daily:
+
+    python manage.py partition_form_tables --months-ahead 3 --retention-months 24
+"""
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from forms_api.helpers.filters import filter_bogie_checksheets, filter_wheel_specifications
+from forms_api.helpers.pagination import encode_cursor, keyset_queryset
+from forms_api.helpers.partitions import (
+    PARTITIONED_TABLES, add_months, add_partition_statements, convert_statements, default_partition_name,
+    default_rows, insert_columns, is_partitioned, list_partitions, month_range, month_start, partition_month,
+    partition_name,
+)
+from forms_api.models import BogieChecksheet, WheelSpecification
+
+LIST_QUERIES = {
+    'forms_api_wheelspecification': (WheelSpecification, filter_wheel_specifications),
+    'forms_api_bogiechecksheet': (BogieChecksheet, filter_bogie_checksheets),
+}
+
+
+class Command(BaseCommand):
+    help = 'Convert the form tables to monthly partitions, create future partitions and detach old ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--convert', action='store_true', help='Convert unpartitioned form tables')
+        parser.add_argument('--months-ahead', type=int, default=settings.PARTITION_MONTHS_AHEAD,
+                            help='Future months to pre-create partitions for')
+        parser.add_argument('--retention-months', type=int, default=settings.PARTITION_RETENTION_MONTHS,
+                            help='Detach partitions older than this many months (0 keeps all)')
+        parser.add_argument('--drop-detached', action='store_true', help='Drop partitions after detaching them')
+        parser.add_argument('--explain', action='store_true', help='Report the partitions touched by list queries')
+        parser.add_argument('--dry-run', action='store_true', help='Print the SQL without running it')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Table partitioning requires PostgreSQL.')
+        if not settings.FORM_PARTITIONING_ENABLED:
+            raise CommandError(
+                'Set FORM_PARTITIONING_ENABLED=True and deploy it first: partitioned tables cannot keep the '
+                'idempotency key unique constraints, so submissions must switch to advisory locks.'
+            )
+
+        today = timezone.now().date()
+        for table in PARTITIONED_TABLES:
+            with transaction.atomic(), connection.cursor() as cursor:
+                if is_partitioned(cursor, table):
+                    statements = self.maintenance_statements(cursor, table, options, today)
+                elif options['convert']:
+                    self.stdout.write(self.style.MIGRATE_HEADING(f'Converting {table}'))
+                    statements = convert_statements(cursor, table, options['months_ahead'], today)
+                else:
+                    self.stdout.write(f'{table}: not partitioned (run with --convert)')
+                    continue
+
+                for statement in statements:
+                    self.stdout.write(f'  {statement}')
+                    if not options['dry_run']:
+                        cursor.execute(statement)
+                if not statements:
+                    self.stdout.write(f'{table}: partitions up to date')
+
+            if options['explain'] and not options['dry_run']:
+                self.explain(table)
+
+    def maintenance_statements(self, cursor, table, options, today):
+        existing = set(list_partitions(cursor, table))
+        current = month_start(today)
+        months = [
+            month for month in month_range(current, add_months(current, options['months_ahead']))
+            if partition_name(table, month) not in existing
+        ]
+        overlapping = []
+        if months and default_partition_name(table) in existing:
+            for month in months:
+                rows = default_rows(cursor, table, month)
+                if rows:
+                    self.stdout.write(self.style.WARNING(
+                        f'{default_partition_name(table)} holds {rows:,} rows for {month:%Y-%m}; '
+                        f'moving them to {partition_name(table, month)}'
+                    ))
+                    overlapping.append(month)
+        columns = insert_columns(cursor, table) if overlapping else ''
+        statements = add_partition_statements(table, months, overlapping, columns)
+        if options['retention_months'] > 0:
+            cutoff = add_months(current, -options['retention_months'])
+            for name in sorted(existing):
+                month = partition_month(table, name)
+                if month is not None and add_months(month, 1) <= cutoff:
+                    statements.append(f'ALTER TABLE {table} DETACH PARTITION {name}')
+                    if options['drop_detached']:
+                        statements.append(f'DROP TABLE {name}')
+        return statements
+
+    def explain(self, table):
+        """Print how many partitions each list endpoint query plan touches"""
+        model, filter_queryset = LIST_QUERIES[table]
+        now = timezone.now()
+        queries = [
+            ('first page', {}, None),
+            ('cursor from 30 days ago', {}, encode_cursor(now - timedelta(days=30), 0)),
+            ('createdFrom last month', {'createdFrom': add_months(month_start(now), -1).isoformat()}, None),
+        ]
+        pattern = re.compile(rf'\b{table}_(?:p\d{{6}}|default)\b')
+        with connection.cursor() as cursor:
+            total = len(list_partitions(cursor, table))
+        for label, params, cursor_token in queries:
+            queryset = keyset_queryset(filter_queryset(model.objects.all(), params), cursor_token, settings.LIST_PAGE_SIZE)
+            plan = queryset.explain()
+            touched = len(set(pattern.findall(plan)))
+            self.stdout.write(f'  {label:<28} scans {touched} of {total} partitions')
@@ -0,0 +1,24 @@
+"""
+Print a signed token that makes the server profile a request.
+
+Send it as the ``X-Profile-Request`` header; the response carries the
+profile id in ``X-Profile-Id`` and the stack samples are written to
+``PROFILER_DIR``. Tokens are signed with SECRET_KEY and expire after
+``PROFILER_TOKEN_MAX_AGE`` seconds.
+
+Usage:
+    python manage.py profiler_token
+    curl -H "X-Profile-Request: $(python manage.py profiler_token)" http://localhost:8000/api/forms/wheel-specifications/list
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from kpa_project.profiling import make_profile_token
+
+
+class Command(BaseCommand):
+    help = 'Print a signed X-Profile-Request header value'
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_profile_token())
+        self.stderr.write(f"Valid for {settings.PROFILER_TOKEN_MAX_AGE} seconds")
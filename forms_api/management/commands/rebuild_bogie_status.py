@@ -0,0 +1,26 @@
+"""
+Rebuild the per-bogie latest status table from the bogie checksheets.
+
+Submissions keep ``forms_api_bogiestatus`` up to date; run this after
+loading checksheets outside the API, deleting or archiving them, or
+changing BOGIE_OK_CONDITIONS. The table is replaced in one transaction.
+
+Usage:
+    python manage.py rebuild_bogie_status
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from forms_api.helpers.bogie_status import rebuild_bogie_status
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-bogie latest status table from the bogie checksheets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Status rows inserted per statement')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        bogies = rebuild_bogie_status(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the status of {bogies:,} bogies"))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='wheelspecification',
+            index=models.Index(fields=['created_at', 'id'], name='wheelspec_created_id_idx'),
+        ),
+    ]
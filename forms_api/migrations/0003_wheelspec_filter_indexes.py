@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+# Django compiles ``__icontains`` on PostgreSQL to
+# ``UPPER("col"::text) LIKE UPPER('%value%')``, so the trigram indexes are
+# built on that exact expression for the planner to use them.
+TRIGRAM_INDEXES = [
+    ('wheelspec_form_number_trgm', 'form_number'),
+    ('wheelspec_submitted_by_trgm', 'submitted_by'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON forms_api_wheelspecification '
+            f'USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms_api', '0002_wheelspec_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='wheelspecification',
+            name='form_number',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='wheelspecification',
+            index=models.Index(fields=['submitted_date', 'created_at', 'id'], name='wheelspec_date_created_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
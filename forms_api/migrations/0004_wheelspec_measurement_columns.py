@@ -0,0 +1,127 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:20
+
+import re
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+
+
+# Frozen copy of forms_api.helpers.measurements at the time of this migration
+MEASUREMENT_PATTERN = r'^\s*([+-]?[0-9]{1,9}(?:\.[0-9]+)?)(?![0-9])'
+MEASUREMENT_FIELDS = [
+    'tread_diameter_new', 'last_shop_issue_size', 'condemning_dia', 'wheel_gauge',
+    'variation_same_axle', 'variation_same_bogie', 'variation_same_coach',
+    'bearing_seat_diameter', 'roller_bearing_outer_dia', 'roller_bearing_bore_dia',
+    'roller_bearing_width', 'axle_box_housing_bore_dia', 'wheel_disc_width',
+]
+BACKFILL_BATCH_SIZE = 2000
+
+
+def backfill_measurements(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        # One set-based UPDATE; substring() returns the first capture group
+        assignments = ', '.join(
+            f"{field}_mm = substring({field} from %s)::numeric(12, 3)" for field in MEASUREMENT_FIELDS
+        )
+        schema_editor.execute(
+            f'UPDATE forms_api_wheelspecification SET {assignments}',
+            [MEASUREMENT_PATTERN] * len(MEASUREMENT_FIELDS),
+        )
+        return
+
+    measurement_re = re.compile(MEASUREMENT_PATTERN)
+
+    def parse(value):
+        match = measurement_re.match(value or '')
+        if not match:
+            return None
+        return Decimal(match.group(1)).quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
+
+    WheelSpecification = apps.get_model('forms_api', 'WheelSpecification')
+    numeric_fields = [f'{field}_mm' for field in MEASUREMENT_FIELDS]
+    batch = []
+    for spec in WheelSpecification.objects.only('id', *MEASUREMENT_FIELDS).iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        for field in MEASUREMENT_FIELDS:
+            setattr(spec, f'{field}_mm', parse(getattr(spec, field)))
+        batch.append(spec)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            WheelSpecification.objects.bulk_update(batch, numeric_fields)
+            batch = []
+    if batch:
+        WheelSpecification.objects.bulk_update(batch, numeric_fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms_api', '0003_wheelspec_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='axle_box_housing_bore_dia_mm',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='bearing_seat_diameter_mm',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='condemning_dia_mm',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='last_shop_issue_size_mm',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='roller_bearing_bore_dia_mm',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='roller_bearing_outer_dia_mm',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='roller_bearing_width_mm',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='tread_diameter_new_mm',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='variation_same_axle_mm',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='variation_same_bogie_mm',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='variation_same_coach_mm',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='wheel_disc_width_mm',
+            field=models.DecimalField(blank=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='wheel_gauge_mm',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=3, editable=False, max_digits=12, null=True),
+        ),
+        migrations.RunPython(backfill_measurements, migrations.RunPython.noop),
+    ]
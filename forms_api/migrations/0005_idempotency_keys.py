@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms_api', '0004_wheelspec_measurement_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bogiechecksheet',
+            name='idempotency_fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='bogiechecksheet',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='idempotency_fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='bogiechecksheet',
+            constraint=models.UniqueConstraint(fields=('idempotency_key',), name='bogie_idempotency_key_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='wheelspecification',
+            constraint=models.UniqueConstraint(fields=('idempotency_key',), name='wheelspec_idempotency_key_uniq'),
+        ),
+    ]
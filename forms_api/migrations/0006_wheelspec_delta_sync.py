@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:39
+
+from django.db import migrations, models
+from django.db.models import Exists, F, OuterRef
+
+
+def backfill_sync_columns(apps, schema_editor):
+    """Existing rows: updated_at = created_at, older duplicates of a form number superseded"""
+    WheelSpecification = apps.get_model('forms_api', 'WheelSpecification')
+    WheelSpecification.objects.update(updated_at=F('created_at'))
+    newer = WheelSpecification.objects.filter(form_number=OuterRef('form_number'), id__gt=OuterRef('id'))
+    WheelSpecification.objects.filter(Exists(newer)).update(superseded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms_api', '0005_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WheelSpecificationTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('spec_id', models.BigIntegerField()),
+                ('form_number', models.CharField(max_length=50)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='superseded',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='wheelspecification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='wheelspecification',
+            index=models.Index(fields=['updated_at', 'id'], name='wheelspec_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wheelspecificationtombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='wheelspec_tomb_deleted_idx'),
+        ),
+        migrations.RunPython(backfill_sync_columns, migrations.RunPython.noop),
+    ]
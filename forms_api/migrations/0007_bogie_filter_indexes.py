@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:42
+
+from django.db import migrations, models
+
+
+# Same expression as the wheel specification trigram indexes (0003): Django
+# compiles ``__icontains`` to ``UPPER("col"::text) LIKE UPPER('%value%')``.
+TRIGRAM_INDEXES = [
+    ('bogie_form_number_trgm', 'form_number'),
+    ('bogie_inspection_by_trgm', 'inspection_by'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON forms_api_bogiechecksheet '
+            f'USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms_api', '0006_wheelspec_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bogiechecksheet',
+            name='form_number',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='bogiechecksheet',
+            index=models.Index(fields=['created_at', 'id'], name='bogie_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bogiechecksheet',
+            index=models.Index(fields=['bogie_no', 'created_at', 'id'], name='bogie_no_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bogiechecksheet',
+            index=models.Index(fields=['inspection_date', 'created_at', 'id'], name='bogie_inspdate_created_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:10
+
+from django.db import migrations
+
+
+# Condition column -> component name indexed alongside its value, so that
+# "missing dust excluder" matches dust_excluder = 'MISSING'
+CONDITION_COLUMNS = [
+    ('bogie_frame_condition', 'bogie frame'),
+    ('bolster', 'bolster'),
+    ('bolster_suspension_bracket', 'bolster suspension bracket'),
+    ('lower_spring_seat', 'lower spring seat'),
+    ('axle_guide', 'axle guide'),
+    ('axle_guide_assembly', 'axle guide assembly'),
+    ('protective_tubes', 'protective tubes'),
+    ('anchor_links', 'anchor links'),
+    ('side_bearer', 'side bearer'),
+    ('cylinder_body', 'cylinder body dome cover'),
+    ('piston_trunnion', 'piston trunnion body'),
+    ('adjusting_tube', 'adjusting tube screw'),
+    ('plunger_spring', 'plunger spring'),
+    ('tee_bolt_hex_nut', 'tee bolt hex nut'),
+    ('pawl_and_pawl_spring', 'pawl spring'),
+    ('dust_excluder', 'dust excluder'),
+]
+
+# Generated columns need an immutable expression: a literal regconfig and
+# || / coalesce rather than concat_ws
+CONDITIONS_TEXT = " || ' ' || ".join(
+    f"coalesce('{label} ' || nullif(\"{column}\", ''), '')" for column, label in CONDITION_COLUMNS
+)
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(\"deficit_components\", '')), 'A') || "
+    f"setweight(to_tsvector('english'::regconfig, {CONDITIONS_TEXT}), 'B')"
+)
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE forms_api_bogiechecksheet ADD COLUMN IF NOT EXISTS search_vector tsvector '
+        f'GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS bogie_search_vector_gin ON forms_api_bogiechecksheet USING gin (search_vector)'
+    )
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS bogie_search_vector_gin')
+    schema_editor.execute('ALTER TABLE forms_api_bogiechecksheet DROP COLUMN IF EXISTS search_vector')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms_api', '0007_bogie_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:58
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+# Frozen copy of forms_api.helpers.bogie_status at the time of this migration
+CONDITION_COLUMNS = [
+    'bogie_frame_condition', 'bolster', 'bolster_suspension_bracket', 'lower_spring_seat', 'axle_guide',
+    'axle_guide_assembly', 'protective_tubes', 'anchor_links', 'side_bearer', 'cylinder_body',
+    'piston_trunnion', 'adjusting_tube', 'plunger_spring', 'tee_bolt_hex_nut', 'pawl_and_pawl_spring',
+    'dust_excluder',
+]
+BACKFILL_BATCH_SIZE = 500
+
+
+def backfill_bogie_status(apps, schema_editor):
+    BogieChecksheet = apps.get_model('forms_api', 'BogieChecksheet')
+    BogieStatus = apps.get_model('forms_api', 'BogieStatus')
+    ok = {condition.strip().upper() for condition in settings.BOGIE_OK_CONDITIONS}
+    latest_ids = list(
+        BogieChecksheet.objects.values('bogie_no').annotate(latest=Max('id')).values_list('latest', flat=True)
+    )
+    for start in range(0, len(latest_ids), BACKFILL_BATCH_SIZE):
+        statuses = []
+        for checksheet in BogieChecksheet.objects.filter(id__in=latest_ids[start:start + BACKFILL_BATCH_SIZE]):
+            conditions = {column: getattr(checksheet, column) for column in CONDITION_COLUMNS}
+            statuses.append(BogieStatus(
+                bogie_no=checksheet.bogie_no,
+                checksheet_id=checksheet.id,
+                form_number=checksheet.form_number,
+                inspection_by=checksheet.inspection_by,
+                inspection_date=checksheet.inspection_date,
+                inspected_at=checksheet.created_at,
+                deficit_components=checksheet.deficit_components,
+                defective_count=sum(
+                    1 for value in conditions.values()
+                    if (value or '').strip() and (value or '').strip().upper() not in ok
+                ),
+                **conditions,
+            ))
+        BogieStatus.objects.bulk_create(statuses)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms_api', '0008_bogie_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BogieStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bogie_no', models.CharField(max_length=50, verbose_name='Bogie No.')),
+                ('checksheet_id', models.BigIntegerField()),
+                ('form_number', models.CharField(max_length=50)),
+                ('inspection_by', models.CharField(blank=True, max_length=50, null=True)),
+                ('inspection_date', models.DateField(blank=True, null=True)),
+                ('inspected_at', models.DateTimeField()),
+                ('deficit_components', models.TextField(blank=True, null=True, verbose_name='Deficit of component (if any)')),
+                ('bogie_frame_condition', models.CharField(blank=True, max_length=50, null=True, verbose_name='Bogie Frame Condition')),
+                ('bolster', models.CharField(blank=True, max_length=50, null=True, verbose_name='Bolster')),
+                ('bolster_suspension_bracket', models.CharField(blank=True, max_length=50, null=True, verbose_name='Bolster Suspension Bracket')),
+                ('lower_spring_seat', models.CharField(blank=True, max_length=50, null=True, verbose_name='Lower Spring Seat')),
+                ('axle_guide', models.CharField(blank=True, max_length=50, null=True, verbose_name='Axle Guide')),
+                ('axle_guide_assembly', models.CharField(blank=True, max_length=50, null=True, verbose_name='Axle Guide Assembly')),
+                ('protective_tubes', models.CharField(blank=True, max_length=50, null=True, verbose_name='Protective Tubes')),
+                ('anchor_links', models.CharField(blank=True, max_length=50, null=True, verbose_name='Anchor Links')),
+                ('side_bearer', models.CharField(blank=True, max_length=50, null=True, verbose_name='Side Bearer')),
+                ('cylinder_body', models.CharField(blank=True, max_length=50, null=True, verbose_name='Cylinder Body & Dome Cover')),
+                ('piston_trunnion', models.CharField(blank=True, max_length=50, null=True, verbose_name='Piston & Trunnion Body')),
+                ('adjusting_tube', models.CharField(blank=True, max_length=50, null=True, verbose_name='Adjusting Tube and Screw')),
+                ('plunger_spring', models.CharField(blank=True, max_length=50, null=True, verbose_name='Plunger Spring')),
+                ('tee_bolt_hex_nut', models.CharField(blank=True, max_length=50, null=True, verbose_name='Tee Bolt, Hex Nut')),
+                ('pawl_and_pawl_spring', models.CharField(blank=True, max_length=50, null=True, verbose_name='Pawl and Pawl Spring')),
+                ('dust_excluder', models.CharField(blank=True, max_length=50, null=True, verbose_name='Dust Excluder')),
+                ('defective_count', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['defective_count', 'bogie_no'], name='bogie_status_defective_idx')],
+                'constraints': [models.UniqueConstraint(fields=('bogie_no',), name='bogie_status_bogie_no_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_bogie_status, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,8 @@
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .helpers.measurements import MEASUREMENT_FIELDS, parse_measurement
 
 class BogieChecksheet(models.Model):
     # Bogie Details 
@@ -6,6 +10,8 @@ class BogieChecksheet(models.Model):
     date_of_ioh = models.DateField("Date of IOH", null=True, blank=True)
     incoming_div_and_date = models.CharField("Incoming Div. & Date", max_length=100)
     maker_year_built = models.CharField("Maker & Year Built", max_length=100)
+    # On PostgreSQL a generated search_vector column (not declared here)
+    # indexes this and the condition fields; see helpers/search.py
     deficit_components = models.TextField("Deficit of component (if any)", blank=True, null=True)
     
     # Bogie Checksheet fields 
@@ -29,11 +35,28 @@ class BogieChecksheet(models.Model):
     dust_excluder = models.CharField("Dust Excluder", max_length=50, blank=True, null=True)
     
     # Metadata
-    form_number = models.CharField(max_length=50)
+    form_number = models.CharField(max_length=50, db_index=True)
     inspection_by = models.CharField(max_length=50, blank=True, null=True)
     inspection_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    # Client retries: the unique constraint makes the database reject duplicates
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True, editable=False)
+    idempotency_fingerprint = models.CharField(max_length=64, blank=True, default='', editable=False)
     
+    class Meta:
+        indexes = [
+            # Keyset pagination on the list endpoint orders by (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='bogie_created_id_idx'),
+            # bogieNo / inspectionDate filters, combined with the keyset order
+            models.Index(fields=['bogie_no', 'created_at', 'id'], name='bogie_no_created_idx'),
+            models.Index(fields=['inspection_date', 'created_at', 'id'], name='bogie_inspdate_created_idx'),
+        ]
+        constraints = [
+            # NULL keys (submissions without a key) never conflict
+            models.UniqueConstraint(fields=['idempotency_key'], name='bogie_idempotency_key_uniq'),
+        ]
+
     def __str__(self):
         return f"{self.form_number} - {self.bogie_no}"
 
@@ -55,11 +78,136 @@ class WheelSpecification(models.Model):
     axle_box_housing_bore_dia = models.CharField("Axle Box Housing Bore Dia.", max_length=100, blank=True, null=True)
     wheel_disc_width = models.CharField("Wheel Disc Width", max_length=100, blank=True, null=True)
     
+    # Parsed numeric values (mm) of the measurement strings above, kept in
+    # sync on write for range filters. The original strings stay the record
+    # of what was submitted.
+    tread_diameter_new_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, db_index=True, editable=False)
+    last_shop_issue_size_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, db_index=True, editable=False)
+    condemning_dia_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, db_index=True, editable=False)
+    wheel_gauge_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, db_index=True, editable=False)
+    variation_same_axle_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, editable=False)
+    variation_same_bogie_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, editable=False)
+    variation_same_coach_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, editable=False)
+    bearing_seat_diameter_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, db_index=True, editable=False)
+    roller_bearing_outer_dia_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, editable=False)
+    roller_bearing_bore_dia_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, editable=False)
+    roller_bearing_width_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, editable=False)
+    axle_box_housing_bore_dia_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, editable=False)
+    wheel_disc_width_mm = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True, editable=False)
+    
     # Metadata
-    form_number = models.CharField(max_length=50)
+    form_number = models.CharField(max_length=50, db_index=True)
     submitted_by = models.CharField(max_length=50, blank=True, null=True)
     submitted_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    # Delta sync: every write moves the row past clients' watermarks. A row is
+    # superseded once a newer submission with the same form number exists.
+    updated_at = models.DateTimeField(auto_now=True)
+    superseded = models.BooleanField(default=False, editable=False)
+
+    # Client retries: the unique constraint makes the database reject duplicates
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True, editable=False)
+    idempotency_fingerprint = models.CharField(max_length=64, blank=True, default='', editable=False)
+    
+    class Meta:
+        indexes = [
+            # Keyset pagination on the list endpoint orders by (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='wheelspec_created_id_idx'),
+            # submittedDate filter, optionally combined with the keyset order
+            models.Index(fields=['submitted_date', 'created_at', 'id'], name='wheelspec_date_created_idx'),
+            # Delta sync walks changes in (updated_at, id) order
+            models.Index(fields=['updated_at', 'id'], name='wheelspec_updated_id_idx'),
+        ]
+        constraints = [
+            # NULL keys (submissions without a key) never conflict
+            models.UniqueConstraint(fields=['idempotency_key'], name='wheelspec_idempotency_key_uniq'),
+        ]
+    
+    def populate_measurements(self):
+        """Parse the measurement strings into their numeric shadow columns"""
+        for text_field, numeric_field in MEASUREMENT_FIELDS.items():
+            setattr(self, numeric_field, parse_measurement(getattr(self, text_field)))
+    
+    def save(self, *args, **kwargs):
+        self.populate_measurements()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'updated_at'} | {
+                MEASUREMENT_FIELDS[field] for field in update_fields if field in MEASUREMENT_FIELDS
+            }
+        super().save(*args, **kwargs)
     
     def __str__(self):
-        return f"{self.form_number} - Wheel Spec"
\ No newline at end of file
+        return f"{self.form_number} - Wheel Spec"
+
+
+class BogieStatus(models.Model):
+    """
+    Latest submitted checksheet of each bogie, maintained on insert (see
+    helpers/bogie_status.py) so the fleet status endpoint never aggregates.
+    """
+    bogie_no = models.CharField("Bogie No.", max_length=50)
+    # Plain id rather than a foreign key: partitioned checksheet tables
+    # have a composite primary key, and archived checksheets leave the table
+    checksheet_id = models.BigIntegerField()
+    form_number = models.CharField(max_length=50)
+    inspection_by = models.CharField(max_length=50, blank=True, null=True)
+    inspection_date = models.DateField(null=True, blank=True)
+    inspected_at = models.DateTimeField()
+    deficit_components = models.TextField("Deficit of component (if any)", blank=True, null=True)
+
+    # Bogie Checksheet fields
+    bogie_frame_condition = models.CharField("Bogie Frame Condition", max_length=50, blank=True, null=True)
+    bolster = models.CharField("Bolster", max_length=50, blank=True, null=True)
+    bolster_suspension_bracket = models.CharField("Bolster Suspension Bracket", max_length=50, blank=True, null=True)
+    lower_spring_seat = models.CharField("Lower Spring Seat", max_length=50, blank=True, null=True)
+    axle_guide = models.CharField("Axle Guide", max_length=50, blank=True, null=True)
+    axle_guide_assembly = models.CharField("Axle Guide Assembly", max_length=50, blank=True, null=True)
+    protective_tubes = models.CharField("Protective Tubes", max_length=50, blank=True, null=True)
+    anchor_links = models.CharField("Anchor Links", max_length=50, blank=True, null=True)
+    side_bearer = models.CharField("Side Bearer", max_length=50, blank=True, null=True)
+
+    # BMBC Checksheet fields
+    cylinder_body = models.CharField("Cylinder Body & Dome Cover", max_length=50, blank=True, null=True)
+    piston_trunnion = models.CharField("Piston & Trunnion Body", max_length=50, blank=True, null=True)
+    adjusting_tube = models.CharField("Adjusting Tube and Screw", max_length=50, blank=True, null=True)
+    plunger_spring = models.CharField("Plunger Spring", max_length=50, blank=True, null=True)
+    tee_bolt_hex_nut = models.CharField("Tee Bolt, Hex Nut", max_length=50, blank=True, null=True)
+    pawl_and_pawl_spring = models.CharField("Pawl and Pawl Spring", max_length=50, blank=True, null=True)
+    dust_excluder = models.CharField("Dust Excluder", max_length=50, blank=True, null=True)
+
+    defective_count = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # defectiveOnly filter in bogie_no order
+            models.Index(fields=['defective_count', 'bogie_no'], name='bogie_status_defective_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['bogie_no'], name='bogie_status_bogie_no_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.bogie_no} - {self.form_number}"
+
+
+class WheelSpecificationTombstone(models.Model):
+    """Record of a deleted wheel specification, served to delta-sync clients"""
+    spec_id = models.BigIntegerField()
+    form_number = models.CharField(max_length=50)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='wheelspec_tomb_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.form_number} - Deleted Wheel Spec {self.spec_id}"
+
+
+@receiver(post_delete, sender=WheelSpecification)
+def record_wheel_specification_tombstone(sender, instance, **kwargs):
+    WheelSpecificationTombstone.objects.create(spec_id=instance.pk, form_number=instance.form_number)
\ No newline at end of file
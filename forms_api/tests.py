@@ -1,8 +1,68 @@
-from django.test import TestCase
+import io
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import BogieChecksheet, WheelSpecification
+from rest_framework.renderers import JSONRenderer
+from kpa_project.log_queue import BoundedQueueHandler, enable_queue_logging, stop_log_listeners
+from kpa_project.metrics import OVERFLOW_KEY, SUM_OFFSET, SharedMetrics
+from kpa_project.query_stats import QueryStats
+from kpa_project.statsd import BufferedStatsd, get_statsd
+from kpa_project.profiling import StackSampler, make_profile_token, prune_profiles, render_collapsed, render_speedscope
+from .models import BogieChecksheet, BogieStatus, WheelSpecification
+from .async_views import AsyncBogieChecksheetView, AsyncWheelSpecificationGetView, AsyncWheelSpecificationPostView
+from .helpers.archive import PENDING_SUFFIX, archive_columns, archive_dir, write_archive
+from .helpers.list_cache import CacheStats, LocalLRUBackend, get_list_cache, reset_list_cache
+from .helpers.form_schema import BOGIE_CHECKSHEET_SCHEMA, WHEEL_SPECIFICATION_SCHEMA
+from .helpers.bogie_status import record_bogie_status
+from .helpers.renderers import FastJSONRenderer
+from .helpers.partitions import (
+    add_months, add_partition_statements, create_partition_sql, month_range, partition_month, partition_name,
+)
+
+
+def shared_cache_settings(test):
+    """override_settings with a file-based default cache, shared between processes like a deployed one"""
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory, True)
+    return override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory},
+    })
+
+
+WHEEL_SPECIFICATION_FIELDS = {
+    "axleBoxHousingBoreDia": "280 (+0.030/+0.052)",
+    "bearingSeatDiameter": "130.043 TO 130.068",
+    "condemningDia": "825 (800-900)",
+    "intermediateWWP": "20 TO 28",
+    "lastShopIssueSize": "837 (800-900)",
+    "rollerBearingBoreDia": "130 (+0.0/-0.025)",
+    "rollerBearingOuterDia": "280 (+0.0/-0.035)",
+    "rollerBearingWidth": "93 (+0/-0.250)",
+    "treadDiameterNew": "915 (900-1000)",
+    "variationSameAxle": "0.5",
+    "variationSameBogie": "5",
+    "variationSameCoach": "13",
+    "wheelDiscWidth": "127 (+4/-0)",
+    "wheelGauge": "1600 (+2,-1)",
+    "wheelProfile": "29.4 Flange Thickness"
+}
 
 class FormsAPITestCase(TestCase):
     def setUp(self):
@@ -134,3 +194,1252 @@ class FormsAPITestCase(TestCase):
         self.assertEqual(fields['lastShopIssueSize'], "837 (800-900)")
         self.assertEqual(fields['treadDiameterNew'], "915 (900-1000)")
         self.assertEqual(fields['wheelGauge'], "1600 (+2,-1)")
+
+
+class WheelSpecificationBulkTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('wheel-specifications-bulk')
+        self.valid_form = {
+            "fields": dict(WHEEL_SPECIFICATION_FIELDS),
+            "formNumber": "WHEEL-2025-101",
+            "submittedBy": "user_id_123",
+            "submittedDate": "2025-07-03"
+        }
+        self.invalid_form = {
+            "form_number": "W",
+            "submitted_date": "03-07-2025"
+        }
+
+    def test_bulk_post_saves_all_forms(self):
+        """Test POST /api/forms/wheel-specifications/bulk with valid forms"""
+        forms = [dict(self.valid_form, formNumber=f"WHEEL-2025-{i:03d}") for i in range(5)]
+        response = self.client.post(self.url, forms, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(response.data['success'])
+        self.assertEqual(response.data['data']['saved'], 5)
+        self.assertEqual(WheelSpecification.objects.count(), 5)
+        self.assertEqual(response.data['data']['results'][2]['formNumber'], "WHEEL-2025-002")
+        self.assertEqual(response.data['data']['results'][2]['status'], "Saved")
+
+    def test_bulk_post_atomic_rejects_whole_batch(self):
+        """Test that one invalid form rejects the whole batch in atomic mode"""
+        response = self.client.post(self.url, {"forms": [self.valid_form, self.invalid_form]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+        self.assertEqual(response.data['data']['rejected'], 1)
+        self.assertEqual(response.data['data']['results'][1]['status'], "Rejected")
+        self.assertEqual(WheelSpecification.objects.count(), 0)
+
+    def test_bulk_post_partial_saves_valid_forms(self):
+        """Test that partial mode saves valid forms and reports rejected ones"""
+        url = f"{self.url}?mode=partial"
+        response = self.client.post(url, [self.valid_form, self.invalid_form], format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['data']['saved'], 1)
+        self.assertEqual(response.data['data']['rejected'], 1)
+        self.assertEqual(WheelSpecification.objects.count(), 1)
+
+    def test_bulk_post_rejects_empty_body(self):
+        """Test that an empty batch is rejected"""
+        response = self.client.post(self.url, [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+
+
+class WheelSpecificationListPaginationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('wheel-specifications-get')
+        for i in range(5):
+            WheelSpecification.objects.create(
+                form_number=f"WHEEL-2025-{i:03d}",
+                submitted_by="user_id_123",
+                submitted_date="2025-07-03"
+            )
+
+    def test_list_keyset_pagination(self):
+        """Test that following the next cursor walks every row exactly once"""
+        seen = []
+        response = self.client.get(self.url, {'limit': 2})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(item['formNumber'] for item in response.data['data'])
+            if not response.data['next']:
+                break
+            response = self.client.get(self.url, {'limit': 2, 'cursor': response.data['next']})
+        self.assertEqual(seen, [f"WHEEL-2025-{i:03d}" for i in range(5)])
+
+    def test_list_rejects_invalid_cursor(self):
+        """Test that an undecodable cursor returns 400"""
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+
+    def test_list_stream_mode(self):
+        """Test that stream=true returns every matching row as one JSON document"""
+        response = self.client.get(self.url, {'stream': 'true', 'formNumber': '2025-00'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertTrue(body['success'])
+        self.assertEqual(len(body['data']), 5)
+        self.assertEqual(body['data'][0]['submittedDate'], "2025-07-03")
+
+    def test_list_form_number_match_modes(self):
+        """Test exact and prefix formNumber matching"""
+        response = self.client.get(self.url, {'formNumber': 'WHEEL-2025-003', 'formNumberMatch': 'exact'})
+        self.assertEqual([item['formNumber'] for item in response.data['data']], ["WHEEL-2025-003"])
+        
+        response = self.client.get(self.url, {'formNumber': 'WHEEL-2025', 'formNumberMatch': 'prefix'})
+        self.assertEqual(len(response.data['data']), 5)
+        
+        response = self.client.get(self.url, {'formNumber': '2025', 'formNumberMatch': 'prefix'})
+        self.assertEqual(len(response.data['data']), 0)
+
+    def test_list_rejects_invalid_match_mode(self):
+        """Test that an unknown formNumberMatch returns 400"""
+        response = self.client.get(self.url, {'formNumber': 'WHEEL', 'formNumberMatch': 'fuzzy'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class WheelSpecificationMeasurementTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('wheel-specifications-get')
+        for form_number, tread_diameter in [("WHEEL-2025-001", "915 (900-1000)"), ("WHEEL-2025-002", "880 (800-900)"), ("WHEEL-2025-003", "N/A")]:
+            WheelSpecification.objects.create(
+                form_number=form_number,
+                tread_diameter_new=tread_diameter,
+                bearing_seat_diameter="130.043 TO 130.068"
+            )
+
+    def test_measurements_parsed_on_write(self):
+        """Test that numeric shadow columns are populated from the strings"""
+        spec = WheelSpecification.objects.get(form_number="WHEEL-2025-001")
+        self.assertEqual(spec.tread_diameter_new_mm, Decimal("915"))
+        self.assertEqual(spec.bearing_seat_diameter_mm, Decimal("130.043"))
+        self.assertIsNone(spec.condemning_dia_mm)
+        self.assertEqual(spec.tread_diameter_new, "915 (900-1000)")
+        self.assertIsNone(WheelSpecification.objects.get(form_number="WHEEL-2025-003").tread_diameter_new_mm)
+
+    def test_list_range_filter(self):
+        """Test treadDiameterMin/treadDiameterMax range filtering"""
+        response = self.client.get(self.url, {'treadDiameterMin': '900'})
+        self.assertEqual([item['formNumber'] for item in response.data['data']], ["WHEEL-2025-001"])
+        
+        response = self.client.get(self.url, {'treadDiameterMin': '850', 'treadDiameterMax': '900'})
+        self.assertEqual([item['formNumber'] for item in response.data['data']], ["WHEEL-2025-002"])
+
+    def test_list_rejects_invalid_range(self):
+        """Test that a non-numeric range bound returns 400"""
+        response = self.client.get(self.url, {'treadDiameterMax': 'big'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(LIST_CACHE_BACKEND='local')
+class WheelSpecificationListCacheTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('wheel-specifications-get')
+        cache_override = shared_cache_settings(self)
+        cache_override.enable()
+        self.addCleanup(cache_override.disable)
+        reset_list_cache('LIST_CACHE_BACKEND')  # fresh hit/miss counters per test
+        WheelSpecification.objects.create(form_number="WHEEL-2025-001", submitted_by="user_id_123")
+
+    def test_list_served_from_cache_until_write(self):
+        """Test that repeated polls hit the cache and a new submission invalidates it"""
+        first = self.client.get(self.url, {'formNumber': 'WHEEL'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+        second = self.client.get(self.url, {'formNumber': 'WHEEL'})
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.content, second.content)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('wheel-specifications-post'), {'fields': WHEEL_SPECIFICATION_FIELDS, 'formNumber': 'WHEEL-2025-002'}, format='json')
+        
+        third = self.client.get(self.url, {'formNumber': 'WHEEL'})
+        self.assertEqual(third['X-Cache'], 'MISS')
+        self.assertEqual(len(json.loads(third.content)['data']), 2)
+        
+        stats = self.client.get(reverse('list-cache-stats')).data['data']
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+
+    def test_escaped_separators_do_not_share_a_cache_entry(self):
+        """Test that a value containing '&' and '=' is cached apart from the filters it spells out"""
+        combined = self.client.get(f"{self.url}?formNumber=WHEEL%26submittedBy%3Duser_id_123")
+        self.assertEqual(combined['X-Cache'], 'MISS')
+        self.assertEqual(json.loads(combined.content)['data'], [])
+        separate = self.client.get(f"{self.url}?formNumber=WHEEL&submittedBy=user_id_123")
+        self.assertEqual(separate['X-Cache'], 'MISS')
+        self.assertEqual(len(json.loads(separate.content)['data']), 1)
+
+    def test_local_backend_evicts_least_recently_used(self):
+        """Test entry-count eviction and TTL expiry of the local backend"""
+        stats = CacheStats()
+        backend = LocalLRUBackend(stats, ttl=60, max_entries=2, max_bytes=1024)
+        backend.set('a', b'1')
+        backend.set('b', b'2')
+        backend.get('a')
+        backend.set('c', b'3')
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('a'), b'1')
+        self.assertEqual(stats.as_dict()['evictions'], 1)
+        
+        expired = LocalLRUBackend(stats, ttl=-1, max_entries=2, max_bytes=1024)
+        expired.set('a', b'1')
+        self.assertIsNone(expired.get('a'))
+
+    def test_process_local_version_cache_is_rejected(self):
+        """Test that a LocMemCache version counter, which workers would not share, is refused"""
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            with self.assertRaises(ImproperlyConfigured):
+                get_list_cache()
+
+
+class WheelSpecificationConditionalGetTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('wheel-specifications-get')
+        WheelSpecification.objects.create(form_number="WHEEL-2025-001", submitted_by="user_id_123")
+
+    def test_list_returns_304_when_unchanged(self):
+        """Test that a matching If-None-Match is answered with 304 until the data changes"""
+        response = self.client.get(self.url, {'formNumber': 'WHEEL'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        
+        response = self.client.get(self.url, {'formNumber': 'WHEEL'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        
+        WheelSpecification.objects.create(form_number="WHEEL-2025-002")
+        response = self.client.get(self.url, {'formNumber': 'WHEEL'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_deleted_or_edited_rows_are_not_reported_unmodified(self):
+        """Test that removing an older row or editing one answers 200, even to If-Modified-Since"""
+        older = WheelSpecification.objects.get()
+        WheelSpecification.objects.create(form_number="WHEEL-2025-002", submitted_by="user_id_123")
+        first = self.client.get(self.url, {'formNumber': 'WHEEL'})
+        since = 'Thu, 01 Jan 2099 00:00:00 GMT'
+
+        older.delete()
+        response = self.client.get(self.url, {'formNumber': 'WHEEL'}, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)['data']), 1)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+        etag = response['ETag']
+        WheelSpecification.objects.filter(form_number="WHEEL-2025-002").update(
+            submitted_by="user_id_456", updated_at=timezone.now() + timedelta(seconds=1),
+        )
+        response = self.client.get(self.url, {'formNumber': 'WHEEL'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_filters(self):
+        """Test that different filter sets get different validators"""
+        first = self.client.get(self.url, {'formNumber': 'WHEEL'})
+        second = self.client.get(self.url, {'formNumber': 'WHEEL', 'limit': 1})
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+
+class FormSchemaTestCase(TestCase):
+    def test_compiled_shapes_match_the_general_pass(self):
+        """Test that repeated payload shapes give the same values and errors as the general pass"""
+        valid = {"fields": WHEEL_SPECIFICATION_FIELDS, "formNumber": "WHEEL-2025-001", "submittedDate": "2025-07-03"}
+        payloads = [
+            valid,
+            dict(valid, submittedDate="2025-13-01"),
+            dict(valid, formNumber=12345),
+            dict(valid, formNumber="   "),
+            dict(valid, formNumber="W" * 60),
+            dict(valid, fields=dict(WHEEL_SPECIFICATION_FIELDS, treadDiameterNew=None)),
+            dict(valid, fields=dict(WHEEL_SPECIFICATION_FIELDS, wheelGauge="1600")),
+            dict(valid, fields=dict(WHEEL_SPECIFICATION_FIELDS, **{"Tread Diameter (New)": "999 (900-1000)"})),
+            dict(valid, fields="not an object"),
+        ]
+        for payload in payloads + payloads:
+            self.assertEqual(WHEEL_SPECIFICATION_SCHEMA.normalize(payload), WHEEL_SPECIFICATION_SCHEMA.normalize_general(payload))
+        self.assertIn(tuple(valid), WHEEL_SPECIFICATION_SCHEMA.shape_plans)
+
+    def test_nested_and_legacy_payloads_map_to_same_columns(self):
+        """Test that nested camelCase, display labels and snake_case keys all map"""
+        nested, errors = WHEEL_SPECIFICATION_SCHEMA.normalize({
+            "fields": WHEEL_SPECIFICATION_FIELDS,
+            "formNumber": "WHEEL-2025-001",
+            "submittedDate": "2025-07-03"
+        })
+        self.assertEqual(errors, [])
+        
+        legacy_payload = {'form_number': "WHEEL-2025-001", 'submitted_date': "2025-07-03"}
+        for field in WHEEL_SPECIFICATION_SCHEMA.fields:
+            if field.section == 'fields':
+                label = str(WheelSpecification._meta.get_field(field.column).verbose_name)
+                legacy_payload[label] = WHEEL_SPECIFICATION_FIELDS[field.key]
+        legacy, errors = WHEEL_SPECIFICATION_SCHEMA.normalize(legacy_payload)
+        self.assertEqual(errors, [])
+        self.assertEqual(nested, legacy)
+        self.assertEqual(nested['tread_diameter_new'], "915 (900-1000)")
+
+    def test_missing_and_invalid_fields_are_reported(self):
+        """Test that required fields and date formats are validated"""
+        values, errors = BOGIE_CHECKSHEET_SCHEMA.normalize({
+            "bogieDetails": {"bogieNo": "BG1234", "dateOfIOH": "01-07-2025"},
+            "formNumber": "BOGIE-2025-001"
+        })
+        self.assertIn("Missing required bogie details fields: incomingDivAndDate, makerYearBuilt", errors)
+        self.assertIn("dateOfIOH: Invalid date format. Expected YYYY-MM-DD", errors)
+        self.assertTrue(any(error.startswith("Missing required BMBC checksheet fields") for error in errors))
+
+    def test_post_rejects_invalid_payload(self):
+        """Test that the POST view answers schema errors with 400"""
+        client = APIClient()
+        response = client.post(reverse('wheel-specifications-post'), {"formNumber": "WHEEL-2025-001"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+        self.assertEqual(WheelSpecification.objects.count(), 0)
+
+    def test_row_formatter_matches_instance_payload(self):
+        """Test that values_list rows render exactly like model instances"""
+        WheelSpecification.objects.create(form_number="WHEEL-2025-001", submitted_by="user_a", submitted_date="2025-07-03", wheel_gauge="1600 (+2,-1)")
+        spec = WheelSpecification.objects.get()
+        columns, format_row = WHEEL_SPECIFICATION_SCHEMA.row_formatter()
+        row = WheelSpecification.objects.values_list(*columns, 'id').get()
+        self.assertEqual(format_row(row), WHEEL_SPECIFICATION_SCHEMA.to_payload(spec))
+
+        checksheet = BogieChecksheet.objects.create(form_number="BOGIE-2025-001", bogie_no="BG1", axle_guide="Worn")
+        columns, plan = BOGIE_CHECKSHEET_SCHEMA.projection(['axleGuide', 'formNumber', 'bogieNo'])
+        columns, format_row = BOGIE_CHECKSHEET_SCHEMA.row_formatter(plan)
+        row = BogieChecksheet.objects.values_list(*columns).get()
+        self.assertEqual(format_row(row), BOGIE_CHECKSHEET_SCHEMA.to_payload(checksheet, plan))
+
+    def test_fast_renderer_matches_drf_renderer(self):
+        """Test that FastJSONRenderer output is byte-identical to JSONRenderer"""
+        data = {
+            'createdAt': timezone.now(), 'date': date(2025, 7, 3), 'gauge': Decimal('1600.500'),
+            'name': "Côte", 'items': [None, True, 1.5], 'next': None,
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_fast_renderer_escapes_line_separators_like_drf(self):
+        data = {'deficitComponents': 'Brake block\u2028worn\u2029replace', 'plain': 'no separators'}
+        rendered = FastJSONRenderer().render(data)
+        self.assertEqual(rendered, JSONRenderer().render(data))
+        self.assertIn(b'\\u2028', rendered)
+        self.assertNotIn('\u2028'.encode('utf-8'), rendered)
+
+
+class LogQueueTestCase(TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger('forms_api.tests.log_queue')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.records = []
+        handler = logging.Handler()
+        handler.emit = self.records.append
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.handlers.clear)
+
+    def test_queued_records_are_flushed_on_stop(self):
+        """Test that the listener owns the handlers and flushes every record on stop"""
+        queue_handler = enable_queue_logging(self.logger, maxsize=100, policy='block')
+        self.assertEqual(self.logger.handlers, [queue_handler])
+        for i in range(50):
+            self.logger.info(f"record {i}")
+        stop_log_listeners()
+        self.assertEqual([record.getMessage() for record in self.records], [f"record {i}" for i in range(50)])
+        self.assertNotIn(queue_handler, self.logger.handlers)
+
+    def test_drop_policy_counts_dropped_records(self):
+        """Test that a full queue drops records instead of blocking the caller"""
+        queue_handler = BoundedQueueHandler(queue.Queue(maxsize=2), policy='drop')
+        for i in range(5):
+            queue_handler.handle(logging.LogRecord('test', logging.INFO, __file__, 0, f"record {i}", None, None))
+        self.assertEqual(queue_handler.queue.qsize(), 2)
+        self.assertEqual(queue_handler.dropped, 3)
+
+    def test_records_are_formatted_by_the_listener(self):
+        """Test that the caller's thread only enqueues; formatting happens in the listener thread"""
+        formatted_in = []
+
+        class ThreadRecordingFormatter(logging.Formatter):
+            def format(self, record):
+                formatted_in.append(threading.current_thread())
+                return super().format(record)
+
+        handler = self.logger.handlers[0]
+        handler.setFormatter(ThreadRecordingFormatter())
+        handler.emit = lambda record: self.records.append(handler.format(record))
+        enable_queue_logging(self.logger, maxsize=100, policy='block')
+        context = {'form': 'WHEEL-2025-001'}
+        try:
+            raise ValueError('bad tread diameter')
+        except ValueError:
+            self.logger.exception("Failed to save %s", context)
+        context['form'] = 'changed'
+        stop_log_listeners()
+
+        self.assertNotIn(threading.current_thread(), formatted_in)
+        self.assertEqual(len(self.records), 1)
+        self.assertIn("Failed to save {'form': 'WHEEL-2025-001'}", self.records[0])
+        self.assertIn('ValueError: bad tread diameter', self.records[0])
+
+
+class AsyncViewsTestCase(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.wheel_data = {
+            "fields": WHEEL_SPECIFICATION_FIELDS,
+            "formNumber": "WHEEL-2025-101",
+            "submittedBy": "user_id_123",
+            "submittedDate": "2025-07-03"
+        }
+
+    async def test_async_wheel_specification_post(self):
+        request = self.factory.post('/api/forms/wheel-specifications', json.dumps(self.wheel_data), content_type='application/json')
+        response = await AsyncWheelSpecificationPostView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        body = json.loads(response.content)
+        self.assertTrue(body['success'])
+        self.assertEqual(body['data']['formNumber'], "WHEEL-2025-101")
+        spec = await WheelSpecification.objects.aget(form_number="WHEEL-2025-101")
+        self.assertEqual(spec.tread_diameter_new_mm, Decimal('915.000'))
+
+    def test_async_post_invalidates_the_cached_list(self):
+        """Test that an async submission bumps the list cache the sync list view fills"""
+        url = reverse('wheel-specifications-get')
+        with shared_cache_settings(self), override_settings(LIST_CACHE_BACKEND='local'):
+            self.assertEqual(APIClient().get(url)['X-Cache'], 'MISS')
+            self.assertEqual(APIClient().get(url)['X-Cache'], 'HIT')
+
+            request = self.factory.post('/api/forms/wheel-specifications', json.dumps(self.wheel_data), content_type='application/json')
+            with self.captureOnCommitCallbacks(execute=True):
+                response = async_to_sync(AsyncWheelSpecificationPostView.as_view())(request)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+            listed = APIClient().get(url)
+            self.assertEqual(listed['X-Cache'], 'MISS')
+            self.assertEqual([item['formNumber'] for item in json.loads(listed.content)['data']], ["WHEEL-2025-101"])
+
+    async def test_async_wheel_specification_post_invalid(self):
+        request = self.factory.post('/api/forms/wheel-specifications', json.dumps({"formNumber": "WHEEL-2025-102"}), content_type='application/json')
+        response = await AsyncWheelSpecificationPostView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(json.loads(response.content)['success'])
+
+    async def test_async_bogie_checksheet_rejects_malformed_json(self):
+        request = self.factory.post('/api/forms/bogie-checksheet', 'not json', content_type='application/json')
+        response = await AsyncBogieChecksheetView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_async_list_matches_pagination_and_etag(self):
+        for i in range(3):
+            await WheelSpecification.objects.acreate(form_number=f"WHEEL-2025-2{i:02d}", submitted_by="user_id_123")
+        view = AsyncWheelSpecificationGetView.as_view()
+
+        response = await view(self.factory.get('/api/forms/wheel-specifications/list', {'limit': 2}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = json.loads(response.content)
+        self.assertEqual([item['formNumber'] for item in body['data']], ["WHEEL-2025-200", "WHEEL-2025-201"])
+        self.assertIsNotNone(body['next'])
+
+        response_cursor = body['next']
+        response = await view(self.factory.get('/api/forms/wheel-specifications/list', {'limit': 2, 'cursor': response_cursor}))
+        body = json.loads(response.content)
+        self.assertEqual([item['formNumber'] for item in body['data']], ["WHEEL-2025-202"])
+        self.assertIsNone(body['next'])
+
+        etag = response['ETag']
+        response = await view(self.factory.get('/api/forms/wheel-specifications/list', {'limit': 2, 'cursor': response_cursor}, headers={'If-None-Match': etag}))
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_async_list_stream(self):
+        await WheelSpecification.objects.acreate(form_number="WHEEL-2025-300")
+        response = await AsyncWheelSpecificationGetView.as_view()(self.factory.get('/api/forms/wheel-specifications/list', {'stream': 'true'}))
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        body = json.loads(content)
+        self.assertEqual([item['formNumber'] for item in body['data']], ["WHEEL-2025-300"])
+
+    async def test_middleware_logs_async_requests(self):
+        with self.assertLogs('django.request', level='INFO') as logs:
+            response = await self.async_client.get(reverse('wheel-specifications-get'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(any('RESPONSE || METHOD: GET' in line for line in logs.output))
+
+
+class DatabaseConnectionStatsTestCase(TestCase):
+    def test_connection_stats_without_pool(self):
+        response = APIClient().get(reverse('database-connection-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['success'])
+        self.assertFalse(response.data['data']['pooled'])
+        self.assertNotIn('pool', response.data['data'])
+        self.assertIn('conn_max_age', response.data['data'])
+
+
+class FormExportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        WheelSpecification.objects.create(form_number="WHEEL-2025-001", submitted_by="user_a", submitted_date="2025-07-01", tread_diameter_new="915 (900-1000)")
+        WheelSpecification.objects.create(form_number="WHEEL-2025-002", submitted_by="user_b", submitted_date="2025-07-05", tread_diameter_new="890 (800-900)")
+        BogieChecksheet.objects.create(form_number="BOGIE-2025-001", bogie_no="BG1234", inspection_by="user_a", inspection_date="2025-07-02", incoming_div_and_date="NR / 2025-06-25", maker_year_built="RDSO/2018")
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_wheel_specification_csv_export(self):
+        response = self.client.get(reverse('wheel-specifications-export'), {'columns': 'formNumber,treadDiameterNew,treadDiameterNewMm'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        self.assertEqual(self.read(response).splitlines(), [
+            'formNumber,treadDiameterNew,treadDiameterNewMm',
+            'WHEEL-2025-001,915 (900-1000),915.000',
+            'WHEEL-2025-002,890 (800-900),890.000',
+        ])
+
+    def test_wheel_specification_ndjson_export_with_date_range(self):
+        response = self.client.get(reverse('wheel-specifications-export'), {
+            'output': 'ndjson', 'columns': 'formNumber,submittedDate',
+            'submittedDateFrom': '2025-07-03', 'submittedDateTo': '2025-07-31',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(rows, [{'formNumber': 'WHEEL-2025-002', 'submittedDate': '2025-07-05'}])
+
+    def test_bogie_checksheet_export_filters(self):
+        response = self.client.get(reverse('bogie-checksheet-export'), {'bogieNo': 'BG1234', 'columns': 'formNumber,bogieNo'})
+        self.assertEqual(self.read(response).splitlines(), ['formNumber,bogieNo', 'BOGIE-2025-001,BG1234'])
+
+        response = self.client.get(reverse('bogie-checksheet-export'), {'createdFrom': '2000-01-01', 'createdTo': '2000-01-31'})
+        self.assertEqual(len(self.read(response).splitlines()), 1)
+
+    def test_export_rejects_invalid_parameters(self):
+        for params in ({'output': 'xml'}, {'columns': 'formNumber,unknown'}, {'submittedDateFrom': '03-07-2025'}):
+            response = self.client.get(reverse('wheel-specifications-export'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertFalse(response.data['success'])
+
+
+class IdempotentSubmissionTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('wheel-specifications-post')
+        self.wheel_data = {
+            "fields": WHEEL_SPECIFICATION_FIELDS,
+            "formNumber": "WHEEL-2025-501",
+            "submittedBy": "user_id_123",
+            "submittedDate": "2025-07-03"
+        }
+
+    def test_retry_returns_stored_response_without_second_insert(self):
+        first = self.client.post(self.url, self.wheel_data, format='json', HTTP_IDEMPOTENCY_KEY='tablet-7-0001')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', first)
+
+        retry = self.client.post(self.url, self.wheel_data, format='json', HTTP_IDEMPOTENCY_KEY='tablet-7-0001')
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(json.loads(retry.content), json.loads(first.content))
+        self.assertEqual(WheelSpecification.objects.filter(form_number="WHEEL-2025-501").count(), 1)
+
+    def test_key_reused_with_different_payload(self):
+        self.client.post(self.url, self.wheel_data, format='json', HTTP_IDEMPOTENCY_KEY='tablet-7-0002')
+        changed = dict(self.wheel_data, submittedBy="someone_else")
+        response = self.client.post(self.url, changed, format='json', HTTP_IDEMPOTENCY_KEY='tablet-7-0002')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(WheelSpecification.objects.count(), 1)
+
+    def test_invalid_key_rejected(self):
+        response = self.client.post(self.url, self.wheel_data, format='json', HTTP_IDEMPOTENCY_KEY='x' * 256)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(WheelSpecification.objects.count(), 0)
+
+    def test_submissions_without_key_are_not_deduplicated(self):
+        self.client.post(self.url, self.wheel_data, format='json')
+        self.client.post(self.url, self.wheel_data, format='json')
+        self.assertEqual(WheelSpecification.objects.count(), 2)
+
+    @override_settings(IDEMPOTENCY_DERIVE_FROM_FORM_NUMBER=True)
+    def test_key_derived_from_form_number(self):
+        url = reverse('bogie-checksheet')
+        payload = {
+            "formNumber": "BOGIE-2025-501",
+            "bogieDetails": {"bogieNo": "BG1234", "dateOfIOH": "2025-07-01", "incomingDivAndDate": "NR / 2025-06-25", "makerYearBuilt": "RDSO/2018"},
+            "bogieChecksheet": {"axleGuide": "Worn", "bogieFrameCondition": "Good", "bolster": "Good", "bolsterSuspensionBracket": "Cracked", "lowerSpringSeat": "Good"},
+            "bmbcChecksheet": {"adjustingTube": "DAMAGED", "cylinderBody": "WORN OUT", "pistonTrunnion": "GOOD", "plungerSpring": "GOOD"},
+        }
+        self.assertEqual(self.client.post(url, payload, format='json').status_code, status.HTTP_201_CREATED)
+        retry = self.client.post(url, payload, format='json')
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(BogieChecksheet.objects.get().idempotency_key, 'form:BOGIE-2025-501')
+
+    @override_settings(FORM_PARTITIONING_ENABLED=True)
+    def test_partitioned_tables_use_locked_lookup(self):
+        first = self.client.post(self.url, self.wheel_data, format='json', HTTP_IDEMPOTENCY_KEY='tablet-7-0003')
+        retry = self.client.post(self.url, self.wheel_data, format='json', HTTP_IDEMPOTENCY_KEY='tablet-7-0003')
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(json.loads(retry.content), json.loads(first.content))
+
+        changed = dict(self.wheel_data, submittedBy="someone_else")
+        response = self.client.post(self.url, changed, format='json', HTTP_IDEMPOTENCY_KEY='tablet-7-0003')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(WheelSpecification.objects.count(), 1)
+
+
+class PartitionHelperTestCase(TestCase):
+    def test_monthly_partitions(self):
+        self.assertEqual(add_months(date(2025, 11, 1), 3), date(2026, 2, 1))
+        self.assertEqual(add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+        self.assertEqual(list(month_range(date(2025, 11, 20), date(2026, 1, 1))), [date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1)])
+
+        name = partition_name('forms_api_wheelspecification', date(2025, 12, 1))
+        self.assertEqual(name, 'forms_api_wheelspecification_p202512')
+        self.assertEqual(partition_month('forms_api_wheelspecification', name), date(2025, 12, 1))
+        self.assertIsNone(partition_month('forms_api_wheelspecification', 'forms_api_wheelspecification_default'))
+        self.assertEqual(
+            create_partition_sql('forms_api_wheelspecification', date(2025, 12, 1)),
+            "CREATE TABLE IF NOT EXISTS forms_api_wheelspecification_p202512 PARTITION OF forms_api_wheelspecification "
+            "FOR VALUES FROM ('2025-12-01T00:00:00+00:00') TO ('2026-01-01T00:00:00+00:00')",
+        )
+
+    def test_new_partitions_take_over_rows_from_the_default_partition(self):
+        table = 'forms_api_wheelspecification'
+        months = [date(2025, 12, 1), date(2026, 1, 1)]
+        self.assertEqual(
+            add_partition_statements(table, months, [], '"id"'),
+            [create_partition_sql(table, month) for month in months],
+        )
+
+        statements = add_partition_statements(table, months, [date(2025, 12, 1)], '"id", "created_at"')
+        december = "created_at >= '2025-12-01T00:00:00+00:00' AND created_at < '2026-01-01T00:00:00+00:00'"
+        self.assertEqual(statements, [
+            f'ALTER TABLE {table} DETACH PARTITION {table}_default',
+            create_partition_sql(table, date(2025, 12, 1)),
+            create_partition_sql(table, date(2026, 1, 1)),
+            f'INSERT INTO {table}_p202512 ("id", "created_at") SELECT "id", "created_at" FROM {table}_default WHERE {december}',
+            f'DELETE FROM {table}_default WHERE {december}',
+            f'ALTER TABLE {table} ATTACH PARTITION {table}_default DEFAULT',
+        ])
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class WheelSpecificationSyncTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('wheel-specifications-sync')
+        for i in range(3):
+            WheelSpecification.objects.create(form_number=f"WHEEL-2025-6{i:02d}")
+
+    def sync(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_pages_through_changes_and_returns_watermark(self):
+        first = self.sync(limit=2)
+        self.assertEqual([c['formNumber'] for c in first['data']['changes']], ["WHEEL-2025-600", "WHEEL-2025-601"])
+        self.assertTrue(first['hasMore'])
+
+        second = self.sync(limit=2, watermark=first['watermark'])
+        self.assertEqual([c['formNumber'] for c in second['data']['changes']], ["WHEEL-2025-602"])
+        self.assertFalse(second['hasMore'])
+
+        # Nothing changed: empty page, watermark unchanged
+        third = self.sync(watermark=second['watermark'])
+        self.assertEqual(third['data'], {'changes': [], 'tombstones': []})
+        self.assertEqual(third['watermark'], second['watermark'])
+
+    def test_updates_deletes_and_superseded_forms(self):
+        watermark = self.sync()['watermark']
+
+        spec = WheelSpecification.objects.get(form_number="WHEEL-2025-600")
+        spec.submitted_by = "user_b"
+        spec.save(update_fields=['submitted_by'])
+        deleted = WheelSpecification.objects.get(form_number="WHEEL-2025-601")
+        deleted_id = deleted.id
+        deleted.delete()
+        original_id = WheelSpecification.objects.get(form_number="WHEEL-2025-602").id
+        self.client.post(reverse('wheel-specifications-post'), {'fields': WHEEL_SPECIFICATION_FIELDS, 'formNumber': "WHEEL-2025-602"}, format='json')
+
+        page = self.sync(watermark=watermark)
+        self.assertEqual(
+            [(c['formNumber'], c['submittedBy']) for c in page['data']['changes']],
+            [("WHEEL-2025-600", "user_b"), ("WHEEL-2025-602", "")]
+        )
+        self.assertEqual(
+            sorted((t['id'], t['reason']) for t in page['data']['tombstones']),
+            sorted([(deleted_id, 'deleted'), (original_id, 'superseded')])
+        )
+
+    def test_invalid_watermark(self):
+        response = self.client.get(self.url, {'watermark': 'not-a-watermark'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BogieChecksheetQueryTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('bogie-checksheet-get')
+        conditions = ['Good', 'Worn', 'Cracked']
+        for i in range(3):
+            BogieChecksheet.objects.create(
+                form_number=f"BOGIE-2025-7{i:02d}", bogie_no=f"BG{i % 2}", inspection_by="user_a",
+                inspection_date=f"2025-07-0{i + 1}", axle_guide=conditions[i],
+                incoming_div_and_date="NR / 2025-06-25", maker_year_built="RDSO/2018",
+            )
+
+    def form_numbers(self, response):
+        return [item['formNumber'] for item in response.data['data']]
+
+    def test_list_filters(self):
+        self.assertEqual(self.form_numbers(self.client.get(self.url, {'bogieNo': 'BG0'})), ["BOGIE-2025-700", "BOGIE-2025-702"])
+        self.assertEqual(self.form_numbers(self.client.get(self.url, {'axleGuide': 'Worn,Cracked'})), ["BOGIE-2025-701", "BOGIE-2025-702"])
+        self.assertEqual(self.form_numbers(self.client.get(self.url, {'inspectionDateFrom': '2025-07-02', 'inspectionDateTo': '2025-07-02'})), ["BOGIE-2025-701"])
+        self.assertEqual(self.form_numbers(self.client.get(self.url, {'formNumber': '701', 'inspectionBy': 'USER_A'})), ["BOGIE-2025-701"])
+
+    def test_keyset_pagination(self):
+        first = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(self.form_numbers(first), ["BOGIE-2025-700", "BOGIE-2025-701"])
+        second = self.client.get(self.url, {'limit': 2, 'cursor': first.data['next']})
+        self.assertEqual(self.form_numbers(second), ["BOGIE-2025-702"])
+        self.assertIsNone(second.data['next'])
+
+    def test_field_projection(self):
+        response = self.client.get(self.url, {'fields': 'formNumber,bogieNo,axleGuide', 'limit': 1})
+        self.assertEqual(response.data['data'], [{
+            'formNumber': "BOGIE-2025-700",
+            'bogieDetails': {'bogieNo': "BG0"},
+            'bogieChecksheet': {'axleGuide': "Good"},
+            'id': BogieChecksheet.objects.get(form_number="BOGIE-2025-700").id,
+        }])
+
+        response = self.client.get(self.url, {'fields': 'formNumber,notAField'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve(self):
+        checksheet = BogieChecksheet.objects.get(form_number="BOGIE-2025-701")
+        response = self.client.get(reverse('bogie-checksheet-detail', args=[checksheet.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['bogieChecksheet']['axleGuide'], "Worn")
+        self.assertEqual(response.data['data']['bogieDetails']['bogieNo'], "BG1")
+
+        response = self.client.get(reverse('bogie-checksheet-detail', args=[checksheet.id + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BogieChecksheetSearchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('bogie-checksheet-search')
+        rows = [
+            ("BOGIE-2025-800", "BG0", "Dust excluder missing", "GOOD"),
+            ("BOGIE-2025-801", "BG1", "Side bearer pad damaged", "MISSING"),
+            ("BOGIE-2025-802", "BG0", "No deficiency", "GOOD"),
+            ("BOGIE-2025-803", "BG1", "Dust excluder missing, replaced from stock", "GOOD"),
+        ]
+        for form_number, bogie_no, deficit, dust_excluder in rows:
+            BogieChecksheet.objects.create(
+                form_number=form_number, bogie_no=bogie_no, deficit_components=deficit, dust_excluder=dust_excluder,
+                incoming_div_and_date="NR / 2025-06-25", maker_year_built="RDSO/2018",
+            )
+
+    def form_numbers(self, response):
+        return [item['formNumber'] for item in response.data['data']]
+
+    def test_search_notes_and_conditions(self):
+        response = self.client.get(self.url, {'q': 'missing dust excluder'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.form_numbers(response), ["BOGIE-2025-800", "BOGIE-2025-801", "BOGIE-2025-803"])
+        self.assertIn('rank', response.data['data'][0])
+
+        response = self.client.get(self.url, {'q': 'dust excluder', 'bogieNo': 'BG1', 'fields': 'formNumber'})
+        self.assertEqual(response.data['data'][0]['formNumber'], "BOGIE-2025-801")
+        self.assertNotIn('bogieDetails', response.data['data'][0])
+
+    def test_pagination(self):
+        first = self.client.get(self.url, {'q': 'missing', 'limit': 2})
+        self.assertEqual(len(first.data['data']), 2)
+        second = self.client.get(self.url, {'q': 'missing', 'limit': 2, 'cursor': first.data['next']})
+        self.assertEqual(len(second.data['data']), 1)
+        self.assertIsNone(second.data['next'])
+        self.assertEqual(
+            sorted(self.form_numbers(first) + self.form_numbers(second)),
+            ["BOGIE-2025-800", "BOGIE-2025-801", "BOGIE-2025-803"],
+        )
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'q': 'dust', 'cursor': 'not-a-cursor'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FormArchiveTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        self.settings_override = override_settings(ARCHIVE_DIR=self.archive_dir)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        for i in range(5):
+            spec = WheelSpecification(
+                form_number=f"WHEEL-2023-{i:03d}", submitted_by=f"user_{i % 2}", submitted_date=f"2023-03-0{i + 1}",
+                tread_diameter_new=f"{900 + i * 10} (900-1000)",
+            )
+            spec.save()
+        WheelSpecification.objects.create(form_number="WHEEL-2025-999", submitted_by="user_0")
+        old = timezone.now() - timedelta(days=800)
+        WheelSpecification.objects.filter(form_number__startswith="WHEEL-2023-").update(created_at=old)
+
+        for i, condition in enumerate(['Good', 'Worn', 'Cracked']):
+            BogieChecksheet.objects.create(
+                form_number=f"BOGIE-2023-{i:03d}", bogie_no=f"BG{i}", axle_guide=condition,
+                incoming_div_and_date="NR / 2023-03-01", maker_year_built="RDSO/2018",
+            )
+        BogieChecksheet.objects.update(created_at=old)
+
+        call_command('archive_form_rows', rows_per_file=2, stdout=io.StringIO())
+
+    def form_numbers(self, response):
+        return [item['formNumber'] for item in response.data['data']]
+
+    def test_aged_rows_moved_to_archive_files(self):
+        self.assertEqual(list(WheelSpecification.objects.values_list('form_number', flat=True)), ["WHEEL-2025-999"])
+        self.assertEqual(BogieChecksheet.objects.count(), 0)
+        files = sorted(os.listdir(os.path.join(self.archive_dir, 'forms_api_wheelspecification')))
+        self.assertEqual(len(files), 3)
+        self.assertTrue(all(name.endswith('.kpac') for name in files))
+
+    def test_archive_list_filters_and_pagination(self):
+        url = reverse('wheel-specifications-archive')
+        first = self.client.get(url, {'limit': 2})
+        self.assertEqual(self.form_numbers(first), ["WHEEL-2023-000", "WHEEL-2023-001"])
+        second = self.client.get(url, {'limit': 2, 'cursor': first.data['next']})
+        self.assertEqual(self.form_numbers(second), ["WHEEL-2023-002", "WHEEL-2023-003"])
+
+        self.assertEqual(self.form_numbers(self.client.get(url, {'submittedBy': 'USER_1'})), ["WHEEL-2023-001", "WHEEL-2023-003"])
+        self.assertEqual(self.form_numbers(self.client.get(url, {'treadDiameterMin': '925'})), ["WHEEL-2023-003", "WHEEL-2023-004"])
+        self.assertEqual(self.form_numbers(self.client.get(url, {'submittedDate': '2023-03-05'})), ["WHEEL-2023-004"])
+        self.assertEqual(self.form_numbers(self.client.get(url, {'formNumber': 'WHEEL-2025-999', 'formNumberMatch': 'exact'})), [])
+        self.assertEqual(self.client.get(url, {'submittedDateFrom': 'bad'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse('bogie-checksheet-archive'), {'axleGuide': 'Worn,Cracked', 'fields': 'formNumber,axleGuide'})
+        self.assertEqual(response.data['data'][0]['bogieChecksheet'], {'axleGuide': "Worn"})
+        self.assertEqual(self.form_numbers(response), ["BOGIE-2023-001", "BOGIE-2023-002"])
+
+    @override_settings(LIST_CACHE_BACKEND='local')
+    def test_recovery_deletes_only_the_rows_in_the_pending_file(self):
+        """Rows inserted since with keys inside the pending file's range are kept"""
+        cache_override = shared_cache_settings(self)
+        cache_override.enable()
+        self.addCleanup(cache_override.disable)
+        kept = WheelSpecification.objects.create(form_number="WHEEL-2025-1000", submitted_by="user_0")
+        archived = WheelSpecification.objects.create(form_number="WHEEL-2025-1001", submitted_by="user_0")
+        columns = archive_columns(WheelSpecification)
+        pending = archive_dir(WheelSpecification) / f'recovered{PENDING_SUFFIX}'
+        write_archive(pending, WheelSpecification, columns, list(WheelSpecification.objects.filter(pk=archived.pk).values_list(*columns)))
+        label = WheelSpecification._meta.label_lower
+        version = get_list_cache().current_version(label)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('archive_form_rows', forms='wheel', stdout=io.StringIO())
+
+        self.assertEqual(
+            sorted(WheelSpecification.objects.values_list('form_number', flat=True)),
+            ["WHEEL-2025-1000", "WHEEL-2025-999"],
+        )
+        self.assertTrue(WheelSpecification.objects.filter(pk=kept.pk).exists())
+        self.assertTrue(pending.with_name('recovered.kpac').exists())
+        self.assertNotEqual(get_list_cache().current_version(label), version)
+
+
+class BogieFleetStatusTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('bogie-fleet-status')
+
+    def submit(self, form_number, bogie_no, axle_guide, **headers):
+        payload = {
+            "formNumber": form_number,
+            "inspectionBy": "user_a",
+            "inspectionDate": "2025-07-03",
+            "bogieDetails": {"bogieNo": bogie_no, "dateOfIOH": "2025-07-01", "incomingDivAndDate": "NR / 2025-06-25", "makerYearBuilt": "RDSO/2018"},
+            "bogieChecksheet": {"axleGuide": axle_guide, "bogieFrameCondition": "Good", "bolster": "Good", "bolsterSuspensionBracket": "Good", "lowerSpringSeat": "Good"},
+            "bmbcChecksheet": {"adjustingTube": "GOOD", "cylinderBody": "WORN OUT", "pistonTrunnion": "GOOD", "plungerSpring": "GOOD"},
+        }
+        response = self.client.post(reverse('bogie-checksheet'), payload, format='json', **headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_submissions_keep_latest_status_per_bogie(self):
+        self.submit("BOGIE-2025-901", "BG2", "Good")
+        self.submit("BOGIE-2025-902", "BG1", "Cracked")
+        self.submit("BOGIE-2025-903", "BG2", "Worn", HTTP_IDEMPOTENCY_KEY='tablet-9-0001')
+        self.submit("BOGIE-2025-903", "BG2", "Worn", HTTP_IDEMPOTENCY_KEY='tablet-9-0001')
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['bogieNo'] for item in response.data['data']], ["BG1", "BG2"])
+        latest = response.data['data'][1]
+        self.assertEqual(latest['formNumber'], "BOGIE-2025-903")
+        self.assertEqual(latest['checksheetId'], BogieChecksheet.objects.get(form_number="BOGIE-2025-903").id)
+        self.assertEqual(latest['bogieChecksheet']['axleGuide'], "Worn")
+        self.assertEqual(latest['bmbcChecksheet']['cylinderBody'], "WORN OUT")
+        self.assertEqual(latest['defectiveCount'], 2)
+
+    def test_older_checksheet_does_not_replace_newer_status(self):
+        self.submit("BOGIE-2025-911", "BG3", "Worn")
+        older = BogieChecksheet.objects.get()
+        self.submit("BOGIE-2025-912", "BG3", "Good")
+        record_bogie_status(older)
+        self.assertEqual(BogieStatus.objects.get(bogie_no="BG3").form_number, "BOGIE-2025-912")
+
+    def test_filters_pagination_and_rebuild(self):
+        for i, axle_guide in enumerate(["Good", "Cracked", "Good"]):
+            BogieChecksheet.objects.create(
+                form_number=f"BOGIE-2025-92{i}", bogie_no=f"BG{i}", axle_guide=axle_guide, bogie_frame_condition="Good",
+                incoming_div_and_date="NR / 2025-06-25", maker_year_built="RDSO/2018",
+            )
+        call_command('rebuild_bogie_status', stdout=io.StringIO())
+        self.assertEqual(BogieStatus.objects.count(), 3)
+
+        first = self.client.get(self.url, {'limit': 2})
+        self.assertEqual([item['bogieNo'] for item in first.data['data']], ["BG0", "BG1"])
+        second = self.client.get(self.url, {'limit': 2, 'cursor': first.data['next']})
+        self.assertEqual([item['bogieNo'] for item in second.data['data']], ["BG2"])
+        self.assertIsNone(second.data['next'])
+
+        defective = self.client.get(self.url, {'defectiveOnly': 'true'})
+        self.assertEqual([item['bogieNo'] for item in defective.data['data']], ["BG1"])
+        self.assertEqual([item['bogieNo'] for item in self.client.get(self.url, {'bogieNo': 'BG0,BG2'}).data['data']], ["BG0", "BG2"])
+        self.assertEqual(self.client.get(self.url, {'defectiveOnly': 'maybe'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'cursor': 'not-a-cursor'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class IngestQueueTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        queue_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, queue_dir)
+        self.settings_override = override_settings(
+            INGEST_QUEUE_ENABLED=True, INGEST_QUEUE_PATH=os.path.join(queue_dir, 'ingest.sqlite3'),
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.wheel_data = {
+            "fields": WHEEL_SPECIFICATION_FIELDS,
+            "formNumber": "WHEEL-2025-601",
+            "submittedBy": "user_id_123",
+            "submittedDate": "2025-07-03"
+        }
+        self.bogie_data = {
+            "formNumber": "BOGIE-2025-601",
+            "bogieDetails": {"bogieNo": "BG1234", "dateOfIOH": "2025-07-01", "incomingDivAndDate": "NR / 2025-06-25", "makerYearBuilt": "RDSO/2018"},
+            "bogieChecksheet": {"axleGuide": "Worn", "bogieFrameCondition": "Good", "bolster": "Good", "bolsterSuspensionBracket": "Cracked", "lowerSpringSeat": "Good"},
+            "bmbcChecksheet": {"adjustingTube": "DAMAGED", "cylinderBody": "WORN OUT", "pistonTrunnion": "GOOD", "plungerSpring": "GOOD"},
+        }
+
+    def receipt_status(self, receipt):
+        return self.client.get(reverse('submission-status', args=[receipt])).data['data']
+
+    def drain(self):
+        call_command('drain_ingest_queue', once=True, stdout=io.StringIO())
+
+    def test_submissions_are_queued_then_drained(self):
+        wheel = self.client.post(reverse('wheel-specifications-post'), self.wheel_data, format='json')
+        bogie = self.client.post(reverse('bogie-checksheet'), self.bogie_data, format='json')
+        self.assertEqual(wheel.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(bogie.status_code, status.HTTP_202_ACCEPTED)
+        receipt = wheel.data['data']['receipt']
+        self.assertEqual(wheel['Location'], reverse('submission-status', args=[receipt]))
+        self.assertEqual(self.receipt_status(receipt)['status'], 'queued')
+        self.assertEqual(WheelSpecification.objects.count(), 0)
+
+        self.drain()
+        spec = WheelSpecification.objects.get()
+        self.assertEqual(spec.form_number, "WHEEL-2025-601")
+        self.assertEqual(spec.tread_diameter_new_mm, Decimal('915.000'))
+        status_data = self.receipt_status(receipt)
+        self.assertEqual((status_data['status'], status_data['id']), ('saved', spec.id))
+        self.assertIsNotNone(status_data['processedAt'])
+
+        checksheet = BogieChecksheet.objects.get()
+        self.assertEqual(self.receipt_status(bogie.data['data']['receipt'])['id'], checksheet.id)
+        self.assertEqual(BogieStatus.objects.get(bogie_no="BG1234").checksheet_id, checksheet.id)
+
+    def test_idempotency_keys(self):
+        url = reverse('wheel-specifications-post')
+        first = self.client.post(url, self.wheel_data, format='json', HTTP_IDEMPOTENCY_KEY='tablet-8-0001')
+        retry = self.client.post(url, self.wheel_data, format='json', HTTP_IDEMPOTENCY_KEY='tablet-8-0001')
+        self.assertEqual(retry.data['data']['receipt'], first.data['data']['receipt'])
+        changed = dict(self.wheel_data, submittedBy="someone_else")
+        response = self.client.post(url, changed, format='json', HTTP_IDEMPOTENCY_KEY='tablet-8-0001')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        # A key already saved by a direct POST is replayed, not inserted again
+        with override_settings(INGEST_QUEUE_ENABLED=False):
+            self.client.post(url, self.wheel_data, format='json', HTTP_IDEMPOTENCY_KEY='tablet-8-0002')
+        queued = self.client.post(url, self.wheel_data, format='json', HTTP_IDEMPOTENCY_KEY='tablet-8-0002')
+        self.drain()
+        self.assertEqual(WheelSpecification.objects.count(), 2)
+        self.assertEqual(self.receipt_status(queued.data['data']['receipt'])['status'], 'replayed')
+
+    def test_backpressure_and_unknown_receipt(self):
+        url = reverse('wheel-specifications-post')
+        with override_settings(INGEST_QUEUE_MAX_DEPTH=1):
+            self.assertEqual(self.client.post(url, self.wheel_data, format='json').status_code, status.HTTP_202_ACCEPTED)
+            response = self.client.post(url, self.wheel_data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response['Retry-After'], '5')
+
+        response = self.client.get(reverse('submission-status', args=['0' * 32]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_async_view_queues(self):
+        request = AsyncRequestFactory().post('/api/forms/wheel-specifications', json.dumps(self.wheel_data), content_type='application/json')
+        response = await AsyncWheelSpecificationPostView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(json.loads(response.content)['data']['status'], 'Queued')
+
+
+def record_in_child(path):
+    SharedMetrics(path).record('api/forms/wheel-specifications', 'POST', '201', 0.02)
+
+
+class RequestMetricsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, metrics_dir)
+        self.path = os.path.join(metrics_dir, 'metrics.mmap')
+        self.settings_override = override_settings(METRICS_ENABLED=True, METRICS_PATH=self.path)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_requests_are_exposed_per_route_and_status(self):
+        self.client.get(reverse('wheel-specifications-get'))
+        self.client.get(reverse('bogie-checksheet-detail', args=[999999]))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('kpa_http_requests_total{route="api/forms/wheel-specifications/list",method="GET",status="200"} 1', body)
+        self.assertIn('kpa_http_requests_total{route="api/forms/bogie-checksheet/<int:pk>",method="GET",status="404"} 1', body)
+        self.assertIn('# TYPE kpa_http_request_duration_seconds histogram', body)
+        self.assertIn('kpa_http_request_duration_seconds_bucket{route="api/forms/wheel-specifications/list",method="GET",status="200",le="+Inf"} 1', body)
+
+    def test_workers_share_the_totals(self):
+        SharedMetrics(self.path).record('api/forms/wheel-specifications', 'POST', '201', 0.003)
+        child = multiprocessing.get_context('fork').Process(target=record_in_child, args=(self.path,))
+        child.start()
+        child.join()
+
+        counts = SharedMetrics(self.path).snapshot()[('api/forms/wheel-specifications', 'POST', '201')]
+        self.assertEqual(counts[0], 1)  # <= 5ms
+        self.assertEqual(counts[2], 1)  # <= 25ms
+        self.assertEqual(sum(counts[:SUM_OFFSET]), 2)
+        self.assertEqual(counts[SUM_OFFSET], 23000)
+
+    def test_series_past_the_limit_go_to_overflow(self):
+        metrics = SharedMetrics(self.path, segments=2, series=3)
+        for status_code in ('200', '201', '400', '404'):
+            metrics.record('api/forms/wheel-specifications', 'POST', status_code, 0.01)
+        totals = metrics.snapshot()
+        self.assertEqual(len(totals), 3)
+        self.assertEqual(sum(totals[OVERFLOW_KEY][:SUM_OFFSET]), 2)
+
+    def test_disabled_metrics_return_404(self):
+        with override_settings(METRICS_ENABLED=False):
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(QUERY_STATS_SAMPLE_RATE=1.0, QUERY_STATS_HEADERS=True)
+class QueryStatsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_sampled_request_reports_queries_in_headers_and_log(self):
+        with self.assertLogs('django.request', level='INFO') as logs:
+            response = self.client.get(reverse('wheel-specifications-get'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(int(response['X-DB-Query-Count']), 1)
+        self.assertIn('X-DB-Time-Ms', response)
+        self.assertTrue(any('RESPONSE' in line and 'QUERIES: ' in line for line in logs.output))
+
+    async def test_async_stack_counts_queries(self):
+        response = await self.async_client.get(reverse('wheel-specifications-get'))
+        self.assertGreaterEqual(int(response['X-DB-Query-Count']), 1)
+
+    @override_settings(QUERY_STATS_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_instrumented(self):
+        response = self.client.get(reverse('wheel-specifications-get'))
+        self.assertNotIn('X-DB-Query-Count', response)
+
+    @override_settings(QUERY_STATS_HEADERS=False)
+    def test_headers_are_opt_in(self):
+        response = self.client.get(reverse('wheel-specifications-get'))
+        self.assertNotIn('X-DB-Query-Count', response)
+
+    def test_repeated_statements_are_flagged(self):
+        stats = QueryStats('GET /test', slow_threshold=60, repeat_threshold=3)
+        with stats.capture():
+            for pk in range(4):
+                WheelSpecification.objects.filter(pk=pk).exists()
+            WheelSpecification.objects.count()
+        self.assertEqual(stats.count, 5)
+        [(sql, executions)] = stats.repeated()
+        self.assertEqual(executions, 4)
+        with self.assertLogs('django.db.backends', level='WARNING') as logs:
+            stats.log_repeated()
+        self.assertIn('REPEATED QUERY || REQUEST: GET /test || EXECUTIONS: 4', logs.output[0])
+
+    def test_slow_statements_are_logged_without_parameters(self):
+        stats = QueryStats('GET /test', slow_threshold=0)
+        with self.assertLogs('django.db.backends', level='WARNING') as logs:
+            with stats.capture():
+                WheelSpecification.objects.filter(form_number='WHEEL-SECRET').exists()
+        self.assertIn('SLOW QUERY', logs.output[0])
+        self.assertNotIn('WHEEL-SECRET', logs.output[0])
+        self.assertIsNotNone(stats.slowest_sql)
+
+
+class StatsdTestCase(TestCase):
+    """DogStatsD client against a local UDP listener standing in for the agent"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.agent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.agent.bind(('127.0.0.1', 0))
+        self.agent.settimeout(2)
+        self.addCleanup(self.agent.close)
+        self.port = self.agent.getsockname()[1]
+
+    def received(self, packets):
+        return [self.agent.recv(65535).decode() for _ in range(packets)]
+
+    def test_aggregates_and_batches_packets(self):
+        statsd = BufferedStatsd('127.0.0.1', self.port, prefix='kpa', constant_tags={'env': 'test'}, flush_interval=60, max_packet_size=100)
+        self.addCleanup(statsd.stop)
+        for _ in range(3):
+            statsd.increment('forms.submitted', tags={'form': 'wheel_specification'})
+        statsd.gauge('ingest.queue_depth', 7)
+        statsd.gauge('ingest.queue_depth', 4)
+        statsd.timing('http.request.duration', 12)
+        statsd.timing('http.request.duration', 30)
+
+        sent = statsd.flush()
+        packets = self.received(sent)
+        self.assertEqual(sent, 2)
+        self.assertTrue(all(len(packet) <= 100 for packet in packets))
+        self.assertEqual('\n'.join(packets).split('\n'), [
+            'kpa.forms.submitted:3|c|#env:test,form:wheel_specification',
+            'kpa.ingest.queue_depth:4|g|#env:test',
+            'kpa.http.request.duration:12:30|ms|#env:test',
+        ])
+        self.assertEqual(statsd.flush(), 0)
+
+    def test_long_series_are_split_to_fit_packets(self):
+        statsd = BufferedStatsd('127.0.0.1', self.port, prefix='kpa', constant_tags={'env': 'test'}, flush_interval=60, max_packet_size=1432)
+        self.addCleanup(statsd.stop)
+        for milliseconds in range(5000):
+            statsd.timing('http.request.duration', milliseconds + 0.5, tags={'route': 'api/forms/wheel-specifications/list'})
+
+        packets = list(statsd.packets(statsd.lines()))
+        self.assertGreater(len(packets), 1)
+        self.assertTrue(all(len(packet) <= 1432 for packet in packets))
+        lines = b'\n'.join(packets).decode().split('\n')
+        self.assertTrue(all(line.endswith('|ms|@0.2|#env:test,route:api/forms/wheel-specifications/list') for line in lines))
+        values = [value for line in lines for value in line.split('|')[0].split(':')[1:]]
+        self.assertEqual(len(values), 1000)
+
+    def test_samples_past_the_limit_carry_a_rate(self):
+        statsd = BufferedStatsd('127.0.0.1', self.port, flush_interval=60, max_samples=2)
+        self.addCleanup(statsd.stop)
+        for rows in range(10):
+            statsd.histogram('forms.list.rows', rows)
+        [line] = statsd.lines()
+        self.assertRegex(line, r'^forms\.list\.rows:\d:\d\|h\|@0\.2$')
+
+    def test_form_views_emit_business_metrics(self):
+        with override_settings(STATSD_ENABLED=True, STATSD_HOST='127.0.0.1', STATSD_PORT=self.port, STATSD_FLUSH_INTERVAL=60,
+                               STATSD_CONSTANT_TAGS={}, STATSD_MAX_PACKET_SIZE=8192):
+            wheel_data = {"fields": WHEEL_SPECIFICATION_FIELDS, "formNumber": "WHEEL-2025-701", "submittedDate": "2025-07-03"}
+            self.client.post(reverse('wheel-specifications-post'), wheel_data, format='json')
+            self.client.post(reverse('wheel-specifications-post'), {"formNumber": "WHEEL-2025-702"}, format='json')
+            self.client.get(reverse('wheel-specifications-get'))
+            lines = self.received(get_statsd().flush())[0].split('\n')
+        self.assertIn('kpa.forms.submitted:1|c|#form:wheel_specification,result:created', lines)
+        self.assertIn('kpa.forms.rejected:1|c|#form:wheel_specification,reason:validation', lines)
+        self.assertIn('kpa.forms.list.rows:1|h|#form:wheel_specification', lines)
+        self.assertTrue(any(line.startswith('kpa.http.request.duration:') and 'route:api/forms/wheel-specifications,' in line for line in lines))
+
+
+class RequestProfilerTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        self.settings_override = override_settings(
+            PROFILER_ENABLED=True, PROFILER_DIR=self.profile_dir, PROFILER_INTERVAL_MS=1, PROFILER_SAMPLE_RATE=0,
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_signed_header_profiles_the_request(self):
+        response = self.client.get(reverse('wheel-specifications-get'), HTTP_X_PROFILE_REQUEST=make_profile_token())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile_id = response['X-Profile-Id']
+        self.assertIn('GET-api_forms_wheel-specifications_list', profile_id)
+        self.assertEqual(sorted(os.listdir(self.profile_dir)), [f'{profile_id}.collapsed.txt', f'{profile_id}.speedscope.json'])
+        with open(os.path.join(self.profile_dir, f'{profile_id}.speedscope.json')) as f:
+            self.assertEqual(json.load(f)['profiles'][0]['type'], 'sampled')
+
+    def test_unsigned_or_unsampled_requests_are_not_profiled(self):
+        response = self.client.get(reverse('wheel-specifications-get'), HTTP_X_PROFILE_REQUEST='profile:forged:token')
+        self.assertNotIn('X-Profile-Id', response)
+        response = self.client.get(reverse('wheel-specifications-get'))
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    @override_settings(PROFILER_ENABLED=False)
+    def test_disabled_profiler_ignores_signed_header(self):
+        response = self.client.get(reverse('wheel-specifications-get'), HTTP_X_PROFILE_REQUEST=make_profile_token())
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    @override_settings(PROFILER_SAMPLE_RATE=1.0, PROFILER_FORMATS=['collapsed'])
+    def test_sampled_requests_are_profiled(self):
+        response = self.client.get(reverse('wheel-specifications-get'))
+        self.assertEqual(os.listdir(self.profile_dir), [f"{response['X-Profile-Id']}.collapsed.txt"])
+
+    def test_sampler_records_the_target_thread(self):
+        def busy_wait():
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                pass
+
+        sampler = StackSampler(threading.get_ident(), 0.001).start()
+        busy_wait()
+        sampler.stop()
+        self.assertGreater(sum(sampler.samples.values()), 0)
+        collapsed = render_collapsed(sampler.samples)
+        self.assertIn(';busy_wait (forms_api/tests.py:', collapsed)
+        speedscope = json.loads(render_speedscope(sampler.samples, 'test', 0.001, sampler.duration))
+        frames = speedscope['shared']['frames']
+        self.assertIn('busy_wait', [frame['name'] for frame in frames])
+
+    def test_retention_keeps_the_newest_profiles(self):
+        for stamp in ('20250701T000000000', '20250702T000000000', '20250703T000000000'):
+            for extension in ('collapsed.txt', 'speedscope.json'):
+                open(os.path.join(self.profile_dir, f'{stamp}-1-GET-root.{extension}'), 'w').close()
+        prune_profiles(self.profile_dir, 2)
+        self.assertEqual(sorted({name.split('-')[0] for name in os.listdir(self.profile_dir)}), ['20250702T000000000', '20250703T000000000'])
+        self.assertEqual(len(os.listdir(self.profile_dir)), 4)
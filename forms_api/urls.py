@@ -1,10 +1,34 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 from .views import LoginView
 
+# ASYNC_VIEWS_ENABLED routes the form endpoints to the async-native handlers
+if settings.ASYNC_VIEWS_ENABLED:
+    bogie_checksheet_view = async_views.AsyncBogieChecksheetView
+    wheel_specification_post_view = async_views.AsyncWheelSpecificationPostView
+    wheel_specification_get_view = async_views.AsyncWheelSpecificationGetView
+else:
+    bogie_checksheet_view = views.BogieChecksheetView
+    wheel_specification_post_view = views.WheelSpecificationPostView
+    wheel_specification_get_view = views.WheelSpecificationGetView
+
 urlpatterns = [
     path('api/users/login/', LoginView.as_view(), name='login'),
-    path('api/forms/bogie-checksheet', views.BogieChecksheetView.as_view(), name='bogie-checksheet'),
-    path('api/forms/wheel-specifications', views.WheelSpecificationPostView.as_view(), name='wheel-specifications-post'),
-    path('api/forms/wheel-specifications/list', views.WheelSpecificationGetView.as_view(), name='wheel-specifications-get'),
+    path('api/forms/bogie-checksheet', bogie_checksheet_view.as_view(), name='bogie-checksheet'),
+    path('api/forms/bogie-checksheet/list', views.BogieChecksheetGetView.as_view(), name='bogie-checksheet-get'),
+    path('api/forms/bogie-checksheet/search', views.BogieChecksheetSearchView.as_view(), name='bogie-checksheet-search'),
+    path('api/forms/bogie-checksheet/<int:pk>', views.BogieChecksheetDetailView.as_view(), name='bogie-checksheet-detail'),
+    path('api/forms/bogie-checksheet/archive', views.BogieChecksheetArchiveView.as_view(), name='bogie-checksheet-archive'),
+    path('api/forms/bogie-checksheet/export', views.BogieChecksheetExportView.as_view(), name='bogie-checksheet-export'),
+    path('api/forms/bogie-status', views.BogieFleetStatusView.as_view(), name='bogie-fleet-status'),
+    path('api/forms/wheel-specifications', wheel_specification_post_view.as_view(), name='wheel-specifications-post'),
+    path('api/forms/wheel-specifications/bulk', views.WheelSpecificationBulkView.as_view(), name='wheel-specifications-bulk'),
+    path('api/forms/wheel-specifications/list', wheel_specification_get_view.as_view(), name='wheel-specifications-get'),
+    path('api/forms/wheel-specifications/sync', views.WheelSpecificationSyncView.as_view(), name='wheel-specifications-sync'),
+    path('api/forms/wheel-specifications/archive', views.WheelSpecificationArchiveView.as_view(), name='wheel-specifications-archive'),
+    path('api/forms/wheel-specifications/export', views.WheelSpecificationExportView.as_view(), name='wheel-specifications-export'),
+    path('api/forms/submissions/<str:receipt>', views.SubmissionStatusView.as_view(), name='submission-status'),
+    path('api/forms/cache/stats', views.ListCacheStatsView.as_view(), name='list-cache-stats'),
+    path('api/db/stats', views.DatabaseConnectionStatsView.as_view(), name='database-connection-stats'),
 ]
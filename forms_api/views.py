@@ -2,17 +2,38 @@ import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
 from .models import BogieChecksheet, WheelSpecification
 from .serializers import BogieChecksheetSerializer, WheelSpecificationSerializer, WheelSpecificationGetSerializer
-from .helpers.validation import validate_bogie_checksheet_fields, validate_wheel_specification_fields, validate_form_number, validate_date
-from .helpers.response_formatter import format_bogie_checksheet_response, format_wheel_specification_post_response, format_wheel_specification_get_response
+from .helpers.response_formatter import format_wheel_specification_get_response, WHEEL_SPECIFICATION_COLUMNS, format_wheel_specification_bulk_response, stream_wheel_specification_get_response, format_wheel_specification_sync_response, format_bogie_checksheet_get_response, format_bogie_checksheet_detail_response, format_bogie_checksheet_search_response, format_fleet_status_response, format_submission_status_response
+from .helpers.form_schema import BOGIE_CHECKSHEET_SCHEMA, WHEEL_SPECIFICATION_SCHEMA
+from .helpers.pagination import keyset_page, keyset_values_page, parse_limit
+from .helpers.filters import filter_wheel_specifications, filter_bogie_checksheets, parse_field_list
+from .helpers.export import export_response, WHEEL_SPECIFICATION_EXPORT_COLUMNS, BOGIE_CHECKSHEET_EXPORT_COLUMNS
+from .helpers.list_cache import get_list_cache, bump_list_cache_version
+from .helpers.conditional import list_validators
+from .helpers.connection_stats import get_connection_stats
+from .helpers.sync import sync_page, supersede_older_submissions
+from .helpers.archive import ArchiveQuery
+from .helpers.search import parse_search_query, search_bogie_checksheets, search_page
+from .helpers.bogie_status import fleet_status_page
+from .helpers.ingest import get_ingest_queue, timestamp
+from .helpers.endpoints import submit_form, WheelSpecificationListing, BOGIE_CHECKSHEET_FORM, WHEEL_SPECIFICATION_FORM, WHEEL_SPECIFICATION_CACHE_LABEL
 
 from .serializers import LoginRequestSerializer
+from kpa_project import statsd
 
 # Get logger
 logger = logging.getLogger('forms_api')
 
+
+def api_response(data, status_code):
+    """Wrap a shared handler's payload in a DRF Response"""
+    return Response(data, status=status_code)
+
+
 class LoginView(APIView):
     def post(self, request):
         logger.info(f"Login attempt - Phone: {request.data.get('phone', 'N/A')}")
@@ -48,156 +69,494 @@ class BogieChecksheetView(APIView):
     POST /api/forms/bogie-checksheet
     """
     def post(self, request):
+        return submit_form(BOGIE_CHECKSHEET_FORM, request, request.data, api_response)
+
+
+class BogieChecksheetGetView(APIView):
+    """
+    GET /api/forms/bogie-checksheet/list
+
+    Keyset-paginated bogie checksheets. Filters: formNumber, formNumberMatch,
+    bogieNo, inspectionBy, inspectionDate, inspectionDateFrom/To,
+    createdFrom/To and component conditions (e.g. axleGuide=Worn,Cracked).
+    ``fields`` limits the response, and the selected columns, to the listed
+    payload keys.
+    """
+    def get(self, request):
         try:
-            logger.info(f"Bogie checksheet submission - Form: {request.data.get('form_number', 'N/A')}")
-            
-            # Extract data from request
-            data = request.data
-            
-            # Helper function to handle date fields
-            def get_date_value(value):
-                if not value or value == '':
-                    return None
-                return value
-            
-            # BogieChecksheet instance 
-            bogie_checksheet_obj = BogieChecksheet.objects.create(
-
-                bogie_no=data.get('Bogie No.', '') or data.get('bogie_no', ''),
-                date_of_ioh=get_date_value(data.get('Date of IOH', '') or data.get('date_of_ioh', '')),
-                incoming_div_and_date=data.get('Incoming Div. & Date', '') or data.get('incoming_div_date', ''),
-                maker_year_built=data.get('Maker & Year Built', '') or data.get('maker_year_built', ''),
-                deficit_components=data.get('Deficit of component (if any)', '') or data.get('deficit_components', ''),
-
-                bogie_frame_condition=data.get('Bogie Frame Condition', '') or data.get('bogie_frame_condition', ''),
-                bolster=data.get('Bolster', '') or data.get('bolster', ''),
-                bolster_suspension_bracket=data.get('Bolster Suspension Bracket', '') or data.get('bolster_suspension_bracket', ''),
-                lower_spring_seat=data.get('Lower Spring Seat', '') or data.get('lower_spring_seat', ''),
-                axle_guide=data.get('Axle Guide', '') or data.get('axle_guide', ''),
-                
-
-                axle_guide_assembly=data.get('Axle Guide Assembly', ''),
-                protective_tubes=data.get('Protective Tubes', ''),
-                anchor_links=data.get('Anchor Links', ''),
-                side_bearer=data.get('Side Bearer', ''),
-                
-                # BMBC Checksheet
-                cylinder_body=data.get('Cylinder Body & Dome Cover', '') or data.get('cylinder_body', ''),
-                piston_trunnion=data.get('Piston & Trunnion Body', '') or data.get('piston_trunnion', ''),
-                adjusting_tube=data.get('Adjusting Tube and Screw', '') or data.get('adjusting_tube', ''),
-                plunger_spring=data.get('Plunger Spring', '') or data.get('plunger_spring', ''),
-            
-                tee_bolt_hex_nut=data.get('Tee Bolt, Hex Nut', ''),
-                pawl_and_pawl_spring=data.get('Pawl and Pawl Spring', ''),
-                dust_excluder=data.get('Dust Excluder', ''),
-                
-                # Metadata
-                form_number=data.get('form_number', ''),
-                inspection_by=data.get('inspection_by', ''),
-                inspection_date=get_date_value(data.get('inspection_date', ''))
-            )
-            
-            logger.info(f"Bogie checksheet created successfully - ID: {bogie_checksheet_obj.id}, Form: {bogie_checksheet_obj.form_number}")
-            
-            # Format and return response
-            response_data = format_bogie_checksheet_response(bogie_checksheet_obj)
-            return Response(response_data, status=status.HTTP_201_CREATED)
-            
+            params = request.query_params
+            logger.info(f"Fetching bogie checksheets - Params: {params.urlencode() or 'None'}")
+
+            try:
+                columns, plan = BOGIE_CHECKSHEET_SCHEMA.projection(parse_field_list(params.get('fields')))
+                queryset = filter_bogie_checksheets(BogieChecksheet.objects.all(), params).only(*columns, 'created_at')
+                limit = parse_limit(params.get('limit'), settings.LIST_PAGE_SIZE, settings.LIST_MAX_PAGE_SIZE)
+                checksheets, next_cursor = keyset_page(queryset, params.get('cursor'), limit)
+            except ValueError as e:
+                logger.warning(f"Invalid bogie checksheet query parameters: {str(e)}")
+                return Response({'message': str(e), 'success': False}, status=status.HTTP_400_BAD_REQUEST)
+
+            logger.info(f"Returning {len(checksheets)} bogie checksheet records matching the filters")
+            statsd.histogram('forms.list.rows', len(checksheets), tags={'form': 'bogie_checksheet'})
+
+            response_data = format_bogie_checksheet_get_response(checksheets, plan, next_cursor)
+            return Response(response_data, status=status.HTTP_200_OK)
+
         except Exception as e:
-            logger.error(f"Error submitting bogie checksheet: {str(e)} - Form: {request.data.get('form_number', 'N/A')}")
+            logger.error(f"Error fetching bogie checksheets: {str(e)}")
             return Response({
-                'message': f'Error submitting bogie checksheet: {str(e)}',
+                'message': f'Error fetching bogie checksheets: {str(e)}',
                 'success': False
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
+
+
+class BogieChecksheetSearchView(APIView):
+    """
+    GET /api/forms/bogie-checksheet/search?q=missing dust excluder
+
+    Full-text search over the deficit notes and component conditions, best
+    match first. Accepts the list endpoint's filters, ``fields`` and
+    ``limit``; ``cursor`` continues from the previous page's ``next``.
+    """
+    def get(self, request):
+        try:
+            params = request.query_params
+            logger.info(f"Searching bogie checksheets - Params: {params.urlencode() or 'None'}")
+
+            try:
+                query = parse_search_query(params.get('q'))
+                columns, plan = BOGIE_CHECKSHEET_SCHEMA.projection(parse_field_list(params.get('fields')))
+                queryset = filter_bogie_checksheets(BogieChecksheet.objects.all(), params).only(*columns)
+                limit = parse_limit(params.get('limit'), settings.LIST_PAGE_SIZE, settings.LIST_MAX_PAGE_SIZE)
+                checksheets, next_cursor = search_page(search_bogie_checksheets(queryset, query), params.get('cursor'), limit)
+            except ValueError as e:
+                logger.warning(f"Invalid bogie checksheet search parameters: {str(e)}")
+                return Response({'message': str(e), 'success': False}, status=status.HTTP_400_BAD_REQUEST)
+
+            logger.info(f"Returning {len(checksheets)} bogie checksheet records matching '{query}'")
+
+            response_data = format_bogie_checksheet_search_response(checksheets, plan, next_cursor)
+            return Response(response_data, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error searching bogie checksheets: {str(e)}")
+            return Response({
+                'message': f'Error searching bogie checksheets: {str(e)}',
+                'success': False
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class BogieFleetStatusView(APIView):
+    """
+    GET /api/forms/bogie-status
+
+    The latest inspection of every bogie, in bogie number order, read from
+    the per-bogie status table. Filters: bogieNo (comma-separated) and
+    defectiveOnly=true; ``cursor`` continues from the previous page's ``next``.
+    """
+    def get(self, request):
+        try:
+            params = request.query_params
+            logger.info(f"Fetching fleet status - Params: {params.urlencode() or 'None'}")
+
+            try:
+                limit = parse_limit(params.get('limit'), settings.LIST_PAGE_SIZE, settings.LIST_MAX_PAGE_SIZE)
+                statuses, next_cursor = fleet_status_page(params, limit)
+            except ValueError as e:
+                logger.warning(f"Invalid fleet status query parameters: {str(e)}")
+                return Response({'message': str(e), 'success': False}, status=status.HTTP_400_BAD_REQUEST)
+
+            logger.info(f"Returning {len(statuses)} bogie status records")
+
+            return Response(format_fleet_status_response(statuses, next_cursor), status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error fetching fleet status: {str(e)}")
+            return Response({
+                'message': f'Error fetching fleet status: {str(e)}',
+                'success': False
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class BogieChecksheetDetailView(APIView):
+    """
+    GET /api/forms/bogie-checksheet/<id>
+
+    One bogie checksheet; accepts the same ``fields`` projection as the list.
+    """
+    def get(self, request, pk):
+        try:
+            try:
+                columns, plan = BOGIE_CHECKSHEET_SCHEMA.projection(parse_field_list(request.query_params.get('fields')))
+            except ValueError as e:
+                logger.warning(f"Invalid bogie checksheet query parameters: {str(e)}")
+                return Response({'message': str(e), 'success': False}, status=status.HTTP_400_BAD_REQUEST)
+
+            checksheet = BogieChecksheet.objects.only(*columns).filter(pk=pk).first()
+            if checksheet is None:
+                logger.warning(f"Bogie checksheet not found - ID: {pk}")
+                return Response({'message': f'Bogie checksheet {pk} not found.', 'success': False}, status=status.HTTP_404_NOT_FOUND)
+
+            return Response(format_bogie_checksheet_detail_response(checksheet, plan), status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error fetching bogie checksheet: {str(e)}")
+            return Response({
+                'message': f'Error fetching bogie checksheet: {str(e)}',
+                'success': False
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class WheelSpecificationPostView(APIView):
     """
     POST /api/forms/wheel-specifications
     """
+    def post(self, request):
+        return submit_form(WHEEL_SPECIFICATION_FORM, request, request.data, api_response)
+
+
+class WheelSpecificationBulkView(APIView):
+    """
+    POST /api/forms/wheel-specifications/bulk
+
+    Accepts a JSON array of wheel specification forms (or an object with a
+    ``forms`` array) in any shape the single POST accepts. Every item is
+    validated against the schema before anything is written.
+
+    Partial-failure semantics are selected with ``?mode=``:
+      - ``atomic`` (default): if any item is invalid nothing is inserted and
+        the response is 400 with per-item results.
+      - ``partial``: valid items are inserted, invalid items are reported and
+        skipped; the response is 207 if any item was rejected.
+
+    Valid items are inserted in a single transaction with ``bulk_create`` in
+    chunks of ``BULK_CREATE_BATCH_SIZE``. A database error rolls back the
+    whole batch.
+    """
     def post(self, request):
         try:
-            logger.info(f"Wheel specification submission - Form: {request.data.get('form_number', 'N/A')}")
-            
-            # Extract data from request 
             data = request.data
+            items = data.get('forms') if isinstance(data, dict) else data
+            mode = request.query_params.get('mode', 'atomic')
+
+            if not isinstance(items, list) or not items:
+                return Response({
+                    'message': 'Request body must be a non-empty array of forms.',
+                    'success': False
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            if mode not in ('atomic', 'partial'):
+                return Response({
+                    'message': f"Invalid mode '{mode}'. Expected 'atomic' or 'partial'.",
+                    'success': False
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            if len(items) > settings.BULK_MAX_ITEMS:
+                return Response({
+                    'message': f'Too many forms in one request: {len(items)} (max {settings.BULK_MAX_ITEMS}).',
+                    'success': False
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            logger.info(f"Bulk wheel specification submission - Items: {len(items)}, Mode: {mode}")
+
+            # Validate every item before touching the database
+            results = []
+            valid_specs = []
+            for index, item in enumerate(items):
+                values, errors = WHEEL_SPECIFICATION_SCHEMA.normalize(item)
+                if errors:
+                    results.append({'index': index, 'error': '; '.join(errors)})
+                else:
+                    wheel_spec = WHEEL_SPECIFICATION_SCHEMA.build(values)
+                    valid_specs.append(wheel_spec)
+                    results.append({'index': index, 'instance': wheel_spec})
+
+            rejected = len(items) - len(valid_specs)
+            if rejected:
+                statsd.increment('forms.rejected', rejected, tags={'form': 'wheel_specification', 'reason': 'validation', 'bulk': 'true'})
+            if rejected and mode == 'atomic':
+                logger.warning(f"Bulk wheel specification submission rejected - {rejected} invalid item(s)")
+                response_data = format_wheel_specification_bulk_response(results, saved=False)
+                return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+            # bulk_create bypasses save(), so fill the numeric columns here
+            for wheel_spec in valid_specs:
+                wheel_spec.populate_measurements()
             
-            # Helper function to handle date fields
-            def get_date_value(value):
-                if not value or value == '':
-                    return None
-                return value
-            
-            #  WheelSpecification instance 
-            wheel_spec = WheelSpecification.objects.create(
-                tread_diameter_new=data.get('Tread Diameter (New)', '') or data.get('tread_diameter', ''),
-                last_shop_issue_size=data.get('Last Shop Issue Size (Dia.)', '') or data.get('last_shop_issue', ''),
-                condemning_dia=data.get('Condemning Dia.', '') or data.get('condemning_dia', ''),
-                wheel_gauge=data.get('Wheel Gauge (IFD)', '') or data.get('wheel_gauge', ''),
-                variation_same_axle=data.get('Variation Same Axle', '') or data.get('variation_same_axle', ''),
-                variation_same_bogie=data.get('Variation Same Bogie', '') or data.get('variation_same_bogie', ''),
-                variation_same_coach=data.get('Variation Same Coach', '') or data.get('variation_same_coach', ''),
-                wheel_profile=data.get('Wheel Profile', '') or data.get('wheel_profile', ''),
-                intermediate_wwp=data.get('Intermediate WWP', '') or data.get('intermediate_wwp', ''),
-                bearing_seat_diameter=data.get('Bearing Seat Diameter', '') or data.get('bearing_seat_diameter', ''),
-                roller_bearing_outer_dia=data.get('Roller Bearing Outer Dia.', '') or data.get('roller_bearing_outer_dia', ''),
-                roller_bearing_bore_dia=data.get('Roller Bearing Bore Dia.', '') or data.get('roller_bearing_bore_dia', ''),
-                roller_bearing_width=data.get('Roller Bearing Width', '') or data.get('roller_bearing_width', ''),
-                axle_box_housing_bore_dia=data.get('Axle Box Housing Bore Dia.', '') or data.get('axle_box_housing_bore_dia', ''),
-                wheel_disc_width=data.get('Wheel Disc Width', '') or data.get('wheel_disc_width', ''),
-                
-                # Metadata
-                form_number=data.get('form_number', ''),
-                submitted_by=data.get('submitted_by', ''),
-                submitted_date=get_date_value(data.get('submitted_date', ''))
-            )
-            
-            logger.info(f"Wheel specification created successfully - ID: {wheel_spec.id}, Form: {wheel_spec.form_number}")
-            
-            # Format and return response
-            response_data = format_wheel_specification_post_response(wheel_spec)
-            return Response(response_data, status=status.HTTP_201_CREATED)
-            
+            with transaction.atomic():
+                WheelSpecification.objects.bulk_create(valid_specs, batch_size=settings.BULK_CREATE_BATCH_SIZE)
+                supersede_older_submissions(spec.form_number for spec in valid_specs)
+                transaction.on_commit(lambda: bump_list_cache_version(WHEEL_SPECIFICATION_CACHE_LABEL))
+
+            logger.info(f"Bulk wheel specification submission saved - Saved: {len(valid_specs)}, Rejected: {rejected}")
+            statsd.increment('forms.submitted', len(valid_specs), tags={'form': 'wheel_specification', 'result': 'created', 'bulk': 'true'})
+
+            response_data = format_wheel_specification_bulk_response(results, saved=True)
+            response_status = status.HTTP_207_MULTI_STATUS if rejected else status.HTTP_201_CREATED
+            return Response(response_data, status=response_status)
+
         except Exception as e:
-            logger.error(f"Error submitting wheel specification: {str(e)} - Form: {request.data.get('form_number', 'N/A')}")
+            logger.error(f"Error submitting wheel specifications in bulk: {str(e)}")
             return Response({
-                'message': f'Error submitting wheel specification: {str(e)}',
+                'message': f'Error submitting wheel specifications in bulk: {str(e)}',
                 'success': False
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-
 class WheelSpecificationGetView(APIView):
     """
     GET /api/forms/wheel-specifications (with filters)
+
+    Results are keyset-paginated on (created_at, id): pass ``limit`` and the
+    ``next`` cursor from the previous page as ``cursor``. With ``stream=true``
+    the full filtered list is streamed as one JSON array instead.
+
+    Responses carry a weak ETag; a matching If-None-Match is answered
+    with 304 without loading any rows.
     """
     def get(self, request):
+        listing = WheelSpecificationListing(request, request.query_params, api_response)
         try:
-            logger.info(f"Fetching wheel specifications - Filters: formNumber={request.query_params.get('formNumber', 'None')}, submittedBy={request.query_params.get('submittedBy', 'None')}, submittedDate={request.query_params.get('submittedDate', 'None')}")
-            
-            # Get query parameters for filtering
-            form_number = request.query_params.get('formNumber', None)
-            submitted_by = request.query_params.get('submittedBy', None)
-            submitted_date = request.query_params.get('submittedDate', None)
-            
-            # Start with all records
-            queryset = WheelSpecification.objects.all()
-            
-            # Apply filters if provided
-            if form_number:
-                queryset = queryset.filter(form_number__icontains=form_number)
-            if submitted_by:
-                queryset = queryset.filter(submitted_by__icontains=submitted_by)
-            if submitted_date:
-                queryset = queryset.filter(submitted_date=submitted_date)
-            
-            logger.info(f"Found {queryset.count()} wheel specification records matching the filters")
-            
-            # Format the response
-            response_data = format_wheel_specification_get_response(queryset)
+            invalid = listing.filter()
+            if invalid is not None:
+                return invalid
+
+            # Conditional GET: one aggregate query decides whether anything changed
+            not_modified = listing.not_modified(list_validators(listing.queryset, listing.params))
+            if not_modified is not None:
+                return not_modified
+
+            # Unpaginated mode: stream rows through a server-side iterator
+            if listing.streaming:
+                rows = listing.queryset.order_by('created_at', 'id').values_list(*WHEEL_SPECIFICATION_COLUMNS).iterator(chunk_size=settings.LIST_STREAM_CHUNK_SIZE)
+                return listing.stream(stream_wheel_specification_get_response(rows))
+
+            cached = listing.cached()
+            if cached is not None:
+                return cached
+
+            try:
+                wheel_specs, next_cursor = keyset_values_page(listing.queryset, listing.params.get('cursor'), listing.limit(), WHEEL_SPECIFICATION_COLUMNS)
+            except ValueError as e:
+                return listing.invalid(e, 'pagination')
+            return listing.page(wheel_specs, next_cursor)
+
+        except Exception as e:
+            return listing.failed(e)
+
+
+class WheelSpecificationExportView(APIView):
+    """
+    GET /api/forms/wheel-specifications/export
+
+    Streams every matching row as CSV or NDJSON. Accepts the list filters
+    plus ``output`` (csv|ndjson) and ``columns``.
+    """
+    def get(self, request):
+        try:
+            logger.info(f"Exporting wheel specifications - Params: {request.query_params.urlencode() or 'None'}")
+            try:
+                queryset = filter_wheel_specifications(WheelSpecification.objects.all(), request.query_params)
+                return export_response(queryset, request.query_params, WHEEL_SPECIFICATION_EXPORT_COLUMNS, 'wheel-specifications', settings.EXPORT_CHUNK_SIZE)
+            except ValueError as e:
+                logger.warning(f"Invalid export parameters: {str(e)}")
+                return Response({'message': str(e), 'success': False}, status=status.HTTP_400_BAD_REQUEST)
+
+        except Exception as e:
+            logger.error(f"Error exporting wheel specifications: {str(e)}")
+            return Response({
+                'message': f'Error exporting wheel specifications: {str(e)}',
+                'success': False
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class BogieChecksheetExportView(APIView):
+    """
+    GET /api/forms/bogie-checksheet/export
+
+    Streams every matching row as CSV or NDJSON. Filters: formNumber,
+    formNumberMatch, bogieNo, inspectionBy, inspectionDate and the date
+    ranges, plus ``output`` (csv|ndjson) and ``columns``.
+    """
+    def get(self, request):
+        try:
+            logger.info(f"Exporting bogie checksheets - Params: {request.query_params.urlencode() or 'None'}")
+            try:
+                queryset = filter_bogie_checksheets(BogieChecksheet.objects.all(), request.query_params)
+                return export_response(queryset, request.query_params, BOGIE_CHECKSHEET_EXPORT_COLUMNS, 'bogie-checksheets', settings.EXPORT_CHUNK_SIZE)
+            except ValueError as e:
+                logger.warning(f"Invalid export parameters: {str(e)}")
+                return Response({'message': str(e), 'success': False}, status=status.HTTP_400_BAD_REQUEST)
+
+        except Exception as e:
+            logger.error(f"Error exporting bogie checksheets: {str(e)}")
+            return Response({
+                'message': f'Error exporting bogie checksheets: {str(e)}',
+                'success': False
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class WheelSpecificationArchiveView(APIView):
+    """
+    GET /api/forms/wheel-specifications/archive
+
+    Archived wheel specifications (see archive_form_rows), with the list
+    endpoint's filters and keyset pagination.
+    """
+    def get(self, request):
+        try:
+            params = request.query_params
+            logger.info(f"Fetching archived wheel specifications - Params: {params.urlencode() or 'None'}")
+
+            try:
+                query = filter_wheel_specifications(ArchiveQuery(WheelSpecification), params)
+                limit = parse_limit(params.get('limit'), settings.LIST_PAGE_SIZE, settings.LIST_MAX_PAGE_SIZE)
+                wheel_specs, next_cursor = query.page(params.get('cursor'), limit)
+            except ValueError as e:
+                logger.warning(f"Invalid archive query parameters: {str(e)}")
+                return Response({'message': str(e), 'success': False}, status=status.HTTP_400_BAD_REQUEST)
+
+            logger.info(f"Returning {len(wheel_specs)} archived wheel specification records matching the filters")
+            return Response(format_wheel_specification_get_response(wheel_specs, next_cursor), status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error fetching archived wheel specifications: {str(e)}")
+            return Response({
+                'message': f'Error fetching archived wheel specifications: {str(e)}',
+                'success': False
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class BogieChecksheetArchiveView(APIView):
+    """
+    GET /api/forms/bogie-checksheet/archive
+
+    Archived bogie checksheets, with the list endpoint's filters, ``fields``
+    and keyset pagination.
+    """
+    def get(self, request):
+        try:
+            params = request.query_params
+            logger.info(f"Fetching archived bogie checksheets - Params: {params.urlencode() or 'None'}")
+
+            try:
+                _, plan = BOGIE_CHECKSHEET_SCHEMA.projection(parse_field_list(params.get('fields')))
+                query = filter_bogie_checksheets(ArchiveQuery(BogieChecksheet), params)
+                limit = parse_limit(params.get('limit'), settings.LIST_PAGE_SIZE, settings.LIST_MAX_PAGE_SIZE)
+                checksheets, next_cursor = query.page(params.get('cursor'), limit)
+            except ValueError as e:
+                logger.warning(f"Invalid archive query parameters: {str(e)}")
+                return Response({'message': str(e), 'success': False}, status=status.HTTP_400_BAD_REQUEST)
+
+            logger.info(f"Returning {len(checksheets)} archived bogie checksheet records matching the filters")
+            return Response(format_bogie_checksheet_get_response(checksheets, plan, next_cursor), status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error fetching archived bogie checksheets: {str(e)}")
+            return Response({
+                'message': f'Error fetching archived bogie checksheets: {str(e)}',
+                'success': False
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class WheelSpecificationSyncView(APIView):
+    """
+    GET /api/forms/wheel-specifications/sync
+
+    Delta sync for offline clients: returns the wheel specifications created
+    or changed after ``watermark`` (omit it for a full initial sync), plus
+    tombstones for deleted and superseded forms, and the new watermark.
+    Call again with the returned watermark while ``hasMore`` is true.
+    """
+    def get(self, request):
+        try:
+            watermark = request.query_params.get('watermark')
+            logger.info(f"Wheel specification sync - Watermark: {watermark or 'None'}")
+            try:
+                limit = parse_limit(request.query_params.get('limit'), settings.SYNC_PAGE_SIZE, settings.SYNC_MAX_PAGE_SIZE)
+                changes, tombstones, new_watermark, has_more = sync_page(watermark, limit, settings.SYNC_SETTLE_SECONDS)
+            except ValueError as e:
+                logger.warning(f"Invalid sync parameters: {str(e)}")
+                return Response({'message': str(e), 'success': False}, status=status.HTTP_400_BAD_REQUEST)
+
+            logger.info(f"Returning {len(changes)} changed and {len(tombstones)} removed wheel specifications")
+
+            response_data = format_wheel_specification_sync_response(changes, tombstones, new_watermark, has_more)
             return Response(response_data, status=status.HTTP_200_OK)
-            
+
+        except Exception as e:
+            logger.error(f"Error syncing wheel specifications: {str(e)}")
+            return Response({
+                'message': f'Error syncing wheel specifications: {str(e)}',
+                'success': False
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SubmissionStatusView(APIView):
+    """
+    GET /api/forms/submissions/<receipt>
+
+    Status of a submission accepted into the ingestion queue: queued,
+    processing, saved or replayed (with the row ``id``) or failed (with the
+    ``error``).
+    """
+    def get(self, request, receipt):
+        try:
+            entry = get_ingest_queue().status(receipt)
+            if entry is None:
+                logger.warning(f"Submission receipt not found - Receipt: {receipt}")
+                return Response({'message': f'Submission {receipt} not found.', 'success': False}, status=status.HTTP_404_NOT_FOUND)
+
+            response_data = format_submission_status_response(entry, timestamp(entry['queued_at']), timestamp(entry['processed_at']))
+            return Response(response_data, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error fetching submission status: {str(e)}")
+            return Response({
+                'message': f'Error fetching submission status: {str(e)}',
+                'success': False
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ListCacheStatsView(APIView):
+    """
+    GET /api/forms/cache/stats
+
+    Hit/miss/eviction counters of this worker's list response cache.
+    """
+    def get(self, request):
+        list_cache = get_list_cache()
+        if list_cache is None:
+            return Response({
+                'data': {'backend': 'none'},
+                'message': 'List response cache is disabled.',
+                'success': True
+            }, status=status.HTTP_200_OK)
+        
+        return Response({
+            'data': dict(list_cache.stats.as_dict(), backend=settings.LIST_CACHE_BACKEND),
+            'message': 'List response cache statistics fetched successfully.',
+            'success': True
+        }, status=status.HTTP_200_OK)
+
+
+class DatabaseConnectionStatsView(APIView):
+    """
+    GET /api/db/stats
+
+    Connection persistence settings and, when DB_POOL_ENABLED is set, the
+    connection pool counters of this worker.
+    """
+    def get(self, request):
+        try:
+            return Response({
+                'data': get_connection_stats(),
+                'message': 'Database connection statistics fetched successfully.',
+                'success': True
+            }, status=status.HTTP_200_OK)
+
         except Exception as e:
-            logger.error(f"Error fetching wheel specifications: {str(e)}")
+            logger.error(f"Error fetching database connection statistics: {str(e)}")
             return Response({
-                'message': f'Error fetching wheel specifications: {str(e)}',
+                'message': f'Error fetching database connection statistics: {str(e)}',
                 'success': False
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
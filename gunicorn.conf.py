@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration for KPA Django project.
+
+Gunicorn loads this file automatically from the working directory. Command
+line flags (bind, workers, timeout) still take precedence.
+"""
+import os
+
+
+def on_starting(server):
+    """Start the shared request metrics from zero for this server."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kpa_project.settings')
+    from kpa_project.metrics import remove_metrics_file
+
+    remove_metrics_file()
+
+
+def worker_exit(server, worker):
+    """Flush queued log records and StatsD aggregates, and free the worker's metrics segment, before the process goes away."""
+    from kpa_project.log_queue import stop_log_listeners
+    from kpa_project.metrics import release_worker_segment
+    from kpa_project.statsd import stop_statsd
+
+    stop_log_listeners()
+    stop_statsd()
+    release_worker_segment()
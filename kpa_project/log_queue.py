@@ -0,0 +1,139 @@
+"""
+Non-blocking logging for KPA Django project.
+
+When ``LOG_QUEUE_ENABLED`` is set, the handlers configured for the loggers
+in ``LOG_QUEUE_LOGGERS`` are moved behind a bounded queue: request threads
+only enqueue records, and a background QueueListener owns the console and
+file handlers and does the formatting, writing and rotation checks.
+
+Django calls ``configure_logging`` with ``settings.LOGGING`` (see
+``LOGGING_CONFIG``). Listeners are stopped, and their queues flushed, at
+interpreter exit and from the gunicorn ``worker_exit`` hook.
+"""
+
+import atexit
+import copy
+import logging
+import logging.config
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+QUEUE_POLICIES = ('drop', 'block')
+
+# Message arguments that cannot change while a record waits in the queue
+IMMUTABLE_ARG_TYPES = (str, int, float, bool, bytes, type(None))
+
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler over a bounded queue. When the queue is full the record is
+    either dropped immediately (``drop``) or the caller waits up to
+    ``block_timeout`` seconds for space before dropping it (``block``).
+    """
+
+    def __init__(self, log_queue, policy='drop', block_timeout=0.5):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown log queue policy '{policy}'. Expected one of: {', '.join(QUEUE_POLICIES)}")
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record):
+        """
+        Enqueue the record unformatted, exception info included: the
+        listener's handlers format it. Mutable message arguments are merged
+        into the message first, so the log shows them as they were when logged.
+        """
+        record = copy.copy(record)
+        args = record.args
+        # A single mapping argument is kept as the mapping itself, which may change
+        if args and (isinstance(args, dict) or not all(isinstance(arg, IMMUTABLE_ARG_TYPES) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.policy == 'block':
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener whose stop() waits for room in a full bounded queue instead of raising"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def configure_logging(logging_settings):
+    """LOGGING_CONFIG entry point: apply dictConfig, then move queued loggers behind listeners"""
+    from django.conf import settings
+
+    logging.config.dictConfig(logging_settings)
+    if settings.LOG_QUEUE_ENABLED:
+        for logger_name in settings.LOG_QUEUE_LOGGERS:
+            enable_queue_logging(
+                logging.getLogger(logger_name),
+                maxsize=settings.LOG_QUEUE_SIZE,
+                policy=settings.LOG_QUEUE_POLICY,
+                block_timeout=settings.LOG_QUEUE_BLOCK_TIMEOUT,
+            )
+
+
+def enable_queue_logging(logger, maxsize, policy='drop', block_timeout=0.5):
+    """Replace ``logger``'s handlers with a bounded queue drained by a background listener"""
+    handlers = [handler for handler in logger.handlers if not isinstance(handler, QueueHandler)]
+    if not handlers:
+        return None
+
+    log_queue = queue.Queue(maxsize=maxsize)
+    queue_handler = BoundedQueueHandler(log_queue, policy=policy, block_timeout=block_timeout)
+    listener = DrainingQueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    listener.start()
+
+    with _listeners_lock:
+        _listeners.append((logger.name, queue_handler, listener))
+    return queue_handler
+
+
+def stop_log_listeners():
+    """Flush every queued record to its handlers and stop the listener threads"""
+    with _listeners_lock:
+        listeners = list(_listeners)
+        _listeners.clear()
+
+    for logger_name, queue_handler, listener in listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
+
+        # Anything logged after this point is written synchronously
+        logger = logging.getLogger(logger_name)
+        logger.handlers[:] = list(listener.handlers)
+        if queue_handler.dropped:
+            logger.warning(f"Log queue dropped {queue_handler.dropped} record(s) under load")
+
+
+def get_log_queue_stats():
+    """Queue depth and dropped-record counts per queued logger"""
+    with _listeners_lock:
+        return {
+            logger_name: {'depth': queue_handler.queue.qsize(), 'dropped': queue_handler.dropped}
+            for logger_name, queue_handler, _ in _listeners
+        }
+
+
+atexit.register(stop_log_listeners)
@@ -0,0 +1,307 @@
+"""
+Shared-memory request metrics for KPA Django project.
+
+Latency histograms and request counters per (route, method, status) live in
+a file mapped with mmap by every worker process, so ``/metrics`` reports the
+traffic of all gunicorn workers, not just the one that serves the scrape.
+
+The file is split into one segment per worker. A worker claims a free
+segment (or the segment of a worker that has exited, keeping its counts) the
+first time it records, and from then on is the only process writing to it:
+recording is a dict lookup and two in-place 64-bit increments, with no
+cross-process locking. The exposition sums every segment. Counters only go
+up; a reader may see a histogram one request behind its ``_sum``.
+
+Segment layout (all values unsigned 64-bit)::
+
+    pid | series used | series[METRICS_MAX_SERIES]
+    series = 120-byte "route\\0method\\0status" key | bucket counts | +Inf count | sum (us)
+
+The gunicorn ``on_starting`` hook removes the file, so counts start from zero
+with each server start; ``worker_exit`` frees the worker's segment.
+"""
+
+import logging
+import os
+import struct
+import threading
+import mmap
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; segments are then claimed without a file lock
+    fcntl = None
+
+logger = logging.getLogger('django.request')
+
+# Histogram upper bounds in seconds (Prometheus client defaults)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+MAGIC = b'KPAMET01'
+FILE_HEADER = struct.Struct('<8sQQQ')  # magic, segments, series per segment, buckets
+SEGMENT_HEADER = struct.Struct('<QQ')  # owner pid, series used
+KEY_BYTES = 120
+VALUES = len(BUCKETS) + 2  # bucket counts, +Inf count, sum in microseconds
+SERIES_BYTES = KEY_BYTES + VALUES * 8
+SUM_OFFSET = len(BUCKETS) + 1
+
+METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+UNMATCHED_ROUTE = '<unmatched>'
+OVERFLOW_KEY = ('<overflow>', '', '')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _lock_file(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _unlock_file(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class SharedMetrics:
+    """Per-worker segments of a shared, mmap-backed metrics file"""
+
+    def __init__(self, path, segments=64, series=256):
+        self.path = path
+        self.segments = segments
+        self.series = series
+        self.segment_bytes = SEGMENT_HEADER.size + series * SERIES_BYTES
+        self.size = FILE_HEADER.size + segments * self.segment_bytes
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        _lock_file(self.fd)
+        try:
+            header = FILE_HEADER.pack(MAGIC, segments, series, len(BUCKETS))
+            if os.fstat(self.fd).st_size != self.size or os.pread(self.fd, FILE_HEADER.size, 0) != header:
+                # New file, or one laid out for different settings: start over
+                os.ftruncate(self.fd, 0)
+                os.ftruncate(self.fd, self.size)
+                os.pwrite(self.fd, header, 0)
+            self.map = mmap.mmap(self.fd, self.size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            _unlock_file(self.fd)
+        self.values = memoryview(self.map).cast('Q')
+
+        self.lock = threading.Lock()
+        self.segment = None
+        self.slots = {}
+
+    def forget_segment(self):
+        """Drop the claimed segment, e.g. in a forked child that must not write into its parent's"""
+        self.lock = threading.Lock()
+        self.segment = None
+        self.slots = {}
+
+    def _segment_offset(self, segment):
+        return FILE_HEADER.size + segment * self.segment_bytes
+
+    def _claim(self):
+        """Take a free segment, or one whose owner has exited; None when all are in use"""
+        pid = os.getpid()
+        _lock_file(self.fd)
+        try:
+            for segment in range(self.segments):
+                offset = self._segment_offset(segment)
+                owner, used = SEGMENT_HEADER.unpack_from(self.map, offset)
+                if owner and owner != pid and _alive(owner):
+                    continue
+                SEGMENT_HEADER.pack_into(self.map, offset, pid, used)
+                self.segment = segment
+                self.slots = dict(self._series(segment, used))
+                return segment
+        finally:
+            _unlock_file(self.fd)
+        logger.warning(f"Metrics: all {self.segments} segments of {self.path} are in use; not recording in pid {pid}")
+        return None
+
+    def _series(self, segment, used):
+        """(key, values index) for the first ``used`` series of a segment"""
+        offset = self._segment_offset(segment) + SEGMENT_HEADER.size
+        for slot in range(min(used, self.series)):
+            start = offset + slot * SERIES_BYTES
+            # The key is zero-padded, so the first three parts are the labels
+            key = tuple(self.map[start:start + KEY_BYTES].decode('utf-8', 'replace').split('\0')[:3])
+            yield key, (start + KEY_BYTES) // 8
+
+    def _register(self, key):
+        """Allocate a series for ``key`` in this worker's segment and return its values index"""
+        offset = self._segment_offset(self.segment)
+        used = self.values[offset // 8 + 1]
+        if used >= self.series - 1 and key != OVERFLOW_KEY:
+            # Keep the last series for everything past the limit
+            base = self.slots.get(OVERFLOW_KEY)
+            return base if base is not None else self._register(OVERFLOW_KEY)
+
+        start = offset + SEGMENT_HEADER.size + used * SERIES_BYTES
+        raw = '\0'.join(key).encode('utf-8')[:KEY_BYTES]
+        self.map[start:start + KEY_BYTES] = raw.ljust(KEY_BYTES, b'\0')
+        # Publish the key before the series count so readers never see a half-written key
+        self.values[offset // 8 + 1] = used + 1
+        base = (start + KEY_BYTES) // 8
+        self.slots[key] = base
+        return base
+
+    def record(self, route, method, status, seconds):
+        """Count one request and add its latency to the (route, method, status) histogram"""
+        key = (route, method, status)
+        with self.lock:
+            base = self.slots.get(key)
+            if base is None:
+                if self.segment is None and self._claim() is None:
+                    return
+                base = self.slots.get(key)
+                if base is None:
+                    base = self._register(key)
+            values = self.values
+            values[base + bisect_left(BUCKETS, seconds)] += 1
+            values[base + SUM_OFFSET] += int(seconds * 1_000_000)
+
+    def release(self):
+        """Mark this worker's segment free; its counts stay in the totals"""
+        with self.lock:
+            if self.segment is not None:
+                self.values[self._segment_offset(self.segment) // 8] = 0
+                self.segment = None
+                self.slots = {}
+
+    def snapshot(self):
+        """Sum every segment: {(route, method, status): [bucket counts..., +Inf count, sum_us]}"""
+        totals = {}
+        values = self.values
+        for segment in range(self.segments):
+            offset = self._segment_offset(segment)
+            used = values[offset // 8 + 1]
+            if not used:
+                continue
+            for key, base in self._series(segment, used):
+                counts = totals.setdefault(key, [0] * VALUES)
+                for index in range(VALUES):
+                    counts[index] += values[base + index]
+        return totals
+
+    def close(self):
+        self.values.release()
+        self.map.close()
+        os.close(self.fd)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(totals):
+    """Prometheus text exposition (format 0.0.4) of a snapshot()"""
+    requests = [
+        '# HELP kpa_http_requests_total HTTP requests by route, method and status.',
+        '# TYPE kpa_http_requests_total counter',
+    ]
+    durations = [
+        '# HELP kpa_http_request_duration_seconds HTTP request latency by route, method and status.',
+        '# TYPE kpa_http_request_duration_seconds histogram',
+    ]
+    for (route, method, status), counts in sorted(totals.items()):
+        labels = f'route="{_label(route)}",method="{_label(method)}",status="{_label(status)}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS, counts):
+            cumulative += count
+            durations.append(f'kpa_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += counts[len(BUCKETS)]
+        durations.append(f'kpa_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+        durations.append(f'kpa_http_request_duration_seconds_sum{{{labels}}} {counts[SUM_OFFSET] / 1_000_000}')
+        durations.append(f'kpa_http_request_duration_seconds_count{{{labels}}} {cumulative}')
+        requests.append(f'kpa_http_requests_total{{{labels}}} {cumulative}')
+    return '\n'.join(requests + durations) + '\n'
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Return the shared metrics at METRICS_PATH, or None when METRICS_ENABLED is off"""
+    global _metrics
+    if not settings.METRICS_ENABLED:
+        return None
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = SharedMetrics(settings.METRICS_PATH, settings.METRICS_MAX_WORKERS, settings.METRICS_MAX_SERIES)
+    return _metrics
+
+
+def _after_fork():
+    if _metrics is not None:
+        _metrics.forget_segment()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+@receiver(setting_changed)
+def reset_metrics(setting, **kwargs):
+    global _metrics
+    if setting.startswith('METRICS_'):
+        _metrics = None
+
+
+def route_label(request):
+    """The request's URL pattern, which unlike its path has bounded cardinality"""
+    match = request.resolver_match
+    return match.route if match is not None else UNMATCHED_ROUTE
+
+
+def method_label(request):
+    return request.method if request.method in METHODS else 'OTHER'
+
+
+def observe(request, status_code, seconds):
+    """Record a finished request under its URL pattern rather than its path"""
+    metrics = get_metrics()
+    if metrics is None:
+        return
+    metrics.record(route_label(request), method_label(request), str(status_code), seconds)
+
+
+def release_worker_segment():
+    """gunicorn ``worker_exit``: free the exiting worker's segment"""
+    if _metrics is not None:
+        _metrics.release()
+
+
+def remove_metrics_file():
+    """gunicorn ``on_starting``: drop counts left by a previous server"""
+    try:
+        os.unlink(settings.METRICS_PATH)
+    except FileNotFoundError:
+        pass
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint summing the histograms of every worker"""
+    metrics = get_metrics()
+    if metrics is None:
+        raise Http404('Metrics are disabled')
+    return HttpResponse(render_prometheus(metrics.snapshot()), content_type=CONTENT_TYPE)
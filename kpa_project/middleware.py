@@ -1,23 +1,67 @@
 """
 Simple logging middleware for KPA Django project.
-Logs incoming requests and outgoing responses with proper status levels.
+Logs incoming requests and outgoing responses with proper status levels,
+records each response's latency in the shared request metrics and in
+DogStatsD, and, for sampled requests, the SQL statement count and time (see
+query_stats.py).
 """
 
 import time
 import logging
-from django.utils.deprecation import MiddlewareMixin
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from django.conf import settings
+
+from . import statsd
+from .metrics import method_label, observe, route_label
+from .query_stats import sample_query_stats
 
 # Get logger - only use one logger to avoid duplicates
 logger = logging.getLogger('django.request')
 
-class RequestResponseLoggingMiddleware(MiddlewareMixin):
+class RequestResponseLoggingMiddleware:
     """
     Middleware to log all incoming requests and outgoing responses.
+
+    Works natively in both sync (WSGI) and async (ASGI) stacks, so an async
+    request path never hops to a thread just to log.
     """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.process_request(request)
+        if request.query_stats is None:
+            response = self.get_response(request)
+        else:
+            with request.query_stats.capture():
+                response = self.get_response(request)
+        return self.process_response(request, response)
+    
+    async def __acall__(self, request):
+        self.process_request(request)
+        if request.query_stats is None:
+            response = await self.get_response(request)
+        else:
+            # Database connections are per thread: install where the ORM runs
+            await sync_to_async(request.query_stats.install)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(request.query_stats.uninstall)()
+        return self.process_response(request, response)
     
     def process_request(self, request):
         """Log incoming request details."""
-        request.start_time = time.time()
+        request.start_time = time.perf_counter()
+        request.query_stats = sample_query_stats(request)
         
         # Log basic request info
         log_message = (
@@ -35,7 +79,11 @@ class RequestResponseLoggingMiddleware(MiddlewareMixin):
         if not hasattr(request, 'start_time'):
             return response
         
-        response_time = time.time() - request.start_time
+        response_time = time.perf_counter() - request.start_time
+        observe(request, response.status_code, response_time)
+        statsd.timing('http.request.duration', response_time * 1000, tags=(
+            f"route:{route_label(request)}", f"method:{method_label(request)}", f"status:{response.status_code}",
+        ))
         
         log_message = (
             f"RESPONSE || METHOD: {request.method} || PATH: {request.path} || "
@@ -43,6 +91,14 @@ class RequestResponseLoggingMiddleware(MiddlewareMixin):
             f"TIME: {response_time:.4f}s || "
             f"CLIENT_IP: {self._get_client_ip(request)}"
         )
+
+        query_stats = getattr(request, 'query_stats', None)
+        if query_stats is not None:
+            log_message += f" || {query_stats.summary()}"
+            query_stats.log_repeated()
+            if settings.QUERY_STATS_HEADERS:
+                for header, value in query_stats.headers().items():
+                    response[header] = value
         
         # Use appropriate log level based on HTTP status code
         if response.status_code >= 500:
@@ -56,7 +112,7 @@ class RequestResponseLoggingMiddleware(MiddlewareMixin):
     
     def process_exception(self, request, exception):
         """Log exceptions that occur during request processing."""
-        response_time = time.time() - request.start_time if hasattr(request, 'start_time') else 0
+        response_time = time.perf_counter() - request.start_time if hasattr(request, 'start_time') else 0
         
         log_message = (
             f"EXCEPTION || METHOD: {request.method} || PATH: {request.path} || "
@@ -0,0 +1,246 @@
+"""
+On-demand request profiling for KPA Django project.
+
+RequestProfilerMiddleware profiles a random ``PROFILER_SAMPLE_RATE`` share
+of requests, and any request carrying a valid signed ``X-Profile-Request``
+header (see ``python manage.py profiler_token``). While a request is
+profiled, a sampler thread records the stack of the thread handling it
+every ``PROFILER_INTERVAL_MS`` milliseconds; the view runs uninstrumented,
+so the profile reflects normal timings.
+
+Each profile is written to ``PROFILER_DIR`` as a collapsed-stack file (for
+flamegraph.pl / speedscope) and/or a speedscope JSON file, named in the
+``X-Profile-Id`` response header. Only the newest ``PROFILER_RETENTION``
+profiles are kept.
+
+Requests that are not profiled pay one random() call and a header lookup;
+with ``PROFILER_ENABLED`` off the middleware removes itself at startup. On
+the ASGI stack the event-loop thread is sampled, so time spent in sync
+code run through sync_to_async shows as waiting in the awaiting frame.
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+
+from .metrics import route_label
+
+logger = logging.getLogger('kpa_project')
+
+PROFILE_HEADER = 'HTTP_X_PROFILE_REQUEST'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+TOKEN_SALT = 'kpa_project.profiling'
+TOKEN_VALUE = 'profile'
+FORMAT_EXTENSIONS = {'collapsed': 'collapsed.txt', 'speedscope': 'speedscope.json'}
+
+
+def make_profile_token():
+    """Signed, timestamped value for the X-Profile-Request header"""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(TOKEN_VALUE)
+
+
+def valid_profile_token(token):
+    try:
+        value = signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=settings.PROFILER_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return value == TOKEN_VALUE
+
+
+class StackSampler:
+    """Samples one thread's stack at a fixed interval from a background thread"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def _run(self):
+        current_frames = sys._current_frames
+        target = self.thread_id
+        samples = self.samples
+        while not self.stopping.wait(self.interval):
+            frame = current_frames().get(target)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                samples[tuple(stack)] += 1
+
+
+def short_path(filename):
+    """Project files relative to BASE_DIR, libraries relative to site-packages"""
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        return filename[len(base):]
+    marker = f"site-packages{os.sep}"
+    index = filename.rfind(marker)
+    return filename[index + len(marker):] if index >= 0 else filename
+
+
+def render_collapsed(samples):
+    """One ``root;...;leaf count`` line per distinct stack"""
+    labels = {}
+
+    def label(code):
+        if code not in labels:
+            labels[code] = f"{code.co_name} ({short_path(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+        return labels[code]
+
+    lines = [f"{';'.join(label(code) for code in stack)} {count}" for stack, count in samples.most_common()]
+    return '\n'.join(lines) + '\n'
+
+
+def render_speedscope(samples, name, interval, duration):
+    """Speedscope "sampled" profile with one weighted sample per distinct stack"""
+    frames, frame_index = [], {}
+    stacks, weights = [], []
+    for stack, count in samples.most_common():
+        indexes = []
+        for code in stack:
+            if code not in frame_index:
+                frame_index[code] = len(frames)
+                frames.append({'name': code.co_name, 'file': short_path(code.co_filename), 'line': code.co_firstlineno})
+            indexes.append(frame_index[code])
+        stacks.append(indexes)
+        weights.append(round(count * interval, 6))
+    return json.dumps({
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'kpa_project.profiling',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': round(duration, 6),
+            'samples': stacks,
+            'weights': weights,
+        }],
+    })
+
+
+def write_profile(sampler, request, response):
+    """Write the configured formats to PROFILER_DIR and prune old profiles; returns the profile id"""
+    route = route_label(request).strip('/').replace('/', '_').replace('<', '').replace('>', '').replace(':', '-') or 'root'
+    now = time.time()
+    profile_id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))}{int(now * 1000) % 1000:03d}-{os.getpid()}-{request.method}-{route}"
+    name = f"{request.method} {request.path} {response.status_code} ({sampler.duration * 1000:.1f} ms)"
+
+    os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+    for profile_format in settings.PROFILER_FORMATS:
+        if profile_format == 'collapsed':
+            content = render_collapsed(sampler.samples)
+        else:
+            content = render_speedscope(sampler.samples, name, sampler.interval, sampler.duration)
+        with open(os.path.join(settings.PROFILER_DIR, f"{profile_id}.{FORMAT_EXTENSIONS[profile_format]}"), 'w') as f:
+            f.write(content)
+
+    prune_profiles(settings.PROFILER_DIR, settings.PROFILER_RETENTION)
+    return profile_id
+
+
+def prune_profiles(directory, keep):
+    """Delete all but the newest ``keep`` profiles (every format of a profile counts once)"""
+    profiles = {}
+    for entry in os.scandir(directory):
+        profile_id, _, extension = entry.name.partition('.')
+        if extension in FORMAT_EXTENSIONS.values():
+            profiles.setdefault(profile_id, []).append(entry.path)
+    # Ids start with the UTC timestamp, so sorting puts the oldest first
+    ordered = sorted(profiles)
+    for profile_id in ordered[:max(len(ordered) - keep, 0)]:
+        for path in profiles[profile_id]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass  # pruned by another worker
+
+
+class RequestProfilerMiddleware:
+    """Statistical profiler for sampled or explicitly requested requests"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        unknown = set(settings.PROFILER_FORMATS) - set(FORMAT_EXTENSIONS)
+        if unknown:
+            raise ImproperlyConfigured(f"Unknown PROFILER_FORMATS: {', '.join(sorted(unknown))}. Expected: {', '.join(FORMAT_EXTENSIONS)}")
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.should_profile(request):
+            return self.get_response(request)
+        sampler = self.start_sampler()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        return self.finish(sampler, request, response)
+
+    async def __acall__(self, request):
+        if not self.should_profile(request):
+            return await self.get_response(request)
+        sampler = self.start_sampler()
+        try:
+            response = await self.get_response(request)
+        finally:
+            sampler.stop()
+        return self.finish(sampler, request, response)
+
+    def should_profile(self, request):
+        token = request.META.get(PROFILE_HEADER)
+        if token is not None:
+            if valid_profile_token(token):
+                return True
+            logger.warning(f"Ignoring invalid or expired profile token - PATH: {request.path}")
+        rate = settings.PROFILER_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def start_sampler(self):
+        return StackSampler(threading.get_ident(), settings.PROFILER_INTERVAL_MS / 1000).start()
+
+    def finish(self, sampler, request, response):
+        try:
+            profile_id = write_profile(sampler, request, response)
+        except OSError as e:
+            logger.error(f"Failed to write request profile: {str(e)}")
+            return response
+        logger.info(
+            f"PROFILE || METHOD: {request.method} || PATH: {request.path} || "
+            f"SAMPLES: {sum(sampler.samples.values())} || TIME: {sampler.duration:.4f}s || ID: {profile_id}"
+        )
+        response[PROFILE_ID_HEADER] = profile_id
+        return response
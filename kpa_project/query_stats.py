@@ -0,0 +1,118 @@
+"""
+Per-request SQL instrumentation for KPA Django project.
+
+For a sampled share of requests (``QUERY_STATS_SAMPLE_RATE``) the logging
+middleware installs a QueryStats as an execute wrapper (see
+``connection.execute_wrapper``) on every database connection. It counts the
+statements, their total time and the slowest one, which the middleware
+appends to the response log line and, with ``QUERY_STATS_HEADERS``, to the
+response headers.
+
+Statements slower than ``QUERY_STATS_SLOW_MS``, and statements repeated at
+least ``QUERY_STATS_REPEAT_THRESHOLD`` times in one request (the N+1
+pattern), are logged to ``django.db.backends`` (database.log). Statements
+are identified and logged by their SQL with placeholders, never with the
+parameter values. Requests that are not sampled run without a wrapper.
+
+Connections are per thread, so on the ASGI stack the wrapper is installed
+from the request's thread-sensitive executor, where its sync views and ORM
+calls run. Queries issued while a streaming response is iterated run after
+the middleware has returned and are not counted.
+"""
+
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('django.db.backends')
+
+SQL_LOG_LENGTH = 1000
+
+
+def sample_query_stats(request):
+    """A QueryStats for this request if it is sampled, else None"""
+    rate = settings.QUERY_STATS_SAMPLE_RATE
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return None
+    return QueryStats(
+        f"{request.method} {request.path}",
+        slow_threshold=settings.QUERY_STATS_SLOW_MS / 1000,
+        repeat_threshold=settings.QUERY_STATS_REPEAT_THRESHOLD,
+    )
+
+
+class QueryStats:
+    """execute_wrapper counting the statements of one request"""
+
+    def __init__(self, label, slow_threshold=0.1, repeat_threshold=5):
+        self.label = label
+        self.slow_threshold = slow_threshold
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = None
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            self.statements[sql] += 1
+            if elapsed > self.slowest_time:
+                self.slowest_time = elapsed
+                self.slowest_sql = sql
+            if elapsed >= self.slow_threshold:
+                logger.warning(
+                    f"SLOW QUERY || REQUEST: {self.label} || TIME: {elapsed:.4f}s || "
+                    f"ALIAS: {context['connection'].alias} || SQL: {sql[:SQL_LOG_LENGTH]}"
+                )
+
+    def install(self):
+        """Add this wrapper to the current thread's database connections"""
+        for connection in connections.all():
+            connection.execute_wrappers.append(self)
+
+    def uninstall(self):
+        for connection in connections.all():
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+
+    @contextmanager
+    def capture(self):
+        """Count the statements run in this thread for the duration of the block"""
+        self.install()
+        try:
+            yield self
+        finally:
+            self.uninstall()
+
+    def repeated(self):
+        """(sql, executions) of statements run at least ``repeat_threshold`` times, most frequent first"""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= self.repeat_threshold]
+
+    def log_repeated(self):
+        for sql, count in self.repeated():
+            logger.warning(
+                f"REPEATED QUERY || REQUEST: {self.label} || EXECUTIONS: {count} || SQL: {sql[:SQL_LOG_LENGTH]}"
+            )
+
+    def summary(self):
+        """Fragment appended to the middleware's response log line"""
+        return f"QUERIES: {self.count} || DB_TIME: {self.duration:.4f}s || SLOWEST_QUERY: {self.slowest_time:.4f}s"
+
+    def headers(self):
+        return {
+            'X-DB-Query-Count': str(self.count),
+            'X-DB-Time-Ms': f"{self.duration * 1000:.2f}",
+            'X-DB-Slowest-Query-Ms': f"{self.slowest_time * 1000:.2f}",
+        }
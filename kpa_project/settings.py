@@ -11,7 +11,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
+
+from .logging_config import LOGGING
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so profiles cover the rest of the stack; removes itself when PROFILER_ENABLED is off
+    'kpa_project.profiling.RequestProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,6 +61,14 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'kpa_project.urls'
 
+# JSON responses are encoded with orjson (falls back to DRF's encoder without it)
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'forms_api.helpers.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -86,9 +98,95 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT'),
+        # Reuse connections across requests instead of reconnecting every time.
+        # Not under ASGI: async requests run their ORM calls in varying threads,
+        # which leaves persistent connections open; use DB_POOL_ENABLED (or
+        # DB_CONN_MAX_AGE=0) there, as docker-compose's web-async service does.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'OPTIONS': {},
+    }
+}
+
+# Optional psycopg 3 connection pool (requires psycopg[pool]). Pooled
+# connections are returned to the pool at the end of each request, so
+# persistent connections are switched off when the pool is enabled.
+DB_POOL_ENABLED = config('DB_POOL_ENABLED', default=False, cast=bool)
+if DB_POOL_ENABLED:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10.0, cast=float),
+        'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=1800.0, cast=float),
+        'max_idle': config('DB_POOL_MAX_IDLE', default=600.0, cast=float),
+    }
+
+# Async-native form views (serve under ASGI, see README)
+ASYNC_VIEWS_ENABLED = config('ASYNC_VIEWS_ENABLED', default=False, cast=bool)
+
+# Idempotent submissions: without an Idempotency-Key header, key on form_number
+IDEMPOTENCY_DERIVE_FROM_FORM_NUMBER = config('IDEMPOTENCY_DERIVE_FROM_FORM_NUMBER', default=False, cast=bool)
+
+# Monthly partitioning of the form tables on created_at (PostgreSQL, see the
+# partition_form_tables command). Enable before converting the tables.
+FORM_PARTITIONING_ENABLED = config('FORM_PARTITIONING_ENABLED', default=False, cast=bool)
+PARTITION_MONTHS_AHEAD = config('PARTITION_MONTHS_AHEAD', default=3, cast=int)
+PARTITION_RETENTION_MONTHS = config('PARTITION_RETENTION_MONTHS', default=0, cast=int)
+
+# Columnar archive of aged form rows (see the archive_form_rows command)
+ARCHIVE_DIR = config('ARCHIVE_DIR', default=str(BASE_DIR / 'archive'))
+ARCHIVE_AFTER_MONTHS = config('ARCHIVE_AFTER_MONTHS', default=18, cast=int)
+ARCHIVE_ROWS_PER_FILE = config('ARCHIVE_ROWS_PER_FILE', default=50000, cast=int)
+
+# Per-bogie latest status: component conditions that do not count as defective
+BOGIE_OK_CONDITIONS = config('BOGIE_OK_CONDITIONS', default='Good,OK,Satisfactory', cast=Csv())
+
+# Write-behind ingestion: POSTs are queued in a local SQLite file and answered
+# 202; run the drain_ingest_queue command alongside the web workers
+INGEST_QUEUE_ENABLED = config('INGEST_QUEUE_ENABLED', default=False, cast=bool)
+INGEST_QUEUE_PATH = config('INGEST_QUEUE_PATH', default=str(BASE_DIR / 'queue' / 'ingest.sqlite3'))
+INGEST_QUEUE_MAX_DEPTH = config('INGEST_QUEUE_MAX_DEPTH', default=20000, cast=int)
+INGEST_RETRY_AFTER = config('INGEST_RETRY_AFTER', default=5, cast=int)
+INGEST_DRAIN_BATCH_SIZE = config('INGEST_DRAIN_BATCH_SIZE', default=500, cast=int)
+INGEST_DRAIN_INTERVAL = config('INGEST_DRAIN_INTERVAL', default=1.0, cast=float)
+INGEST_RECEIPT_RETENTION_HOURS = config('INGEST_RECEIPT_RETENTION_HOURS', default=72, cast=int)
+
+# Bulk submission
+BULK_CREATE_BATCH_SIZE = config('BULK_CREATE_BATCH_SIZE', default=500, cast=int)
+BULK_MAX_ITEMS = config('BULK_MAX_ITEMS', default=5000, cast=int)
+
+# List pagination / streaming
+LIST_PAGE_SIZE = config('LIST_PAGE_SIZE', default=100, cast=int)
+LIST_MAX_PAGE_SIZE = config('LIST_MAX_PAGE_SIZE', default=1000, cast=int)
+LIST_STREAM_CHUNK_SIZE = config('LIST_STREAM_CHUNK_SIZE', default=2000, cast=int)
+
+# Delta sync for offline clients; rows younger than SYNC_SETTLE_SECONDS wait
+# for the next call so slow transactions cannot slip behind a watermark
+SYNC_PAGE_SIZE = config('SYNC_PAGE_SIZE', default=500, cast=int)
+SYNC_MAX_PAGE_SIZE = config('SYNC_MAX_PAGE_SIZE', default=5000, cast=int)
+SYNC_SETTLE_SECONDS = config('SYNC_SETTLE_SECONDS', default=2, cast=int)
+
+# CSV / NDJSON export (rows fetched per server-side cursor round trip)
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Caches
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='kpa-default'),
     }
 }
 
+# List response cache: none | local (in-process LRU) | django (CACHES alias)
+# The version counter lives in CACHES[LIST_CACHE_DJANGO_ALIAS], which must be shared
+# by all workers (not LocMemCache) when the list cache is enabled.
+LIST_CACHE_BACKEND = config('LIST_CACHE_BACKEND', default='none')
+LIST_CACHE_TTL = config('LIST_CACHE_TTL', default=30, cast=int)
+LIST_CACHE_MAX_ENTRIES = config('LIST_CACHE_MAX_ENTRIES', default=256, cast=int)
+LIST_CACHE_MAX_BYTES = config('LIST_CACHE_MAX_BYTES', default=32 * 1024 * 1024, cast=int)
+LIST_CACHE_DJANGO_ALIAS = config('LIST_CACHE_DJANGO_ALIAS', default='default')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -131,6 +229,60 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Logging
+# LOGGING comes from logging_config.py; configure_logging applies it and, when
+# LOG_QUEUE_ENABLED is set, moves LOG_QUEUE_LOGGERS behind a background queue.
+LOGGING_CONFIG = 'kpa_project.log_queue.configure_logging'
+LOG_QUEUE_ENABLED = config('LOG_QUEUE_ENABLED', default=False, cast=bool)
+LOG_QUEUE_LOGGERS = config('LOG_QUEUE_LOGGERS', default='django.request,forms_api', cast=Csv())
+LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+LOG_QUEUE_POLICY = config('LOG_QUEUE_POLICY', default='drop')  # drop | block
+LOG_QUEUE_BLOCK_TIMEOUT = config('LOG_QUEUE_BLOCK_TIMEOUT', default=0.5, cast=float)
+
+# SQL instrumentation
+# Share of requests whose statements are counted and timed (0 disables,
+# 1 instruments every request); see kpa_project/query_stats.py.
+QUERY_STATS_SAMPLE_RATE = config('QUERY_STATS_SAMPLE_RATE', default=0.05, cast=float)
+QUERY_STATS_SLOW_MS = config('QUERY_STATS_SLOW_MS', default=100, cast=float)
+QUERY_STATS_REPEAT_THRESHOLD = config('QUERY_STATS_REPEAT_THRESHOLD', default=5, cast=int)
+QUERY_STATS_HEADERS = config('QUERY_STATS_HEADERS', default=False, cast=bool)
+
+# Request metrics
+# Per-route latency histograms in an mmap'd file shared by every worker (see
+# kpa_project/metrics.py), served at /metrics. Keep METRICS_PATH on tmpfs and
+# local to one server: each worker owns a segment, identified by pid.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_PATH = config('METRICS_PATH', default='/dev/shm/kpa-metrics' if Path('/dev/shm').is_dir() else str(BASE_DIR / 'logs' / 'metrics.mmap'))
+METRICS_MAX_WORKERS = config('METRICS_MAX_WORKERS', default=64, cast=int)
+METRICS_MAX_SERIES = config('METRICS_MAX_SERIES', default=256, cast=int)  # per worker
+
+# Request profiling
+# Samples the stacks of PROFILER_SAMPLE_RATE of requests, and of requests with a
+# signed X-Profile-Request header (manage.py profiler_token), into PROFILER_DIR;
+# see kpa_project/profiling.py. Opt-in like the other diagnostics.
+PROFILER_ENABLED = config('PROFILER_ENABLED', default=False, cast=bool)
+PROFILER_SAMPLE_RATE = config('PROFILER_SAMPLE_RATE', default=0.0, cast=float)
+PROFILER_INTERVAL_MS = config('PROFILER_INTERVAL_MS', default=5, cast=float)
+PROFILER_DIR = config('PROFILER_DIR', default=str(BASE_DIR / 'logs' / 'profiles'))
+PROFILER_FORMATS = config('PROFILER_FORMATS', default='collapsed,speedscope', cast=Csv())  # collapsed | speedscope
+PROFILER_RETENTION = config('PROFILER_RETENTION', default=50, cast=int)
+PROFILER_TOKEN_MAX_AGE = config('PROFILER_TOKEN_MAX_AGE', default=3600, cast=int)  # seconds
+
+# DogStatsD business metrics
+# Aggregated in memory and sent to the Datadog agent in batched UDP packets
+# by a background thread (see kpa_project/statsd.py).
+STATSD_ENABLED = config('STATSD_ENABLED', default=False, cast=bool)
+STATSD_HOST = config('DD_AGENT_HOST', default='127.0.0.1')
+STATSD_PORT = config('DD_DOGSTATSD_PORT', default=8125, cast=int)
+STATSD_PREFIX = config('STATSD_PREFIX', default='kpa')
+STATSD_CONSTANT_TAGS = {
+    'env': config('DD_ENV', default='development'),
+    'service': config('DD_SERVICE', default='kpa-django-app'),
+}
+STATSD_FLUSH_INTERVAL = config('STATSD_FLUSH_INTERVAL', default=1.0, cast=float)
+STATSD_MAX_PACKET_SIZE = config('STATSD_MAX_PACKET_SIZE', default=1432, cast=int)
+STATSD_MAX_SAMPLES = config('STATSD_MAX_SAMPLES', default=1000, cast=int)  # per timer series and interval
+
 DATADOG_TRACE = {
     "DEFAULT_SERVICE": config("DD_SERVICE", default="kpa-django-app"),
     "TAGS": {"env": config("DD_ENV", default="development")},
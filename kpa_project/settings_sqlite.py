@@ -0,0 +1,38 @@
+"""
+SQLite settings profile for KPA Django project.
+
+Runs the project (and the benchmark suite) offline without PostgreSQL:
+
+    DJANGO_SETTINGS_MODULE=kpa_project.settings_sqlite python manage.py migrate
+    DJANGO_SETTINGS_MODULE=kpa_project.settings_sqlite python manage.py benchmark_endpoints
+
+PostgreSQL-only features (trigram indexes, full-text search, server-side cursors, the
+connection pool) fall back to their portable paths.
+"""
+
+import os
+
+# settings.py requires the PostgreSQL connection variables; they are unused here
+for name in ('DB_NAME', 'DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_PORT'):
+    os.environ.setdefault(name, '')
+
+from .settings import *  # noqa: E402,F401,F403
+from .settings import BASE_DIR, config  # noqa: E402
+
+DB_POOL_ENABLED = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'OPTIONS': {
+            # WAL lets readers run alongside the single writer; IMMEDIATE
+            # transactions queue writers on the busy timeout instead of
+            # failing with "database is locked"
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 30,
+        },
+    }
+}
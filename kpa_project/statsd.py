@@ -0,0 +1,263 @@
+"""
+Buffered DogStatsD client for KPA Django project.
+
+Views and middleware record counters, gauges, histograms and timers into
+in-memory aggregates; a background thread swaps them out every
+``STATSD_FLUSH_INTERVAL`` seconds and sends them to the Datadog agent as
+batched UDP packets of at most ``STATSD_MAX_PACKET_SIZE`` bytes. Recording
+only takes a short lock, so no request waits on a socket write.
+
+Per interval, counters are summed and gauges keep their last value.
+Histogram and timer samples are sent as multi-value DogStatsD lines
+(``name:v1:v2|ms``), split over as many lines as it takes to keep each
+packet within ``STATSD_MAX_PACKET_SIZE``. Past ``STATSD_MAX_SAMPLES``
+samples per series, further samples replace kept ones at random and the
+lines carry the sample rate, so the agent still counts every request.
+
+The sender thread is started lazily in each process (gunicorn workers fork
+after import), and remaining aggregates are flushed at interpreter exit and
+from the gunicorn ``worker_exit`` hook. Packets that cannot be sent are
+counted in ``dropped_packets`` and discarded.
+"""
+
+import atexit
+import logging
+import os
+import random
+import socket
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger('kpa_project')
+
+
+def format_tags(tags):
+    """Tags as a sorted tuple of ``key:value`` strings"""
+    if not tags:
+        return ()
+    if isinstance(tags, dict):
+        tags = (f"{key}:{value}" for key, value in tags.items())
+    return tuple(sorted(tags))
+
+
+class BufferedStatsd:
+    """DogStatsD client aggregating in memory and flushing from a background thread"""
+
+    def __init__(self, host, port, prefix='', constant_tags=(), flush_interval=1.0,
+                 max_packet_size=1432, max_samples=1000):
+        self.address = (host, port)
+        self.prefix = f"{prefix}." if prefix else ''
+        self.constant_tags = format_tags(constant_tags)
+        self.flush_interval = flush_interval
+        self.max_packet_size = max_packet_size
+        self.max_samples = max_samples
+        self.dropped_packets = 0
+        self.sent_packets = 0
+
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self._reset()
+        self.pid = None
+        self.thread = None
+        self.stopping = threading.Event()
+        self.socket = None
+
+    def _reset(self):
+        self.counters = {}
+        self.gauges = {}
+        # (name, tags, type) -> [kept samples, samples seen]
+        self.samples = {}
+
+    def _ensure_started(self):
+        # Threads do not survive fork: start one sender per process
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            if self.pid is not None:
+                self._reset()  # aggregates inherited from the parent are the parent's to send
+            self.pid = os.getpid()
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.socket.setblocking(False)
+            self.stopping = threading.Event()
+            self.thread = threading.Thread(target=self._run, name='statsd-flush', daemon=True)
+            self.thread.start()
+
+    def increment(self, name, value=1, tags=None):
+        self._ensure_started()
+        key = (name, format_tags(tags))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, value, tags=None):
+        self._ensure_started()
+        key = (name, format_tags(tags))
+        with self.lock:
+            self.gauges[key] = value
+
+    def histogram(self, name, value, tags=None):
+        self._sample('h', name, value, tags)
+
+    def timing(self, name, milliseconds, tags=None):
+        self._sample('ms', name, milliseconds, tags)
+
+    def _sample(self, metric_type, name, value, tags):
+        self._ensure_started()
+        key = (name, format_tags(tags), metric_type)
+        with self.lock:
+            entry = self.samples.get(key)
+            if entry is None:
+                self.samples[key] = [[value], 1]
+                return
+            kept, seen = entry
+            entry[1] = seen + 1
+            if len(kept) < self.max_samples:
+                kept.append(value)
+            else:
+                # Reservoir sampling keeps a uniform sample of the interval
+                index = random.randrange(seen + 1)
+                if index < self.max_samples:
+                    kept[index] = value
+
+    def _line(self, name, values, metric_type, tags, rate=1.0):
+        tags = self.constant_tags + tags
+        line = f"{self.prefix}{name}:{values}|{metric_type}"
+        if rate < 1.0:
+            line += f"|@{rate:.6g}"
+        if tags:
+            line += f"|#{','.join(tags)}"
+        return line
+
+    def lines(self):
+        """Swap out the aggregates of the interval and render them as DogStatsD lines"""
+        with self.lock:
+            counters, gauges, samples = self.counters, self.gauges, self.samples
+            self._reset()
+        lines = [self._line(name, value, 'c', tags) for (name, tags), value in counters.items()]
+        lines.extend(self._line(name, value, 'g', tags) for (name, tags), value in gauges.items())
+        for (name, tags, metric_type), (kept, seen) in samples.items():
+            values = [f"{value:g}" if isinstance(value, float) else str(value) for value in kept]
+            rate = len(kept) / seen
+            # Split long series over several lines so each one fits in a packet
+            budget = self.max_packet_size - len(self._line(name, '', metric_type, tags, rate).encode('utf-8'))
+            chunk, size = [], 0
+            for value in values:
+                if chunk and size + 1 + len(value) > budget:
+                    lines.append(self._line(name, ':'.join(chunk), metric_type, tags, rate))
+                    chunk, size = [], 0
+                size += len(value) + (1 if chunk else 0)
+                chunk.append(value)
+            lines.append(self._line(name, ':'.join(chunk), metric_type, tags, rate))
+        return lines
+
+    def packets(self, lines):
+        """Join lines into newline-separated payloads of at most max_packet_size bytes"""
+        packet, size = [], 0
+        for line in lines:
+            encoded = line.encode('utf-8')
+            if packet and size + 1 + len(encoded) > self.max_packet_size:
+                yield b'\n'.join(packet)
+                packet, size = [], 0
+            packet.append(encoded)
+            size += len(encoded) + (1 if len(packet) > 1 else 0)
+        if packet:
+            yield b'\n'.join(packet)
+
+    def flush(self):
+        """Send everything aggregated so far; returns the number of packets sent"""
+        with self.flush_lock:
+            if self.socket is None:
+                return 0
+            sent = 0
+            for packet in self.packets(self.lines()):
+                try:
+                    self.socket.sendto(packet, self.address)
+                    sent += 1
+                except OSError:
+                    # Agent down, buffer full or name resolution failure: metrics are best effort
+                    self.dropped_packets += 1
+            self.sent_packets += sent
+            return sent
+
+    def _run(self):
+        stopping = self.stopping
+        while not stopping.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"StatsD flush failed: {str(e)}")
+
+    def stop(self):
+        """Stop the sender thread and flush what is left"""
+        if self.thread is None or self.pid != os.getpid():
+            return
+        self.stopping.set()
+        self.thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+
+_statsd = None
+_statsd_lock = threading.Lock()
+
+
+def get_statsd():
+    """Return the process-wide client, or None when STATSD_ENABLED is off"""
+    global _statsd
+    if not settings.STATSD_ENABLED:
+        return None
+    if _statsd is None:
+        with _statsd_lock:
+            if _statsd is None:
+                _statsd = BufferedStatsd(
+                    settings.STATSD_HOST, settings.STATSD_PORT,
+                    prefix=settings.STATSD_PREFIX,
+                    constant_tags=settings.STATSD_CONSTANT_TAGS,
+                    flush_interval=settings.STATSD_FLUSH_INTERVAL,
+                    max_packet_size=settings.STATSD_MAX_PACKET_SIZE,
+                    max_samples=settings.STATSD_MAX_SAMPLES,
+                )
+    return _statsd
+
+
+@receiver(setting_changed)
+def reset_statsd(setting, **kwargs):
+    global _statsd
+    if setting.startswith('STATSD_') and _statsd is not None:
+        _statsd.stop()
+        _statsd = None
+
+
+def stop_statsd():
+    if _statsd is not None:
+        _statsd.stop()
+
+
+atexit.register(stop_statsd)
+
+
+def increment(name, value=1, tags=None):
+    statsd = get_statsd()
+    if statsd is not None:
+        statsd.increment(name, value, tags)
+
+
+def gauge(name, value, tags=None):
+    statsd = get_statsd()
+    if statsd is not None:
+        statsd.gauge(name, value, tags)
+
+
+def histogram(name, value, tags=None):
+    statsd = get_statsd()
+    if statsd is not None:
+        statsd.histogram(name, value, tags)
+
+
+def timing(name, milliseconds, tags=None):
+    statsd = get_statsd()
+    if statsd is not None:
+        statsd.timing(name, milliseconds, tags)